@@ -33,6 +33,11 @@ $app->post('/api/ocr/process', function ($request, $response) {
     return $controller->processImage($request, $response);
 });
 
+$app->post('/api/ocr/process-shelf', function ($request, $response) {
+    $controller = new OCRController();
+    return $controller->processShelf($request, $response);
+});
+
 $app->get('/api/products/{code}', function ($request, $response, $args) {
     $controller = new OCRController();
     return $controller->getProduct($request, $response, $args);
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+OCR settings autotuner
+Sweeps a grid of OCR configurations (engine, language set, resize limit,
+orientation pre-pass) over a labelled corpus, measures accuracy and latency
+for every point, computes the accuracy/latency Pareto frontier and writes the
+fastest configuration within the accuracy target as the profile that
+easyocr_process.py and ocr_server.py load at startup.
+
+Labels come from the product code in the file name (tests/product_12345.png,
+tests/variants/12345_white_modern.png) or from the manifest.jsonl of a corpus
+built with tests/generate_corpus.py (directory layout). 'tesseract' points
+run the tesseract CLI; a 'both' point (tesseract first, EasyOCR when
+tesseract reads nothing, as OCRController does) is derived from the
+measurements without running OCR again.
+
+The sweep runs in a process pool and every measurement is cached by image
+hash, configuration and engine version, so re-runs only measure new images or
+configurations. Latency under --workers > 1 includes contention; use
+--workers 1 for the final numbers.
+
+Usage:
+    python3 autotune.py [images...] [--corpus DIR] [--workers 4]
+    python3 autotune.py --grid '{"max_side": [null, 960, 640]}' --min-accuracy 0.95
+    python3 autotune.py --dry-run        # report only, do not write the profile
+"""
+
+import os
+import re
+import sys
+import json
+import glob
+import time
+import shutil
+import hashlib
+import itertools
+import subprocess
+
+from easyocr_process import DEFAULT_PROFILE_PATH, ENGINES
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..'))
+DEFAULT_IMAGES = sorted(
+    glob.glob(os.path.join(REPO_ROOT, 'tests', 'product_*.png')) +
+    glob.glob(os.path.join(REPO_ROOT, 'tests', 'variants', '*.png')) +
+    glob.glob(os.path.join(REPO_ROOT, 'tests', 'variants', '*.jpeg'))
+)
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.EasyOCR', 'autotune_cache.jsonl')
+
+DEFAULT_GRID = {
+    'engine': ['tesseract', 'pytorch', 'onnx'],
+    'languages': [['en'], ['en', 'es']],
+    'max_side': [None, 1280, 960, 640],
+    'orient': [True, False],
+}
+TESSERACT_LANGUAGES = {'en': 'eng', 'es': 'spa'}
+DEFAULT_TOLERANCE = 0.01       # accuracy given up for speed when no target is set
+
+
+def expected_code(image_path):
+    """Product code in a test image file name, if any"""
+    match = re.search(r'(\d{5,})', os.path.basename(image_path))
+    return match.group(1) if match else None
+
+
+def labelled_images(images, corpus=None):
+    """(image path, expected code) pairs from file names and a corpus manifest"""
+    labelled = [(path, expected_code(path)) for path in images]
+    labelled = [(path, code) for path, code in labelled if code]
+    if corpus:
+        with open(os.path.join(corpus, 'manifest.jsonl'), encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if 'archive' in record:
+                    raise ValueError('Tar corpora are not supported, generate the corpus without --tar')
+                labelled.append((os.path.join(corpus, record['path']), record['code']))
+    return labelled
+
+
+def available_engines():
+    """Engines that can run in this environment"""
+    from importlib.util import find_spec
+
+    engines = []
+    if shutil.which('tesseract'):
+        engines.append('tesseract')
+    if find_spec('easyocr') is not None:
+        engines.append('pytorch')
+        if find_spec('onnxruntime') is not None:
+            engines.append('onnx')
+    return engines
+
+
+def expand_grid(grid, engines=None):
+    """
+    Configuration points of a grid
+
+    Tesseract has no orientation pre-pass, so its points only vary in
+    languages and resize limit. Engines not in 'engines' are skipped.
+    """
+    keys = sorted(grid)
+    points = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        point = dict(zip(keys, values))
+        if engines is not None and point['engine'] not in engines:
+            continue
+        if point['engine'] == 'tesseract':
+            point['orient'] = False
+        if point not in points:
+            points.append(point)
+    return points
+
+
+def point_name(point):
+    """Short label of a configuration point"""
+    return (f"{point['engine']}/{'+'.join(point['languages'])}"
+            f"/{point['max_side'] or 'full'}{'/orient' if point.get('orient') else ''}")
+
+
+def engine_version(engine):
+    """Version string of an engine, part of the cache key"""
+    from importlib import metadata
+
+    if engine == 'tesseract':
+        result = subprocess.run(['tesseract', '--version'], capture_output=True, text=True, timeout=5)
+        return (result.stdout or result.stderr).splitlines()[0].strip()
+    version = metadata.version('easyocr')
+    if engine == 'onnx':
+        version += f"+onnxruntime-{metadata.version('onnxruntime')}"
+    return version
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def cache_key(image_hash, point, version):
+    identity = json.dumps({'image': image_hash, 'point': point, 'version': version}, sort_keys=True)
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+
+def load_cache(path):
+    """Cached measurements by key"""
+    cache = {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    cache[entry['key']] = entry
+                except (ValueError, KeyError):
+                    continue
+    except OSError:
+        pass
+    return cache
+
+
+# ---------------------------------------------------------------------------
+# Measurement (runs in the worker processes)
+# ---------------------------------------------------------------------------
+
+_readers = {}
+
+
+def init_worker(threads):
+    """Keep every worker to a fair share of the CPU"""
+    if threads:
+        for name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS'):
+            os.environ[name] = str(threads)
+
+
+def get_reader(engine, languages):
+    """OCR reader of a worker, loaded once per (engine, languages)"""
+    key = (engine, tuple(languages))
+    if key not in _readers:
+        from easyocr_process import load_reader
+        _readers[key] = load_reader(engine, list(languages))
+    return _readers[key]
+
+
+def run_tesseract(image, languages):
+    """tesseract CLI on an in-memory image"""
+    import cv2
+
+    ok, png = cv2.imencode('.png', cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
+    if not ok:
+        raise ValueError('Could not encode image')
+    lang = '+'.join(TESSERACT_LANGUAGES.get(l, l) for l in languages)
+    result = subprocess.run(['tesseract', 'stdin', 'stdout', '-l', lang],
+                            input=png.tobytes(), capture_output=True, timeout=60)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode('utf-8', 'replace').strip())
+    return result.stdout.decode('utf-8', 'replace')
+
+
+def measure(task):
+    """
+    OCR one image with one configuration
+
+    Returns:
+        Measurement with 'key', 'text', 'latency_ms' and 'error'
+    """
+    key, point, image_path = task
+    from image_utils import load_image
+    from easyocr_process import limit_size, run_reader
+
+    entry = {'key': key, 'point': point_name(point), 'image': os.path.basename(image_path)}
+    try:
+        image, _ = load_image(image_path)
+        if point['engine'] == 'tesseract':
+            start = time.perf_counter()
+            if point['max_side']:
+                image = limit_size(image, point['max_side'])
+            text = run_tesseract(image, point['languages'])
+        else:
+            reader = get_reader(point['engine'], point['languages'])
+            start = time.perf_counter()
+            result = run_reader(reader, image, point['engine'], orient=point['orient'],
+                                max_side=point['max_side'])
+            if not result['success']:
+                raise RuntimeError(result['error'])
+            text = result['raw_text']
+        entry.update(text=text, latency_ms=(time.perf_counter() - start) * 1000, error=None)
+    except Exception as e:
+        entry.update(text='', latency_ms=None, error=str(e))
+    return entry
+
+
+# ---------------------------------------------------------------------------
+# Sweep and analysis
+# ---------------------------------------------------------------------------
+
+def sweep(points, labelled, cache_path=DEFAULT_CACHE_PATH, workers=None, force=False, progress=None):
+    """
+    Measure every (point, image) pair, reusing cached measurements
+
+    Returns:
+        {point name: [(expected code, measurement), ...]}, number of new measurements
+    """
+    cache = {} if force else load_cache(cache_path)
+    hashes = {path: file_hash(path) for path, _ in labelled}
+    versions = {}
+
+    tasks, keys = [], {}
+    for point in points:
+        engine = point['engine']
+        if engine not in versions:
+            versions[engine] = engine_version(engine)
+        for path, code in labelled:
+            key = cache_key(hashes[path], point, versions[engine])
+            keys[(point_name(point), path)] = key
+            if key not in cache:
+                tasks.append((key, point, path))
+    # Group by reader so every worker loads as few models as possible
+    tasks.sort(key=lambda task: (task[1]['engine'], task[1]['languages']))
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks) or 1))
+    if tasks:
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        threads = max(1, (os.cpu_count() or 1) // workers) if workers > 1 else None
+        with open(cache_path, 'a', encoding='utf-8') as cache_file:
+            if workers == 1:
+                init_worker(threads)
+                results = map(measure, tasks)
+                pool = None
+            else:
+                import multiprocessing
+                pool = multiprocessing.Pool(workers, init_worker, (threads,))
+                results = pool.imap_unordered(measure, tasks, chunksize=4)
+            try:
+                for done, entry in enumerate(results, 1):
+                    cache[entry['key']] = entry
+                    if entry['error'] is None:
+                        cache_file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                        cache_file.flush()
+                    if progress:
+                        progress(done, len(tasks))
+            finally:
+                if pool is not None:
+                    pool.close()
+                    pool.join()
+
+    measurements = {}
+    for point in points:
+        name = point_name(point)
+        measurements[name] = [(code, cache[keys[(name, path)]]) for path, code in labelled]
+    return measurements, len(tasks)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def is_correct(code, measurement):
+    return bool(measurement['text']) and code in measurement['text'].replace(' ', '')
+
+
+def score(point, pairs):
+    """Accuracy and latency of one configuration point"""
+    latencies = [m['latency_ms'] for _, m in pairs if m['latency_ms'] is not None]
+    return dict(
+        point,
+        name=point_name(point),
+        images=len(pairs),
+        accuracy=sum(is_correct(code, m) for code, m in pairs) / len(pairs) if pairs else 0.0,
+        errors=sum(m['error'] is not None for _, m in pairs),
+        p50_ms=percentile(latencies, 50),
+        p95_ms=percentile(latencies, 95),
+        mean_ms=sum(latencies) / len(latencies) if latencies else None,
+    )
+
+
+def combine_both(tesseract_pairs, easyocr_pairs):
+    """Measurements of the 'both' pipeline: tesseract, then EasyOCR when it reads nothing"""
+    pairs = []
+    for (code, first), (_, second) in zip(tesseract_pairs, easyocr_pairs):
+        latency = (first['latency_ms'] or 0.0) + (second['latency_ms'] or 0.0)
+        chosen = first if first['text'].strip() else second
+        pairs.append((code, dict(chosen, latency_ms=latency)))
+    return pairs
+
+
+def score_points(points, measurements):
+    """Scores of every swept point plus the derived 'both' points"""
+    scores = [score(point, measurements[point_name(point)]) for point in points]
+    tesseract = [s for s in scores if s['engine'] == 'tesseract']
+    easyocr = [s for s in scores if s['engine'] in ENGINES]
+    if tesseract and easyocr:
+        # Best tesseract point paired with every EasyOCR point
+        first = max(tesseract, key=lambda s: (s['accuracy'], -(s['p50_ms'] or 0)))
+        for second in easyocr:
+            pairs = combine_both(measurements[first['name']], measurements[second['name']])
+            both = score({k: second[k] for k in DEFAULT_GRID}, pairs)
+            both.update(name=f"both({first['name']} + {second['name']})", engine='both',
+                        tesseract=first['name'])
+            scores.append(both)
+    return scores
+
+
+def pareto_frontier(scores):
+    """Points no other point beats on both accuracy and p50 latency"""
+    ranked = sorted((s for s in scores if s['p50_ms'] is not None),
+                    key=lambda s: (s['p50_ms'], -s['accuracy']))
+    frontier, best = [], -1.0
+    for candidate in ranked:
+        if candidate['accuracy'] > best:
+            frontier.append(candidate)
+            best = candidate['accuracy']
+    return frontier
+
+
+def select(scores, min_accuracy=None, tolerance=DEFAULT_TOLERANCE, engines=ENGINES):
+    """
+    Fastest point meeting the accuracy target, on the frontier of the allowed engines
+
+    The frontier is computed over the allowed engines only: a faster tesseract
+    point must not dominate every EasyOCR point out of the profile choice.
+
+    Args:
+        scores: Scored points (or a frontier already computed over them)
+        min_accuracy: Required accuracy; default best accuracy - tolerance
+        engines: Engines the chosen point may use
+    """
+    candidates = pareto_frontier([s for s in scores if s['engine'] in engines])
+    if not candidates:
+        return None
+    target = min_accuracy
+    if target is None:
+        target = max(s['accuracy'] for s in candidates) - tolerance
+    for candidate in candidates:
+        if candidate['accuracy'] >= target:
+            return candidate
+    return candidates[-1]
+
+
+def write_profile(path, chosen, recommended, corpus_size):
+    """Write the profile loaded by easyocr_process.load_profile"""
+    profile = {
+        'profile': {key: chosen[key] for key in ('engine', 'languages', 'max_side', 'orient')},
+        'accuracy': chosen['accuracy'],
+        'p50_ms': chosen['p50_ms'],
+        'p95_ms': chosen['p95_ms'],
+        'recommended_engine': recommended['engine'] if recommended else None,
+        'images': corpus_size,
+        'generated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f'{path}.tmp.{os.getpid()}'
+    with open(tmp_path, 'w') as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp_path, path)
+    return profile
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Autotune OCR settings on a labelled corpus')
+    parser.add_argument('images', nargs='*', default=DEFAULT_IMAGES)
+    parser.add_argument('--corpus', default=None, help='Corpus directory with a manifest.jsonl')
+    parser.add_argument('--grid', default=None,
+                        help='JSON object overriding grid dimensions, e.g. {"max_side": [null, 960]}')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPUs)')
+    parser.add_argument('--min-accuracy', type=float, default=None,
+                        help=f'Accuracy target (default: best accuracy - {DEFAULT_TOLERANCE})')
+    parser.add_argument('--output', default=os.environ.get('EASYOCR_PROFILE', DEFAULT_PROFILE_PATH),
+                        help='Profile file loaded by easyocr_process.py')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help='Measurement cache (JSONL)')
+    parser.add_argument('--force', action='store_true', help='Ignore cached measurements')
+    parser.add_argument('--dry-run', action='store_true', help='Do not write the profile')
+    parser.add_argument('--json', action='store_true', help='Print raw JSON results')
+    args = parser.parse_args()
+
+    grid = dict(DEFAULT_GRID, **(json.loads(args.grid) if args.grid else {}))
+    unknown = set(grid) - set(DEFAULT_GRID)
+    if unknown:
+        print(json.dumps({'success': False, 'error': f'Unknown grid keys: {", ".join(sorted(unknown))}'}))
+        return 1
+
+    labelled = labelled_images(args.images, args.corpus)
+    points = expand_grid(grid, available_engines())
+    if not labelled or not points:
+        print(json.dumps({'success': False, 'error': 'No labelled images or no OCR engine available'}))
+        return 1
+
+    def progress(done, total):
+        if not args.json and (done == total or done % 50 == 0):
+            print(f"  • {done}/{total} measurements", flush=True)
+
+    start = time.perf_counter()
+    measurements, measured = sweep(points, labelled, args.cache, args.workers, args.force, progress)
+    scores = score_points(points, measurements)
+    frontier = pareto_frontier(scores)
+    chosen = select(scores, args.min_accuracy)
+    recommended = select(frontier, args.min_accuracy, engines=('tesseract', 'both') + ENGINES)
+
+    profile = None
+    if chosen and not args.dry_run:
+        profile = write_profile(args.output, chosen, recommended, len(labelled))
+
+    if args.json:
+        print(json.dumps({'success': True, 'scores': scores, 'frontier': [s['name'] for s in frontier],
+                          'chosen': chosen, 'recommended': recommended, 'profile': profile}, indent=2))
+        return 0
+
+    print("=" * 70)
+    print(f"OCR autotune ({len(labelled)} images x {len(points)} configurations, "
+          f"{measured} measured, {len(points) * len(labelled) - measured} cached, "
+          f"{time.perf_counter() - start:.1f} s)")
+    print("=" * 70)
+    print(f"{'configuration':<44}{'accuracy':>10}{'p50 ms':>9}{'p95 ms':>9}")
+    on_frontier = {s['name'] for s in frontier}
+    for s in sorted(scores, key=lambda s: (-s['accuracy'], s['p50_ms'] or 0)):
+        mark = '•' if s['name'] in on_frontier else ' '
+        p50 = f"{s['p50_ms']:.0f}" if s['p50_ms'] is not None else '-'
+        p95 = f"{s['p95_ms']:.0f}" if s['p95_ms'] is not None else '-'
+        print(f"{mark} {s['name'][:42]:<42}{s['accuracy']:>10.1%}{p50:>9}{p95:>9}")
+    print()
+    if chosen:
+        print(f"✓ EasyOCR profile: {chosen['name']} ({chosen['accuracy']:.1%}, p50 {chosen['p50_ms']:.0f} ms)")
+        if profile:
+            print(f"✓ Written to {args.output}")
+    else:
+        print("✗ No EasyOCR configuration measured, profile not written")
+    if recommended:
+        print(f"• Recommended engine: {recommended['engine']} ({recommended['name']})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark EasyOCR engines (PyTorch vs ONNX Runtime)
+Runs every engine in a fresh interpreter and reports import time, model load
+time, per-image latency and peak RSS, then compares the OCR output of the
+engines against the PyTorch reference.
+
+Usage:
+    python3 benchmark_engines.py [images...] [--engines pytorch onnx] [--repeat 3]
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import subprocess
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..'))
+DEFAULT_IMAGES = sorted(
+    glob.glob(os.path.join(REPO_ROOT, 'tests', 'product_*.png')) +
+    glob.glob(os.path.join(REPO_ROOT, 'tests', 'variants', '*.png')) +
+    glob.glob(os.path.join(REPO_ROOT, 'tests', 'variants', '*.jpeg'))
+)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_child(engine, images, repeat):
+    """Measure one engine inside this (fresh) interpreter"""
+    start = time.perf_counter()
+    if engine == 'onnx':
+        import onnx_engine  # noqa: F401
+        import onnxruntime  # noqa: F401
+        import cv2  # noqa: F401
+    else:
+        import easyocr  # noqa: F401
+    import_seconds = time.perf_counter() - start
+
+    from easyocr_process import load_reader
+
+    start = time.perf_counter()
+    reader = load_reader(engine)
+    load_seconds = time.perf_counter() - start
+
+    latencies = []
+    outputs = {}
+    for image in images:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = reader.readtext(image)
+            latencies.append(time.perf_counter() - start)
+        outputs[image] = [
+            {'box': [[float(v) for v in point] for point in box], 'text': text, 'confidence': float(conf)}
+            for box, text, conf in results
+        ]
+
+    return {
+        'engine': engine,
+        'import_seconds': import_seconds,
+        'load_seconds': load_seconds,
+        'latency_p50_ms': percentile(latencies, 50) * 1000,
+        'latency_p95_ms': percentile(latencies, 95) * 1000,
+        'latency_mean_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+        'outputs': outputs,
+    }
+
+
+def measure(engine, images, repeat):
+    """Run an engine benchmark in a fresh interpreter"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--child', engine, '--repeat', str(repeat)] + images
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=SCRIPT_DIR)
+    if proc.returncode != 0:
+        return {'engine': engine, 'error': proc.stderr.strip().splitlines()[-1:] or ['failed']}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def box_distance(box_a, box_b):
+    """Maximum corner distance between two boxes in pixels"""
+    return max(
+        abs(a - b)
+        for point_a, point_b in zip(box_a, box_b)
+        for a, b in zip(point_a, point_b)
+    )
+
+
+def compare_outputs(reference, candidate):
+    """Compare candidate OCR output against the reference engine"""
+    images = list(reference)
+    text_matches = 0
+    confidence_deltas = []
+    box_deltas = []
+
+    for image in images:
+        ref = reference[image]
+        cand = candidate.get(image, [])
+        ref_text = ' '.join(r['text'] for r in ref)
+        cand_text = ' '.join(r['text'] for r in cand)
+        if ref_text == cand_text:
+            text_matches += 1
+        for r, c in zip(ref, cand):
+            confidence_deltas.append(abs(r['confidence'] - c['confidence']))
+            box_deltas.append(box_distance(r['box'], c['box']))
+
+    return {
+        'images': len(images),
+        'text_match_rate': text_matches / len(images) if images else 0.0,
+        'max_confidence_delta': max(confidence_deltas) if confidence_deltas else 0.0,
+        'max_box_delta_px': max(box_deltas) if box_deltas else 0.0,
+    }
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark EasyOCR engines')
+    parser.add_argument('images', nargs='*', default=DEFAULT_IMAGES)
+    parser.add_argument('--engines', nargs='+', default=['pytorch', 'onnx'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--json', action='store_true', help='Print raw JSON results')
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, SCRIPT_DIR)
+        print(json.dumps(run_child(args.child, args.images, args.repeat)))
+        return 0
+
+    results = [measure(engine, args.images, args.repeat) for engine in args.engines]
+    reference = next((r for r in results if 'outputs' in r), None)
+    for result in results:
+        if reference and 'outputs' in result and result is not reference:
+            result['agreement'] = compare_outputs(reference['outputs'], result['outputs'])
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print("=" * 70)
+    print(f"EasyOCR engine benchmark ({len(args.images)} images x {args.repeat})")
+    print("=" * 70)
+    header = f"{'engine':<10}{'import s':>10}{'load s':>10}{'p50 ms':>10}{'p95 ms':>10}{'RSS MB':>10}"
+    print(header)
+    for result in results:
+        if 'error' in result:
+            print(f"{result['engine']:<10}  ✗ {result['error'][0]}")
+            continue
+        print(f"{result['engine']:<10}{result['import_seconds']:>10.2f}{result['load_seconds']:>10.2f}"
+              f"{result['latency_p50_ms']:>10.1f}{result['latency_p95_ms']:>10.1f}{result['peak_rss_mb']:>10.1f}")
+    for result in results:
+        if 'agreement' in result:
+            agreement = result['agreement']
+            print()
+            print(f"{result['engine']} vs {reference['engine']}: "
+                  f"text match {agreement['text_match_rate']:.0%}, "
+                  f"max confidence delta {agreement['max_confidence_delta']:.3f}, "
+                  f"max box delta {agreement['max_box_delta_px']:.0f}px")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark the orientation pre-pass against brute-force rotation
+Rotates the test labels by quarter turns plus skew and measures how often the
+estimator recovers the rotation and how long it takes. With --engine the
+OCR result is compared too: one pre-pass + readtext (easyocr_process) versus
+readtext at all four quarter turns keeping the most confident reading.
+
+Usage:
+    python3 benchmark_orientation.py [images...] [--angles 0 90 180 270 5 -7]
+    python3 benchmark_orientation.py --engine onnx
+"""
+
+import os
+import re
+import sys
+import json
+import glob
+import time
+
+import numpy as np
+
+from image_utils import load_image
+from orientation import estimate_orientation
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..'))
+DEFAULT_IMAGES = sorted(
+    glob.glob(os.path.join(REPO_ROOT, 'tests', 'product_*.png')) +
+    glob.glob(os.path.join(REPO_ROOT, 'tests', 'variants', '*.png')) +
+    glob.glob(os.path.join(REPO_ROOT, 'tests', 'variants', '*.jpeg'))
+)
+DEFAULT_ANGLES = [0, 90, 180, 270, 5, -7, 95, 183, 268, -12]
+ANGLE_TOLERANCE = 1.5
+
+
+def rotate_content(img, angle):
+    """Rotate an image counter-clockwise, filling the corners with its median"""
+    import cv2
+
+    height, width = img.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2.0, height / 2.0), angle, 1.0)
+    cos, sin = abs(matrix[0, 0]), abs(matrix[0, 1])
+    new_width = int(height * sin + width * cos)
+    new_height = int(height * cos + width * sin)
+    matrix[0, 2] += new_width / 2.0 - width / 2.0
+    matrix[1, 2] += new_height / 2.0 - height / 2.0
+    fill = tuple(int(v) for v in np.median(img.reshape(-1, img.shape[2]), axis=0))
+    return cv2.warpAffine(img, matrix, (new_width, new_height),
+                          borderMode=cv2.BORDER_CONSTANT, borderValue=fill)
+
+
+def angle_error(estimated, expected):
+    """Signed angle difference in (-180, 180]"""
+    return (estimated - expected + 180.0) % 360.0 - 180.0
+
+
+def expected_code(image_path):
+    """Product code in a test image file name, if any"""
+    match = re.search(r'(\d{5})', os.path.basename(image_path))
+    return match.group(1) if match else None
+
+
+def mean_confidence(results):
+    """Mean confidence of (box, text, confidence) results"""
+    return sum(r[2] for r in results) / len(results) if results else 0.0
+
+
+def brute_force(reader, img):
+    """readtext at every quarter turn, keep the most confident text"""
+    best = None
+    for quarter in range(4):
+        results = reader.readtext(np.ascontiguousarray(np.rot90(img, quarter)))
+        if best is None or mean_confidence(results) > mean_confidence(best):
+            best = results
+    return ' '.join(r[1] for r in best)
+
+
+def benchmark(images, angles, engine=None):
+    """Estimator accuracy and latency, plus OCR comparison with an engine"""
+    reader = None
+    if engine:
+        from easyocr_process import load_reader
+        reader = load_reader(engine)
+
+    from easyocr_process import run_reader
+
+    cases = []
+    for image_path in images:
+        img, _ = load_image(image_path)
+        code = expected_code(image_path)
+        for angle in angles:
+            rotated = rotate_content(img, angle)
+            _, grey = load_image(rotated)
+
+            start = time.perf_counter()
+            estimate = estimate_orientation(grey)
+            estimate_ms = (time.perf_counter() - start) * 1000
+            error = angle_error(estimate['angle'], angle)
+
+            case = {
+                'image': os.path.basename(image_path),
+                'angle': angle,
+                'estimated': estimate['angle'],
+                'exact': abs(error) <= ANGLE_TOLERANCE,
+                'axis': abs((error + 90.0) % 180.0 - 90.0) <= ANGLE_TOLERANCE,
+                'estimate_ms': estimate_ms,
+            }
+
+            if reader is not None and code:
+                start = time.perf_counter()
+                result = run_reader(reader, rotated, engine, orient=True)
+                case['prepass_ms'] = (time.perf_counter() - start) * 1000
+                case['prepass_found'] = code in result.get('raw_text', '').replace(' ', '')
+
+                start = time.perf_counter()
+                text = brute_force(reader, rotated)
+                case['brute_ms'] = (time.perf_counter() - start) * 1000
+                case['brute_found'] = code in text.replace(' ', '')
+            cases.append(case)
+
+    return summarize(cases)
+
+
+def summarize(cases):
+    """Aggregate per-case measurements"""
+    def rate(key):
+        values = [c[key] for c in cases if key in c]
+        return sum(values) / len(values) if values else None
+
+    def median(key):
+        values = [c[key] for c in cases if key in c]
+        return float(np.median(values)) if values else None
+
+    return {
+        'cases': len(cases),
+        'exact_rate': rate('exact'),
+        'axis_rate': rate('axis'),
+        'estimate_p50_ms': median('estimate_ms'),
+        'estimate_max_ms': max((c['estimate_ms'] for c in cases), default=None),
+        'prepass_found_rate': rate('prepass_found'),
+        'prepass_p50_ms': median('prepass_ms'),
+        'brute_found_rate': rate('brute_found'),
+        'brute_p50_ms': median('brute_ms'),
+        'failures': [c for c in cases if not c['exact']],
+    }
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the orientation pre-pass')
+    parser.add_argument('images', nargs='*', default=DEFAULT_IMAGES)
+    parser.add_argument('--angles', nargs='+', type=float, default=DEFAULT_ANGLES)
+    parser.add_argument('--engine', choices=['pytorch', 'onnx'], default=None,
+                        help='Also compare OCR results with brute-force rotation')
+    parser.add_argument('--json', action='store_true', help='Print raw JSON results')
+    args = parser.parse_args()
+
+    summary = benchmark(args.images, args.angles, args.engine)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    print("=" * 70)
+    print(f"Orientation pre-pass ({len(args.images)} images x {len(args.angles)} angles)")
+    print("=" * 70)
+    print(f"{f'Exact angle (±{ANGLE_TOLERANCE}°):':<26}{summary['exact_rate']:.1%}")
+    print(f"{'Line axis (mod 180°):':<26}{summary['axis_rate']:.1%}")
+    print(f"{'Estimator latency:':<26}p50 {summary['estimate_p50_ms']:.1f} ms, "
+          f"max {summary['estimate_max_ms']:.1f} ms")
+    if summary['prepass_found_rate'] is not None:
+        print()
+        print(f"{'':<14}{'code found':>12}{'p50 ms':>10}")
+        print(f"{'pre-pass':<14}{summary['prepass_found_rate']:>12.1%}{summary['prepass_p50_ms']:>10.1f}")
+        print(f"{'brute force':<14}{summary['brute_found_rate']:>12.1%}{summary['brute_p50_ms']:>10.1f}")
+    for case in summary['failures'][:10]:
+        print(f"  ✗ {case['image']} rotated {case['angle']:g}°, estimated {case['estimated']:g}°")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark the image quality gate
+Degrades the test labels (blur, under/over exposure, low contrast, distance)
+and reports gate latency, how many good and degraded frames are rejected and
+why. With --engine every frame is also OCR'd to measure the CPU-seconds the
+gate saves and how many rejected frames OCR would still have read.
+
+Usage:
+    python3 benchmark_quality.py [images...] [--config thresholds.json]
+    python3 benchmark_quality.py --engine onnx
+"""
+
+import os
+import re
+import sys
+import json
+import glob
+import time
+
+import numpy as np
+
+from image_utils import load_image
+from quality import assess, load_thresholds
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..'))
+DEFAULT_IMAGES = sorted(
+    glob.glob(os.path.join(REPO_ROOT, 'tests', 'product_*.png')) +
+    glob.glob(os.path.join(REPO_ROOT, 'tests', 'variants', '*.png')) +
+    glob.glob(os.path.join(REPO_ROOT, 'tests', 'variants', '*.jpeg'))
+)
+
+
+def degrade(img, kind):
+    """Simulate a bad capture"""
+    import cv2
+
+    if kind == 'blur':
+        return cv2.GaussianBlur(img, (0, 0), 2.5)
+    if kind == 'dark':
+        return (img * 0.08).astype(np.uint8)
+    if kind == 'bright':
+        return np.clip(img.astype(np.int16) + 200, 0, 255).astype(np.uint8)
+    if kind == 'flat':
+        return (128 + (img.astype(np.float32) - 128) * 0.1).astype(np.uint8)
+    if kind == 'far':
+        small = cv2.resize(img, None, fx=0.2, fy=0.2, interpolation=cv2.INTER_AREA)
+        canvas = np.empty((img.shape[0] * 2, img.shape[1] * 2) + img.shape[2:], dtype=np.uint8)
+        canvas[:] = np.median(img.reshape(-1, img.shape[-1]), axis=0).astype(np.uint8)
+        canvas[:small.shape[0], :small.shape[1]] = small
+        return canvas
+    return img
+
+
+DEGRADATIONS = ('good', 'blur', 'dark', 'bright', 'flat', 'far')
+
+
+def expected_code(image_path):
+    """Product code in a test image file name, if any"""
+    match = re.search(r'(\d{5})', os.path.basename(image_path))
+    return match.group(1) if match else None
+
+
+def benchmark(images, thresholds, engine=None):
+    """Gate every clean and degraded frame, optionally OCR them too"""
+    reader = None
+    if engine:
+        from easyocr_process import load_reader
+        reader = load_reader(engine)
+
+    cases = []
+    for image_path in images:
+        img, _ = load_image(image_path)
+        code = expected_code(image_path)
+        for kind in DEGRADATIONS:
+            frame = degrade(img, kind)
+            _, grey = load_image(frame)
+
+            start = time.process_time()
+            result = assess(grey, thresholds)
+            case = {
+                'image': os.path.basename(image_path),
+                'kind': kind,
+                'rejected': not result['ok'],
+                'reason': result['reason'],
+                'gate_cpu_seconds': time.process_time() - start,
+            }
+
+            if reader is not None:
+                start = time.process_time()
+                text = ' '.join(r[1] for r in reader.readtext(frame))
+                case['ocr_cpu_seconds'] = time.process_time() - start
+                case['readable'] = bool(code) and code in text.replace(' ', '')
+            cases.append(case)
+    return cases
+
+
+def summarize(cases):
+    """Reject rates, reasons and CPU accounting"""
+    good = [c for c in cases if c['kind'] == 'good']
+    bad = [c for c in cases if c['kind'] != 'good']
+    rejected = [c for c in cases if c['rejected']]
+
+    reasons = {}
+    for case in rejected:
+        reasons[case['reason']] = reasons.get(case['reason'], 0) + 1
+
+    gate_seconds = sum(c['gate_cpu_seconds'] for c in cases)
+    summary = {
+        'frames': len(cases),
+        'good_rejected_rate': sum(c['rejected'] for c in good) / len(good) if good else 0.0,
+        'degraded_rejected_rate': sum(c['rejected'] for c in bad) / len(bad) if bad else 0.0,
+        'reasons': reasons,
+        'gate_mean_ms': gate_seconds / len(cases) * 1000 if cases else 0.0,
+    }
+    if cases and 'ocr_cpu_seconds' in cases[0]:
+        summary['ocr_cpu_seconds'] = sum(c['ocr_cpu_seconds'] for c in cases)
+        summary['cpu_seconds_saved'] = sum(c['ocr_cpu_seconds'] for c in rejected) - gate_seconds
+        summary['rejected_but_readable'] = sum(c['readable'] for c in rejected)
+    return summary
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the image quality gate')
+    parser.add_argument('images', nargs='*', default=DEFAULT_IMAGES)
+    parser.add_argument('--config', default=None, help='JSON file with threshold overrides')
+    parser.add_argument('--engine', choices=['pytorch', 'onnx'], default=None,
+                        help='Also OCR every frame to measure CPU-seconds saved')
+    parser.add_argument('--json', action='store_true', help='Print raw JSON results')
+    args = parser.parse_args()
+
+    summary = summarize(benchmark(args.images, load_thresholds(args.config), args.engine))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    print("=" * 70)
+    print(f"Image quality gate ({len(args.images)} images x {len(DEGRADATIONS)} captures)")
+    print("=" * 70)
+    print(f"{'Gate latency:':<28}{summary['gate_mean_ms']:.1f} ms CPU per frame")
+    print(f"{'Good frames rejected:':<28}{summary['good_rejected_rate']:.1%}")
+    print(f"{'Degraded frames rejected:':<28}{summary['degraded_rejected_rate']:.1%}")
+    for reason, count in sorted(summary['reasons'].items(), key=lambda item: -item[1]):
+        print(f"  • {reason:<20}{count:>6}")
+    if 'cpu_seconds_saved' in summary:
+        print()
+        print(f"{'OCR CPU (all frames):':<28}{summary['ocr_cpu_seconds']:.1f} s")
+        print(f"{'CPU-seconds saved:':<28}{summary['cpu_seconds_saved']:.1f} s")
+        print(f"{'Rejected but readable:':<28}{summary['rejected_but_readable']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
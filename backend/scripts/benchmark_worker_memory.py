@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-worker memory of the OCR worker pool
+Starts ocr_server.py in each model-loading mode, waits until all workers
+are warm and reports RSS / PSS per worker. PSS is the number to compare:
+it charges shared pages only once across the pool.
+
+Modes:
+    private  - every worker loads its own model copy (--no-preload)
+    fork     - parent loads once, workers share copy-on-write pages
+    mmap     - parent maps packed weights, workers share the mapping
+
+Usage:
+    python3 benchmark_worker_memory.py [--workers 4] [--engine pytorch]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+from ocr_server import memory_report  # noqa: E402
+
+MODES = {
+    'private': ['--no-preload'],
+    'fork': [],
+    'mmap': ['--shared-weights'],
+}
+
+
+def run_mode(mode, workers, engine, timeout):
+    """Start the server in one mode and return its memory report"""
+    tmp_dir = tempfile.mkdtemp(prefix='ocr_mem_')
+    socket_path = os.path.join(tmp_dir, 'ocr.sock')
+    status_file = os.path.join(tmp_dir, 'status.json')
+
+    cmd = [
+        sys.executable, os.path.join(SCRIPT_DIR, 'ocr_server.py'),
+        '--socket', socket_path,
+        '--workers', str(workers),
+        '--engine', engine,
+        '--status-file', status_file,
+    ] + MODES[mode]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    try:
+        deadline = time.time() + timeout
+        while not os.path.exists(status_file):
+            if proc.poll() is not None:
+                raise RuntimeError(proc.stderr.read().decode().strip().splitlines()[-1:])
+            if time.time() > deadline:
+                raise TimeoutError(f'{mode}: workers not ready after {timeout}s')
+            time.sleep(0.2)
+
+        with open(status_file) as f:
+            status = json.load(f)
+        report = memory_report(status['workers'])
+        report['mode'] = mode
+        return report
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Per-worker memory of the OCR worker pool')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--engine', choices=['pytorch', 'onnx'], default='pytorch')
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES))
+    parser.add_argument('--timeout', type=int, default=300)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    modes = [m for m in args.modes if not (m == 'mmap' and args.engine != 'pytorch')]
+    reports = []
+    for mode in modes:
+        try:
+            reports.append(run_mode(mode, args.workers, args.engine, args.timeout))
+        except Exception as e:
+            reports.append({'mode': mode, 'error': str(e)})
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return 0
+
+    print("=" * 70)
+    print(f"OCR worker memory ({args.workers} workers, engine: {args.engine})")
+    print("=" * 70)
+    print(f"{'mode':<10}{'RSS/worker':>14}{'PSS/worker':>14}{'shared':>12}{'pool PSS':>12}")
+    for report in reports:
+        if 'error' in report:
+            print(f"{report['mode']:<10}  ✗ {report['error']}")
+            continue
+        n = len(report['workers'])
+        rss = report['total_rss_mb'] / n
+        pss = report['total_pss_mb'] / n
+        shared = sum(w['shared_mb'] for w in report['workers']) / n
+        print(f"{report['mode']:<10}{rss:>12.1f}MB{pss:>12.1f}MB{shared:>10.1f}MB{report['total_pss_mb']:>10.1f}MB")
+
+    baseline = next((r for r in reports if r['mode'] == 'private' and 'error' not in r), None)
+    if baseline:
+        print()
+        for report in reports:
+            if report is not baseline and 'error' not in report:
+                ratio = baseline['total_pss_mb'] / max(report['total_pss_mb'], 1e-6)
+                print(f"  • {report['mode']}: {ratio:.1f}x workers in the memory of 'private'")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,44 +2,326 @@
 """
 EasyOCR processing script
 Receives an image path and returns JSON with OCR results
+
+Usage:
+    easyocr_process.py <image_path> [--engine pytorch|onnx] [--multi]
+
+The engine can also be selected with the EASYOCR_ENGINE environment variable.
+The 'onnx' engine needs models exported with: python3 onnx_engine.py export
+
+When EASYOCR_SOCKET points to a running ocr_server.py, the image is sent to
+the pre-loaded workers instead of loading the models in this process.
+
+With --layout-cache (or --layout-cache-path PATH, or EASYOCR_LAYOUT_CACHE set)
+known label templates skip text detection, see layout_cache.py.
+
+Blurry, badly exposed or far-away frames are rejected before OCR with a
+machine-readable reason (error_code 'low_quality'), see quality.py;
+EASYOCR_QUALITY_GATE=flag|off or --quality flag|off relaxes the gate.
+
+Rotated and skewed photos are straightened by a cheap orientation pre-pass
+(orientation.py) before recognition; disable it with --no-orient or
+EASYOCR_AUTO_ORIENT=0.
+
+Besides raw_text the result holds every token ('tokens': text, confidence and
+box in pixels of the image recognition ran on, i.e. after orientation and
+resizing) and the label fields found by field_extractor.py ('fields': code,
+price, name and barcode, each with value, confidence and box).
+
+With --multi the image is a shelf or pallet photo holding several labels:
+the result lists every label with its box, code, fields and catalog match
+instead of one raw_text, see multi_label.py.
+
+Engine, languages, resize limit and orientation default to the profile file
+written by autotune.py (EASYOCR_PROFILE, or ~/.EasyOCR/ocr_profile.json when
+it exists); command line arguments and environment variables still win.
 """
 
+import os
 import sys
 import json
-import easyocr
+import time
+
+DEFAULT_LANGUAGES = ['en', 'es']
+ENGINES = ('pytorch', 'onnx')
+DEFAULT_PROFILE_PATH = os.path.join(os.path.expanduser('~'), '.EasyOCR', 'ocr_profile.json')
+PROFILE_KEYS = ('engine', 'languages', 'max_side', 'orient')
+
+
+def load_profile(path=None):
+    """
+    Tuned OCR settings written by autotune.py
+
+    Returns:
+        Dictionary with any of 'engine', 'languages', 'max_side' and 'orient';
+        empty when no profile is configured
+    """
+    path = path or os.environ.get('EASYOCR_PROFILE')
+    if not path:
+        if not os.path.exists(DEFAULT_PROFILE_PATH):
+            return {}
+        path = DEFAULT_PROFILE_PATH
+    with open(path) as f:
+        profile = json.load(f)
+    settings = profile.get('profile', profile)
+    if settings.get('engine') not in (None,) + ENGINES:
+        raise ValueError(f"Unknown engine in profile {path}: {settings['engine']}")
+    return {key: settings[key] for key in PROFILE_KEYS if settings.get(key) is not None}
+
+
+def load_reader(engine='pytorch', languages=None, shared_weights=None):
+    """
+    Create an OCR reader for the given engine
+
+    Args:
+        engine: 'pytorch' or 'onnx'
+        languages: EasyOCR language list
+        shared_weights: Path of a packed weights file (see shared_weights.py)
+            to map instead of loading private copies (pytorch only)
+    """
+    languages = languages or DEFAULT_LANGUAGES
+
+    if engine == 'onnx':
+        from onnx_engine import OnnxReader
+        return OnnxReader(languages)
+
+    if shared_weights:
+        from shared_weights import load_shared_reader
+        return load_shared_reader(languages, shared_weights)
+
+    import easyocr
+    return easyocr.Reader(languages, gpu=False)
+
+
+def auto_orient_enabled(default=True):
+    """Whether the orientation pre-pass is enabled by the environment"""
+    value = os.environ.get('EASYOCR_AUTO_ORIENT')
+    if value is None:
+        return default
+    return value not in ('0', 'false', 'no')
+
+
+def limit_size(image, max_side):
+    """Downscale an image so its longest side is at most max_side"""
+    import cv2
+
+    height, width = image.shape[:2]
+    scale = max_side / float(max(height, width))
+    if scale >= 1.0:
+        return image
+    return cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))),
+                      interpolation=cv2.INTER_AREA)
+
+
+def read_image(reader, image, layout_cache=None, manufacturer=None):
+    """readtext, going through the layout cache when one is enabled"""
+    if layout_cache is not None:
+        return layout_cache.readtext(reader, image, manufacturer)
+    return reader.readtext(image), {}
+
+
+def mean_confidence(results):
+    """Mean confidence of (box, text, confidence) results"""
+    return sum(result[2] for result in results) / len(results) if results else 0
+
+
+def run_reader(reader, image_path, engine, layout_cache=None, manufacturer=None, orient=None,
+               quality_gate=None, max_side=None):
+    """Run an already loaded reader on an image (downscaled to max_side if set)"""
+    if orient is None:
+        orient = auto_orient_enabled()
 
-def process_image(image_path):
-    """Process image with EasyOCR"""
     try:
-        # Initialize reader (English + Spanish)
-        reader = easyocr.Reader(['en', 'es'], gpu=False)
+        image = image_path
+        info = {}
+        if quality_gate is not None or max_side:
+            from image_utils import load_image
+            image, grey = load_image(image_path)
+        if max_side:
+            image = limit_size(image, max_side)
+        if quality_gate is not None:
+            info['quality'] = quality_gate.check(grey)
+            if info['quality'].pop('reject'):
+                return {
+                    'success': False,
+                    'error': f"Low image quality: {info['quality']['reason']}",
+                    'error_code': 'low_quality',
+                    'reason': info['quality']['reason'],
+                    'engine': engine,
+                    **info
+                }
+
+        ocr_start = time.process_time()
+        if orient:
+            from orientation import orient_image, MIN_UPRIGHT_CONFIDENCE
+            image, info['orientation'] = orient_image(image)
+
+        # Process image, skipping detection on known label templates
+        results, cache_info = read_image(reader, image, layout_cache, manufacturer)
+        info.update(cache_info)
 
-        # Process image
-        results = reader.readtext(image_path)
+        # Upside-down is the least certain part of the estimate: when the
+        # text reads poorly, try the other half turn once
+        if orient and mean_confidence(results) < MIN_UPRIGHT_CONFIDENCE:
+            flipped, flipped_info = read_image(
+                reader, image[::-1, ::-1].copy(), layout_cache, manufacturer
+            )
+            if mean_confidence(flipped) > mean_confidence(results):
+                results = flipped
+                info.update(flipped_info)
+                info['orientation']['rotation'] = (info['orientation']['rotation'] + 180) % 360
+                info['orientation']['flipped'] = True
 
-        # Extract text
+        if quality_gate is not None:
+            quality_gate.record_ocr(time.process_time() - ocr_start)
+
+        # Extract text, keeping every token's box and confidence
         text_parts = [result[1] for result in results]
         raw_text = ' '.join(text_parts).strip()
+        from field_extractor import make_token, public_token, extract_fields
+        tokens = [make_token(result) for result in results]
 
         return {
             'success': True,
             'raw_text': raw_text,
-            'confidence': sum(result[2] for result in results) / len(results) if results else 0
+            'confidence': mean_confidence(results),
+            'engine': engine,
+            'tokens': [public_token(token) for token in tokens],
+            'fields': extract_fields(tokens),
+            **info
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
         }
+
+
+def load_layout_cache(path=None):
+    """Open the label layout cache if enabled by argument or environment"""
+    path = path or os.environ.get('EASYOCR_LAYOUT_CACHE')
+    if not path:
+        return None
+    from layout_cache import LayoutCache
+    return LayoutCache(path)
+
+
+def load_quality_gate(mode=None):
+    """Open the image quality gate unless disabled by argument or environment"""
+    from quality import load_quality_gate as load_gate
+    return load_gate(mode)
+
+
+def process_image(image_path, engine=None, layout_cache=None, manufacturer=None, orient=None,
+                  quality=None):
+    """Process image with EasyOCR"""
+    try:
+        profile = load_profile()
+        engine = engine or os.environ.get('EASYOCR_ENGINE') or profile.get('engine', 'pytorch')
+        if engine not in ENGINES:
+            raise ValueError(f'Unknown engine: {engine}')
+        if orient is None:
+            orient = auto_orient_enabled(profile.get('orient', True))
+
+        # Initialize reader (English + Spanish unless the profile says otherwise)
+        reader = load_reader(engine, profile.get('languages'))
+        cache = load_layout_cache(layout_cache)
+        gate = load_quality_gate(quality)
     except Exception as e:
         return {
             'success': False,
             'error': str(e)
         }
 
+    try:
+        return run_reader(reader, image_path, engine, cache, manufacturer, orient, gate,
+                          profile.get('max_side'))
+    finally:
+        # One-shot process: merge the batched layout cache counters before exiting
+        if cache is not None:
+            cache.flush()
+
+
+def process_via_server(socket_path, image_path, manufacturer=None, orient=None, quality=None,
+                       multi=False):
+    """
+    Send the image to a running ocr_server.py
+
+    Returns:
+        The server response, or None when no server accepts the connection
+        (a server that took the request but failed or timed out is an error,
+        not a reason to run the whole job again in this process)
+    """
+    from ocr_server import request_ocr
+
+    request = {'image_path': os.path.abspath(image_path)}
+    if multi:
+        request['multi'] = True
+    if manufacturer:
+        request['manufacturer'] = manufacturer
+    if orient is not None:
+        request['orient'] = orient
+    if quality:
+        request['quality'] = quality
+    try:
+        return request_ocr(socket_path, request)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+    except OSError as e:
+        return {
+            'success': False,
+            'error': f'OCR server did not answer: {e}'
+        }
+
+
+def parse_args(argv):
+    """Parse command line arguments"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='EasyOCR processing script')
+    parser.add_argument('image_path', nargs='?')
+    parser.add_argument('--engine', choices=ENGINES, default=None)
+    parser.add_argument('--layout-cache', action='store_true',
+                        help='Reuse text boxes of known label templates')
+    parser.add_argument('--layout-cache-path', default=None,
+                        help='Layout cache file (implies --layout-cache)')
+    parser.add_argument('--manufacturer', default=None,
+                        help='Manufacturer name to scope the layout cache lookup')
+    parser.add_argument('--no-orient', action='store_true',
+                        help='Skip the orientation and skew pre-pass')
+    parser.add_argument('--quality', choices=['reject', 'flag', 'off'], default=None,
+                        help='Image quality gate mode (default: EASYOCR_QUALITY_GATE or reject)')
+    parser.add_argument('--multi', action='store_true',
+                        help='Shelf photo: read every label separately (see multi_label.py)')
+    return parser.parse_args(argv)
+
+
 if __name__ == '__main__':
-    if len(sys.argv) < 2:
+    args = parse_args(sys.argv[1:])
+
+    if not args.image_path:
         print(json.dumps({
             'success': False,
             'error': 'Image path required'
         }))
         sys.exit(1)
 
-    image_path = sys.argv[1]
-    result = process_image(image_path)
+    layout_cache = args.layout_cache_path
+    if layout_cache is None and args.layout_cache:
+        from layout_cache import DEFAULT_CACHE_PATH
+        layout_cache = DEFAULT_CACHE_PATH
+
+    orient = False if args.no_orient else None
+
+    result = None
+    socket_path = os.environ.get('EASYOCR_SOCKET')
+    if socket_path and not args.engine:
+        result = process_via_server(socket_path, args.image_path, args.manufacturer, orient, args.quality,
+                                    args.multi)
+    if result is None and args.multi:
+        from multi_label import process_shelf
+        result = process_shelf(args.image_path, args.engine)
+    if result is None:
+        result = process_image(args.image_path, args.engine, layout_cache, args.manufacturer, orient,
+                               args.quality)
     print(json.dumps(result))
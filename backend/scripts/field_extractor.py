@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Layout-aware field extraction from OCR tokens
+Turns the (box, text, confidence) tokens of one label into its fields using
+text patterns plus the relative size and position of every token:
+
+    code     largest digit group (typos like O/0 and I/1 repaired), preferring
+             the middle of the label and the leading groups of a line
+    price    amounts like 12,50 / €0.75 / 3.20 EUR (not '12.345', not 'Lote 2024.10')
+    name     tallest mostly-alphabetic line, preferring the top of the label
+    barcode  long digit runs (EAN/UPC, check digit verified when possible)
+             or small digits in the bottom band
+
+Digit groups on the same line (e.g. '100 002 10566') are merged before
+scoring, and every contiguous part of the line ('100 002', '002 10566') is a
+candidate as well.
+Every field carries a confidence and the box of its tokens, so the client
+does not need to re-parse raw_text or fall back to a Vision API.
+
+Usage:
+    python3 field_extractor.py <image_path> [--engine onnx]
+"""
+
+import re
+import sys
+import json
+
+CODE_MIN_DIGITS = 4
+CODE_MAX_DIGITS = 8
+BARCODE_LENGTHS = (8, 12, 13, 14)
+BOTTOM_BAND = 0.75             # tokens below this fraction of the label height
+MERGE_GAP = 0.8                # max gap between merged tokens, in line heights
+
+# Letters OCR confuses with digits, applied only inside digit-like tokens
+DIGIT_FIXES = str.maketrans({
+    'O': '0', 'o': '0', 'D': '0', 'Q': '0',
+    'I': '1', 'l': '1', 'i': '1', '|': '1',
+    'Z': '2', 'z': '2',
+    'S': '5', 's': '5',
+    'G': '6', 'b': '6',
+    'T': '7',
+    'B': '8',
+    'g': '9', 'q': '9',
+})
+# Digit boundaries keep dotted codes ('12.345') and dates out of the amount
+PRICE_PATTERN = re.compile(
+    r'(?:(?:€|EUR|\$)\s*)?(?<![\d.,])(\d{1,5})[.,](\d{2})(?![\d.,])(?:\s*(?:€|EUR|\$))?',
+    re.IGNORECASE
+)
+AMOUNT_PATTERN = re.compile(r'\d{1,5}[.,]\d{2}')
+CURRENCY_PATTERN = re.compile(r'€|EUR|\$', re.IGNORECASE)
+# Words announcing a number that is not a price ('Lote 2024.10', 'Ref. 12.50')
+NOT_PRICE_PATTERN = re.compile(r'\b(?:lote?|lot|ref|art|c[oó]d(?:igo)?|n[ºo°])\b\.?\s*$',
+                               re.IGNORECASE)
+LEADING_BONUS = 0.5            # code score bonus of groups starting a digit run
+
+
+def normalize_code(text):
+    """
+    Digits of a code-like token, repairing letter/digit confusions
+
+    Returns:
+        Digit string, or '' when the token is not a digit group
+    """
+    compact = re.sub(r'[\s\-_.]', '', text or '')
+    if not compact:
+        return ''
+    # Only repair tokens that already contain digits: 'SOS' stays text
+    if not any(ch.isdigit() for ch in compact):
+        return ''
+    fixed = compact.translate(DIGIT_FIXES)
+    return fixed if fixed.isdigit() else ''
+
+
+def make_token(result):
+    """Token dictionary from an EasyOCR (box, text, confidence) result"""
+    box, text, confidence = result[0], result[1], result[2]
+    points = [[int(round(float(x))), int(round(float(y)))] for x, y in box]
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return {
+        'text': text,
+        'confidence': round(float(confidence), 4),
+        'box': points,
+        'x0': min(xs), 'y0': min(ys), 'x1': max(xs), 'y1': max(ys),
+    }
+
+
+def public_token(token):
+    """Token as returned to the client"""
+    return {'text': token['text'], 'confidence': token['confidence'], 'box': token['box']}
+
+
+def group_lines(tokens):
+    """Tokens grouped into text lines by vertical overlap, left to right"""
+    lines = []
+    for token in sorted(tokens, key=lambda t: (t['y0'] + t['y1']) / 2.0):
+        center = (token['y0'] + token['y1']) / 2.0
+        for line in lines:
+            if line['y0'] <= center <= line['y1']:
+                line['tokens'].append(token)
+                line['y0'] = min(line['y0'], token['y0'])
+                line['y1'] = max(line['y1'], token['y1'])
+                break
+        else:
+            lines.append({'tokens': [token], 'y0': token['y0'], 'y1': token['y1']})
+    for line in lines:
+        line['tokens'].sort(key=lambda t: t['x0'])
+    return lines
+
+
+def merge_tokens(tokens):
+    """One token spanning several tokens of a line"""
+    text = ' '.join(t['text'] for t in tokens)
+    x0, y0 = min(t['x0'] for t in tokens), min(t['y0'] for t in tokens)
+    x1, y1 = max(t['x1'] for t in tokens), max(t['y1'] for t in tokens)
+    return {
+        'text': text,
+        'confidence': min(t['confidence'] for t in tokens),
+        'box': [[x0, y0], [x1, y0], [x1, y1], [x0, y1]],
+        'x0': x0, 'y0': y0, 'x1': x1, 'y1': y1,
+        'parts': tokens,
+    }
+
+
+def digit_groups(lines):
+    """
+    Code candidates: digit tokens plus every contiguous run of neighbouring
+    digit tokens of a line merged ('100 002 10566' offers '100 002', '002 10566'
+    and the whole run)
+
+    Returns:
+        [(token, leading)] where leading marks candidates starting their run
+    """
+    groups = []
+    for line in lines:
+        run = []
+        for token in line['tokens']:
+            if normalize_code(token['text']):
+                height = token['y1'] - token['y0']
+                if run and token['x0'] - run[-1]['x1'] <= MERGE_GAP * height:
+                    run.append(token)
+                    continue
+                if run:
+                    groups.append(run)
+                run = [token]
+            else:
+                if run:
+                    groups.append(run)
+                run = []
+        if run:
+            groups.append(run)
+
+    candidates = []
+    for run in groups:
+        for start in range(len(run)):
+            candidates.append((run[start], start == 0))
+            for end in range(start + 2, len(run) + 1):
+                candidates.append((merge_tokens(run[start:end]), start == 0))
+    return candidates
+
+
+def ean_checksum_ok(digits):
+    """GS1 check digit of an EAN-8/UPC-A/EAN-13/GTIN-14 code"""
+    if len(digits) not in BARCODE_LENGTHS:
+        return False
+    body, check = digits[:-1], int(digits[-1])
+    total = sum(int(d) * (3 if i % 2 == 0 else 1) for i, d in enumerate(reversed(body)))
+    return (10 - total % 10) % 10 == check
+
+
+def price_value(token, before=''):
+    """
+    Amount of a price token ('12.50'), or None
+
+    Args:
+        token: Token to read
+        before: Text preceding the token on its line
+    """
+    text = token['text']
+    match = PRICE_PATTERN.search(text)
+    if not match or NOT_PRICE_PATTERN.search(f'{before} {text[:match.start()]}'):
+        return None
+    # A token that could be a code only becomes a price when it reads as one
+    if normalize_code(text) and not CURRENCY_PATTERN.search(text) \
+            and not AMOUNT_PATTERN.fullmatch(text.strip()):
+        return None
+    return f'{int(match.group(1))}.{match.group(2)}'
+
+
+def field(value, token, score):
+    """Field entry returned to the client"""
+    return {
+        'value': value,
+        'text': token['text'],
+        'confidence': token['confidence'],
+        'score': round(score, 3),
+        'box': token['box'],
+    }
+
+
+def extract_fields(tokens):
+    """
+    Assign code, price, name and barcode from the tokens of one label
+
+    Args:
+        tokens: Tokens from make_token (or raw EasyOCR results)
+
+    Returns:
+        {'code': field or None, 'price': ..., 'name': ..., 'barcode': ...}
+        where a field is {'value', 'text', 'confidence', 'score', 'box'}
+    """
+    tokens = [t if isinstance(t, dict) else make_token(t) for t in tokens]
+    fields = {'code': None, 'price': None, 'name': None, 'barcode': None}
+    if not tokens:
+        return fields
+
+    # Positions relative to the extent of the text on the label
+    top = min(t['y0'] for t in tokens)
+    bottom = max(t['y1'] for t in tokens)
+    left = min(t['x0'] for t in tokens)
+    right = max(t['x1'] for t in tokens)
+    label_height = max(1, bottom - top)
+    label_width = max(1, right - left)
+    max_height = max(t['y1'] - t['y0'] for t in tokens) or 1
+
+    def relative(token):
+        height = (token['y1'] - token['y0']) / float(max_height)
+        center_y = ((token['y0'] + token['y1']) / 2.0 - top) / label_height
+        center_x = ((token['x0'] + token['x1']) / 2.0 - left) / label_width
+        return height, center_x, center_y
+
+    used = set()
+    lines = group_lines(tokens)
+
+    # Price: explicit amount pattern, currency symbol makes it certain
+    best = None
+    for line in lines:
+        before = ''
+        for token in line['tokens']:
+            value = price_value(token, before)
+            before = token['text']
+            if value is None:
+                continue
+            score = token['confidence'] + (1.0 if CURRENCY_PATTERN.search(token['text']) else 0.0)
+            if best is None or score > best[0]:
+                best = (score, token, value)
+    if best:
+        score, token, value = best
+        fields['price'] = field(value, token, score)
+        used.add(id(token))
+
+    # Code and barcode: digit groups scored by size, position and length
+    candidates = [(t, leading) for t, leading in digit_groups(lines) if id(t) not in used
+                  and not any(id(p) in used for p in t.get('parts', ()))]
+    barcode, code = None, None
+    for token, leading in candidates:
+        digits = normalize_code(token['text'])
+        height, center_x, center_y = relative(token)
+
+        if len(digits) > CODE_MAX_DIGITS or (center_y > BOTTOM_BAND and height < 0.6):
+            score = token['confidence'] + (1.0 if ean_checksum_ok(digits) else 0.0) \
+                + (0.5 if len(digits) >= CODE_MAX_DIGITS else 0.0) + 0.5 * center_y
+            if barcode is None or score > barcode[0]:
+                barcode = (score, token, digits)
+        if CODE_MIN_DIGITS <= len(digits) <= CODE_MAX_DIGITS:
+            centrality = 1.0 - abs(center_y - 0.45) - 0.5 * abs(center_x - 0.5)
+            score = 2.0 * height + token['confidence'] + 0.5 * centrality \
+                + (LEADING_BONUS if leading else 0.0)
+            if code is None or score > code[0]:
+                code = (score, token, digits)
+
+    if code:
+        score, token, digits = code
+        fields['code'] = field(digits, token, score)
+        used.update(id(p) for p in token.get('parts', [token]))
+    if barcode:
+        score, token, digits = barcode
+        parts = {id(p) for p in token.get('parts', [token])}
+        if not parts & used:
+            fields['barcode'] = field(digits, token, score)
+            used.update(parts)
+
+    # Name: tallest mostly-alphabetic line, preferring the top
+    best = None
+    for line in lines:
+        words = [t for t in line['tokens'] if id(t) not in used]
+        letters = sum(ch.isalpha() for t in words for ch in t['text'])
+        chars = sum(len(t['text'].replace(' ', '')) for t in words)
+        if not words or letters < 3 or letters < 0.6 * chars:
+            continue
+        token = merge_tokens(words) if len(words) > 1 else words[0]
+        height, _, center_y = relative(token)
+        score = 2.0 * height + token['confidence'] + 0.5 * (1.0 - center_y)
+        if best is None or score > best[0]:
+            best = (score, token)
+    if best:
+        score, token = best
+        fields['name'] = field(token['text'].strip(), token, score)
+
+    return fields
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Extract label fields from an image')
+    parser.add_argument('image_path')
+    parser.add_argument('--engine', choices=['pytorch', 'onnx'], default=None)
+    args = parser.parse_args()
+
+    from easyocr_process import process_image
+
+    result = process_image(args.image_path, args.engine)
+    print(json.dumps({'success': result['success'], 'fields': result.get('fields'),
+                      'error': result.get('error')}, indent=2, ensure_ascii=False))
+    return 0 if result['success'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
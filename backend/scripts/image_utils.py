@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Image loading helpers shared by the OCR scripts
+Accepts the same inputs as easyocr.Reader.readtext: a file path, encoded
+bytes or a numpy array.
+"""
+
+import numpy as np
+
+
+def load_image(image):
+    """Return (colour, greyscale) arrays for a path, bytes or ndarray"""
+    import cv2
+
+    if isinstance(image, str):
+        img = cv2.imread(image, cv2.IMREAD_COLOR)
+        if img is None:
+            raise ValueError(f'Could not read image: {image}')
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        return img, cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+    if isinstance(image, bytes):
+        img = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            raise ValueError('Could not decode image bytes')
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        return img, cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR), image
+    if image.shape[2] == 4:
+        image = image[:, :, :3]
+    return image, cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+def resize_area(grey, width, height):
+    """Downscale a greyscale image by area averaging"""
+    import cv2
+    return cv2.resize(grey, (width, height), interpolation=cv2.INTER_AREA)
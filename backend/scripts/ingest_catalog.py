@@ -0,0 +1,678 @@
+#!/usr/bin/env python3
+"""
+Bulk catalog ingestion for supplier price lists
+Streams supplier CSV/JSON files (hundreds of thousands of rows) into a new
+product catalog in bounded memory:
+
+    parse      csv.DictReader / incremental JSON decoding, column aliases
+               (codigo, referencia, sku, precio, pvp, proveedor...)
+    normalize  digit codes lose their separators ('12-345' -> '12345'), other
+               codes keep letters, digits, - and _; prices in 1.234,56 /
+               1,234.56 / 12,50 € formats
+    merge      rows are sorted in spilled runs of --chunk-rows and merged by
+               code; later files win field by field, locations are combined.
+               backend/data/products.json is merged first as the base
+    publish    the catalog is written to a new generation directory with a
+               sorted fixed-width code index, then catalog/current is switched
+               to it with an atomic symlink swap; readers keep using the
+               generation they opened
+
+Codes OCR reads as digits ('B-105' is read as 8105, see
+field_extractor.normalize_code) also get an alias index entry under the
+repaired digits. Rows are never merged through an alias: when the repaired
+key is already a real code, or two codes repair to the same key, the alias
+is dropped and counted in the manifest as a conflict.
+
+ProductService looks codes up in catalog/current/codes.idx when it exists.
+
+Usage:
+    python3 ingest_catalog.py ingest proveedor_a.csv proveedor_b.json [--supplier NAME]
+    python3 ingest_catalog.py lookup <code>
+    python3 ingest_catalog.py bench [--rows 1000000]
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import math
+import time
+import heapq
+import shutil
+import tempfile
+from datetime import datetime
+
+from field_extractor import normalize_code
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPT_DIR, '..', 'data')
+DEFAULT_BASE = os.path.join(DATA_DIR, 'products.json')
+DEFAULT_CATALOG_DIR = os.path.join(DATA_DIR, 'catalog')
+
+CHUNK_ROWS = 100000            # rows per sorted run (memory bound of a worker)
+BATCHES_IN_FLIGHT = 2          # queued batches per worker (bounds the rows held in memory)
+KEEP_GENERATIONS = 3           # published generations kept for open readers
+CODE_WIDTH = 40
+INDEX_RECORD = CODE_WIDTH + 12 + 10 + 1    # '<code:40><offset:12><length:10>\n'
+JSON_READ_SIZE = 1 << 20
+
+# Supplier column names accepted for each product field (lowercase)
+COLUMN_ALIASES = {
+    'code': ('code', 'codigo', 'código', 'cod', 'ref', 'referencia', 'reference', 'sku',
+             'article', 'articulo', 'artículo'),
+    'name': ('name', 'nombre', 'denominacion', 'denominación', 'title', 'titulo', 'título'),
+    'description': ('description', 'descripcion', 'descripción', 'desc'),
+    'price': ('price', 'precio', 'pvp', 'tarifa', 'unit_price'),
+    'stock': ('stock', 'existencias', 'qty', 'quantity', 'cantidad'),
+    'locations': ('locations', 'location', 'ubicacion', 'ubicación', 'ubicaciones'),
+    'supplier': ('supplier', 'proveedor', 'vendor'),
+    'category': ('category', 'categoria', 'categoría', 'familia', 'family'),
+}
+CURRENCY = re.compile(r'[€$£\s]|EUR|USD', re.IGNORECASE)
+NOT_CODE = re.compile(r'[^A-Za-z0-9\-_]')
+SEPARATORS = re.compile(r'[\s\-_.]')
+LIST_SEPARATOR = re.compile(r'\s*[|;]\s*')
+ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+
+
+def catalog_code(raw):
+    """
+    Catalog key of a supplier code
+
+    Digit codes lose their separators ('12-345' -> '12345'); other codes
+    keep their letters, digits, '-' and '_' ('B-105' stays 'B-105').
+    """
+    raw = str(raw or '').strip()
+    if raw.isdigit() and raw.isascii():
+        return raw
+    digits = SEPARATORS.sub('', raw)
+    if digits.isdigit() and digits.isascii():
+        return digits
+    return NOT_CODE.sub('', raw)
+
+
+def repaired_code(code):
+    """Digit key OCR reads for an alphanumeric catalog key ('B-105' -> '8105'), or None"""
+    if SEPARATORS.sub('', code).isdigit():
+        return None
+    digits = normalize_code(code)
+    return digits if digits and digits.isascii() else None
+
+
+def finite(number):
+    """number, or None for NaN and infinities (not valid JSON)"""
+    return number if math.isfinite(number) else None
+
+
+def parse_price(value):
+    """Price as float from '12,50', '1.234,56', '1,234.56', '€0.75'... (None if empty or not finite)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return finite(float(value))
+    try:
+        return finite(round(float(value), 4))
+    except ValueError:
+        pass
+    text = CURRENCY.sub('', str(value))
+    if ',' in text and '.' in text:
+        decimal = ',' if text.rfind(',') > text.rfind('.') else '.'
+        text = text.replace('.' if decimal == ',' else ',', '').replace(decimal, '.')
+    else:
+        text = text.replace(',', '.')
+    try:
+        return finite(round(float(text), 4))
+    except ValueError:
+        return None
+
+
+def parse_stock(value):
+    if value is None or value == '':
+        return None
+    try:
+        return int(float(str(value).replace(',', '.')))
+    except (ValueError, OverflowError):
+        return None
+
+
+def column_map(columns):
+    """Product field of each supplier column"""
+    mapping = {}
+    for column in columns:
+        name = str(column or '').strip().lower()
+        for field, aliases in COLUMN_ALIASES.items():
+            if name in aliases and field not in mapping.values():
+                mapping[column] = field
+                break
+    return mapping
+
+
+def location_list(value):
+    """
+    Locations of a supplier value: a list, a 'A-3 | B-1' string or a single
+    scalar such as a shelf number; other values are dropped
+    """
+    if isinstance(value, str):
+        items = LIST_SEPARATOR.split(value)
+    elif isinstance(value, (list, tuple)):
+        items = value
+    else:
+        items = [value]
+    locations = []
+    for item in items:
+        if isinstance(item, bool) or not isinstance(item, (str, int, float)):
+            continue
+        if isinstance(item, float) and not math.isfinite(item):
+            continue
+        item = str(item).strip()
+        if item and item not in locations:
+            locations.append(item)
+    return locations
+
+
+def normalize_row(row, mapping, supplier=None):
+    """
+    Product record of one supplier row
+
+    Args:
+        row: Row dict, or list of CSV values when mapping holds column indexes
+        mapping: {column name or index: product field} from column_map
+
+    Returns:
+        Product dict, or None when the row has no usable code
+    """
+    product = {}
+    for column, field in mapping.items():
+        try:
+            value = row[column]
+        except (KeyError, IndexError):
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, float) and not math.isfinite(value):
+            continue                # NaN/Infinity from JSON sources
+        if value is not None and value != '':
+            product[field] = value
+
+    raw_code = str(product.get('code', ''))
+    code = catalog_code(raw_code)
+    if not code or len(code) > CODE_WIDTH:
+        return None
+    product['code'] = code
+    if raw_code != code:
+        product['supplier_code'] = raw_code
+    if 'price' in product:
+        product['price'] = parse_price(product['price'])
+        if product['price'] is None:
+            del product['price']
+    if 'stock' in product:
+        product['stock'] = parse_stock(product['stock'])
+        if product['stock'] is None:
+            del product['stock']
+    if 'locations' in product:
+        product['locations'] = location_list(product['locations'])
+        if not product['locations']:
+            del product['locations']
+    if supplier and 'supplier' not in product:
+        product['supplier'] = supplier
+    return product
+
+
+def iter_json_items(f):
+    """
+    Items of a JSON array, or of the first array of a document such as
+    {"products": [...]}, decoded incrementally in bounded memory
+    """
+    decoder = json.JSONDecoder()
+    buffer, position = '', 0
+    while True:
+        chunk = f.read(JSON_READ_SIZE)
+        if not chunk:
+            return
+        buffer += chunk
+        start = buffer.find('[')
+        if start >= 0:
+            position = start + 1
+            break
+
+    while True:
+        # Skip separators, then decode one item (reading more when it is cut)
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position >= len(buffer):
+            buffer, position = f.read(JSON_READ_SIZE), 0
+            if not buffer:
+                return
+            continue
+        if buffer[position] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = f.read(JSON_READ_SIZE)
+            if not chunk:
+                raise
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        yield item
+        position = end
+        if position > JSON_READ_SIZE:
+            buffer, position = buffer[position:], 0
+
+
+def iter_json_lines(f):
+    """Items of a JSON Lines file"""
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_batches(path, supplier, batch_rows):
+    """
+    Raw rows of one supplier file (.csv, .json, .jsonl/.ndjson) in batches
+
+    Yields:
+        (header, rows, supplier) where rows are CSV value lists for a header,
+        or JSON items when header is None
+    """
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            sample = f.read(65536)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=',;\t|')
+            except csv.Error:
+                dialect = csv.excel
+            reader = csv.reader(f, dialect)
+            header = next(reader, [])
+            rows = []
+            for row in reader:
+                rows.append(row)
+                if len(rows) >= batch_rows:
+                    yield header, rows, supplier
+                    rows = []
+            if rows:
+                yield header, rows, supplier
+        return
+
+    with open(path, encoding='utf-8-sig') as f:
+        items = iter_json_lines(f) if path.lower().endswith(('.jsonl', '.ndjson')) else iter_json_items(f)
+        rows = []
+        for item in items:
+            rows.append(item)
+            if len(rows) >= batch_rows:
+                yield None, rows, supplier
+                rows = []
+        if rows:
+            yield None, rows, supplier
+
+
+def spill_batch(job):
+    """
+    Normalize one batch of rows and write it as a sorted run file
+
+    Args:
+        job: (run path, first row order, header, rows, supplier)
+
+    Returns:
+        (run path, rows, rejected)
+    """
+    path, first, header, rows, supplier = job
+    if header is not None:
+        names = column_map(header)
+        mapping = {header.index(column): field for column, field in names.items()}
+    else:
+        columns = {}
+        for item in rows:
+            if isinstance(item, dict):
+                columns.update(dict.fromkeys(item))
+        mapping = column_map(columns)
+
+    records, count, rejected = [], 0, 0
+    for order, row in enumerate(rows, first):
+        count += 1
+        product = normalize_row(row, mapping, supplier) if isinstance(row, (dict, list)) else None
+        if product is None:
+            rejected += 1
+            continue
+        records.append((product['code'], order,
+                        ENCODER.encode(product)))
+    records.sort()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(f'{code}\t{order:012d}\t{line}\n' for code, order, line in records)
+    return path, count, rejected
+
+
+def spill_batches(jobs, workers):
+    """
+    Run spill_batch over the jobs, holding at most BATCHES_IN_FLIGHT batches
+    per worker: Pool.imap would drain the whole jobs generator up front
+
+    Returns:
+        spill_batch results in job order
+    """
+    if workers <= 1:
+        return [spill_batch(job) for job in jobs]
+
+    import threading
+    import multiprocessing
+
+    slots = threading.BoundedSemaphore(BATCHES_IN_FLIGHT * workers)
+    release = lambda _: slots.release()
+    pending = []
+    pool = multiprocessing.Pool(workers)
+    try:
+        for job in jobs:
+            slots.acquire()
+            pending.append(pool.apply_async(spill_batch, (job,), callback=release,
+                                            error_callback=release))
+        results = [result.get() for result in pending]
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
+def merge_products(records):
+    """One product from the records of a code, in priority order"""
+    product = {}
+    for record in records:
+        for field, value in record.items():
+            if field == 'locations':
+                seen = product.setdefault('locations', [])
+                seen.extend(v for v in value if v not in seen)
+            else:
+                product[field] = value
+    return product
+
+
+def merged_catalog(runs):
+    """
+    Merged products in code order from sorted run files
+
+    Yields:
+        (code, product JSON); codes seen once keep their JSON as written
+    """
+    files = [open(path, encoding='utf-8') for path in runs]
+    try:
+        code, records = None, []
+        for line in heapq.merge(*files):
+            line_code, _, record = line.rstrip('\n').split('\t', 2)
+            if line_code != code and records:
+                yield code, merged_json(records)
+                records = []
+            code = line_code
+            records.append(record)
+        if records:
+            yield code, merged_json(records)
+    finally:
+        for f in files:
+            f.close()
+
+
+def merged_json(records):
+    if len(records) == 1:
+        return records[0]
+    product = merge_products(json.loads(record) for record in records)
+    return ENCODER.encode(product)
+
+
+def index_record(code, offset, length):
+    return b'%-40s%12d%10d\n' % (code.encode('ascii'), offset, length)
+
+
+def write_generation(products, directory):
+    """
+    Write products.jsonl (sorted by code) and its fixed-width code index,
+    with the repaired-digit aliases merged into the index
+
+    Returns:
+        (products written, aliases indexed, alias conflicts)
+    """
+    count = offset = 0
+    aliases = {}            # only codes made of digits and OCR-confusable letters
+    primary_path = os.path.join(directory, 'codes.idx.primary')
+    with open(os.path.join(directory, 'products.jsonl'), 'wb', buffering=1 << 20) as data, \
+            open(primary_path, 'wb', buffering=1 << 20) as primary:
+        for code, product in products:
+            line = product.encode('utf-8') + b'\n'
+            data.write(line)
+            primary.write(index_record(code, offset, len(line)))
+            alias = repaired_code(code)
+            if alias is not None:
+                aliases.setdefault(alias, []).append((offset, len(line)))
+            offset += len(line)
+            count += 1
+        data.flush()
+        os.fsync(data.fileno())
+
+    # Merge join of the sorted primary index with the sorted aliases
+    pending = sorted(aliases.items())
+    written = conflicts = position = 0
+    with open(primary_path, 'rb') as primary, \
+            open(os.path.join(directory, 'codes.idx'), 'wb', buffering=1 << 20) as index:
+        def flush_aliases(before=None):
+            nonlocal position, written, conflicts
+            while position < len(pending) and (before is None or pending[position][0] < before):
+                alias, targets = pending[position]
+                position += 1
+                if len(targets) > 1:
+                    conflicts += 1          # several codes repair to the same key
+                    continue
+                index.write(index_record(alias, *targets[0]))
+                written += 1
+
+        for record in iter(lambda: primary.read(INDEX_RECORD), b''):
+            code = record[:CODE_WIDTH].rstrip().decode('ascii')
+            flush_aliases(code)
+            if position < len(pending) and pending[position][0] == code:
+                conflicts += 1              # the repaired key is a real code
+                position += 1
+            index.write(record)
+        flush_aliases()
+        index.flush()
+        os.fsync(index.fileno())
+    os.remove(primary_path)
+    return count, written, conflicts
+
+
+def publish(catalog_dir, generation, keep=KEEP_GENERATIONS):
+    """Point catalog/current at a generation with an atomic symlink swap"""
+    link = os.path.join(catalog_dir, 'current')
+    tmp_link = f'{link}.tmp.{os.getpid()}'
+    os.symlink(os.path.join('generations', generation), tmp_link)
+    os.replace(tmp_link, link)
+
+    generations_dir = os.path.join(catalog_dir, 'generations')
+    for old in sorted(os.listdir(generations_dir))[:-keep]:
+        if old != generation:
+            shutil.rmtree(os.path.join(generations_dir, old), ignore_errors=True)
+
+
+def ingest(paths, catalog_dir=DEFAULT_CATALOG_DIR, base=DEFAULT_BASE, supplier=None,
+           chunk_rows=CHUNK_ROWS, keep=KEEP_GENERATIONS, dry_run=False, workers=None):
+    """
+    Build and publish a catalog generation from supplier files
+
+    Args:
+        paths: Supplier files, lowest priority first
+        catalog_dir: Directory holding generations/ and the current symlink
+        base: Hand-maintained products.json merged first (None to skip)
+        supplier: Supplier name for rows without one
+        chunk_rows: Rows per sorted run (bounds the memory of each worker)
+        keep: Published generations to keep
+        dry_run: Build the generation but do not publish it
+        workers: Worker processes normalizing batches (default: CPU count)
+
+    Returns:
+        Manifest dict (rows, rejected, products, duplicates merged, alias
+        conflicts, seconds...)
+    """
+    start = time.perf_counter()
+    sources = ([base] if base and os.path.exists(base) else []) + list(paths)
+    generations_dir = os.path.join(catalog_dir, 'generations')
+    os.makedirs(generations_dir, exist_ok=True)
+    generation = datetime.now().strftime('%Y%m%dT%H%M%S%f') + f'-{os.getpid()}'
+    building = tempfile.mkdtemp(prefix='.building-', dir=catalog_dir)
+
+    try:
+        with tempfile.TemporaryDirectory(prefix='.runs-', dir=catalog_dir) as work_dir:
+            def jobs():
+                first = 0
+                for path in sources:
+                    name = supplier or (None if path == base
+                                        else os.path.splitext(os.path.basename(path))[0])
+                    for header, rows, name in iter_batches(path, name, chunk_rows):
+                        run = os.path.join(work_dir, f'run-{first:012d}.txt')
+                        yield run, first, header, rows, name
+                        first += len(rows)
+
+            spilled = spill_batches(jobs(), workers or os.cpu_count() or 1)
+            runs = [path for path, _, _ in spilled]
+            rows = sum(count for _, count, _ in spilled)
+            rejected = sum(r for _, _, r in spilled)
+            products, aliases, conflicts = write_generation(merged_catalog(runs), building)
+
+        manifest = {
+            'generation': generation,
+            'sources': [os.path.basename(p) for p in sources],
+            'rows': rows,
+            'rejected': rejected,
+            'products': products,
+            'merged': rows - rejected - products,
+            'aliases': aliases,
+            'conflicts': conflicts,
+            'runs': len(runs),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        }
+        with open(os.path.join(building, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.chmod(building, 0o755)
+        os.rename(building, os.path.join(generations_dir, generation))
+    except BaseException:
+        shutil.rmtree(building, ignore_errors=True)
+        raise
+
+    if not dry_run:
+        publish(catalog_dir, generation, keep)
+    manifest['published'] = not dry_run
+    manifest['seconds'] = round(time.perf_counter() - start, 2)
+    return manifest
+
+
+def lookup(code, catalog_dir=DEFAULT_CATALOG_DIR):
+    """Product of a code in the published catalog (binary search of codes.idx)"""
+    directory = os.path.realpath(os.path.join(catalog_dir, 'current'))
+    key = catalog_code(code)
+    try:
+        index = open(os.path.join(directory, 'codes.idx'), 'rb')
+    except FileNotFoundError:
+        return None
+    with index:
+        low, high = 0, os.fstat(index.fileno()).st_size // INDEX_RECORD
+        while low < high:
+            middle = (low + high) // 2
+            index.seek(middle * INDEX_RECORD)
+            record = index.read(INDEX_RECORD)
+            found = record[:CODE_WIDTH].rstrip().decode('ascii')
+            if found == key:
+                offset, length = int(record[CODE_WIDTH:CODE_WIDTH + 12]), int(record[CODE_WIDTH + 12:-1])
+                with open(os.path.join(directory, 'products.jsonl'), 'rb') as data:
+                    data.seek(offset)
+                    return json.loads(data.read(length))
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+    return None
+
+
+def write_synthetic_csv(path, rows, seed=0):
+    """Supplier-like CSV with duplicate codes and European number formats"""
+    import random
+
+    rng = random.Random(seed)
+    codes = max(1, int(rows * 0.8))
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow(['Referencia', 'Denominación', 'PVP', 'Existencias', 'Familia'])
+        for _ in range(rows):
+            code = rng.randrange(codes)
+            writer.writerow([f'{code:07d}', f'Artículo {code}', f'{rng.randrange(1, 100000) / 100:.2f}'
+                             .replace('.', ','), rng.randrange(1000), f'Familia {code % 40}'])
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Ingest supplier price lists into the catalog')
+    parser.add_argument('command', choices=['ingest', 'lookup', 'bench'])
+    parser.add_argument('paths', nargs='*', help='Supplier files (ingest) or a code (lookup)')
+    parser.add_argument('--catalog-dir', default=DEFAULT_CATALOG_DIR)
+    parser.add_argument('--base', default=DEFAULT_BASE, help='Hand-maintained products.json')
+    parser.add_argument('--no-base', action='store_true', help='Do not merge the base products.json')
+    parser.add_argument('--supplier', default=None, help='Supplier for rows without one')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--keep', type=int, default=KEEP_GENERATIONS)
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPUs)')
+    parser.add_argument('--dry-run', action='store_true', help='Build without publishing')
+    parser.add_argument('--rows', type=int, default=1000000, help='Benchmark rows')
+    args = parser.parse_args()
+
+    if args.command == 'lookup':
+        if not args.paths:
+            parser.error('lookup needs a code')
+        product = lookup(args.paths[0], args.catalog_dir)
+        print(json.dumps(product, indent=2, ensure_ascii=False))
+        return 0 if product else 1
+
+    if args.command == 'bench':
+        work = tempfile.mkdtemp(prefix='ingest_bench_')
+        try:
+            source = os.path.join(work, 'proveedor.csv')
+            write_synthetic_csv(source, args.rows)
+            manifest = ingest([source], os.path.join(work, 'catalog'), base=None,
+                              chunk_rows=args.chunk_rows, workers=args.workers)
+            print("=" * 70)
+            print(f"Catalog ingestion benchmark ({args.rows} rows)")
+            print("=" * 70)
+            print(f"  • {manifest['products']} products, {manifest['merged']} merged, "
+                  f"{manifest['runs']} runs")
+            print(f"  • {manifest['seconds']:.2f} s ({args.rows / manifest['seconds']:.0f} rows/s)")
+            start = time.perf_counter()
+            for code in range(0, 1000):
+                lookup(f'{code * 617:07d}', os.path.join(work, 'catalog'))
+            print(f"  • lookup: {(time.perf_counter() - start):.3f} ms avg")
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+        return 0
+
+    if not args.paths:
+        parser.error('ingest needs at least one supplier file')
+    try:
+        manifest = ingest(args.paths, args.catalog_dir, None if args.no_base else args.base,
+                          args.supplier, args.chunk_rows, args.keep, args.dry_run, args.workers)
+    except (OSError, ValueError, csv.Error) as e:
+        print(f"✗ Ingestion failed: {e}", file=sys.stderr)
+        return 1
+
+    print("=" * 70)
+    print(f"✓ Catalog generation {manifest['generation']}"
+          f"{' published' if manifest['published'] else ' built (dry run)'}")
+    print("=" * 70)
+    print(f"  • Rows read: {manifest['rows']} ({manifest['rejected']} without a usable code)")
+    print(f"  • Products: {manifest['products']} ({manifest['merged']} duplicate rows merged)")
+    if manifest['conflicts']:
+        print(f"  • Conflicts: {manifest['conflicts']} repaired codes clash with other codes, "
+              f"kept apart")
+    print(f"  • Time: {manifest['seconds']:.2f} s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Learned label-template layout cache
+Most labels come from a few manufacturers printing to a fixed layout. The
+cache fingerprints the label template (difference hash + aspect ratio) and
+remembers the normalized text-box geometry that detection found before. On a
+confident match only the recognizer runs on the known boxes; on a miss, or
+when the recognizer is not confident on the cached boxes, full CRAFT
+detection runs and the template is learned.
+
+The cache file is only rewritten when a template is learned or dropped, and
+then merged under a lock with what other workers wrote. Hit counters and
+stats are batched in memory and merged every FLUSH_LOOKUPS lookups (or on
+flush()), so a cache hit never touches the disk.
+
+Usage:
+    python3 layout_cache.py stats [--cache PATH]
+    python3 layout_cache.py clear [--cache PATH]
+"""
+
+import os
+import sys
+import json
+import time
+import fcntl
+
+import numpy as np
+
+from image_utils import load_image, resize_area
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    'EASYOCR_LAYOUT_CACHE',
+    os.path.join(os.path.expanduser('~'), '.EasyOCR', 'layout_cache.json')
+)
+
+HASH_SIZE = 16                 # 16x16 difference hash = 256 bits
+MAX_HAMMING_DISTANCE = 40      # out of 256 bits
+MAX_ASPECT_DELTA = 0.08        # relative aspect-ratio difference
+MIN_HIT_CONFIDENCE = 0.45      # mean recognizer confidence to accept a hit
+MIN_LEARN_CONFIDENCE = 0.6     # mean confidence required to store a template
+MAX_TEMPLATES = 200
+STATS_KEYS = ('lookups', 'hits', 'misses', 'fallbacks', 'detections', 'detection_seconds')
+FLUSH_LOOKUPS = 100            # lookups between writes of the batched counters
+
+
+def fingerprint(img_grey):
+    """
+    Template fingerprint of a greyscale label image
+
+    Returns:
+        (packed difference hash as uint8 array, aspect ratio)
+    """
+    small = resize_area(img_grey, HASH_SIZE + 1, HASH_SIZE).astype(np.int16)
+    bits = small[:, 1:] > small[:, :-1]
+    height, width = img_grey.shape[:2]
+    return np.packbits(bits.reshape(-1)), width / float(height)
+
+
+def hamming_distances(hashes, query):
+    """Hamming distance between each row of hashes and query"""
+    return np.unpackbits(np.bitwise_xor(hashes, query), axis=1).sum(axis=1)
+
+
+def normalize_boxes(horizontal_list, free_list, width, height):
+    """Convert pixel boxes to fractions of the image size"""
+    horizontal = [
+        [box[0] / width, box[1] / width, box[2] / height, box[3] / height]
+        for box in horizontal_list
+    ]
+    free = [[[float(x) / width, float(y) / height] for x, y in box] for box in free_list]
+    return horizontal, free
+
+
+def denormalize_boxes(horizontal, free, width, height):
+    """Convert normalized boxes back to pixel boxes for an image size"""
+    horizontal_list = [
+        [int(round(b[0] * width)), int(round(b[1] * width)),
+         int(round(b[2] * height)), int(round(b[3] * height))]
+        for b in horizontal
+    ]
+    free_list = [[[x * width, y * height] for x, y in box] for box in free]
+    return horizontal_list, free_list
+
+
+def mean_confidence(results):
+    """Mean confidence of (box, text, confidence) results"""
+    return sum(r[2] for r in results) / len(results) if results else 0.0
+
+
+class LayoutCache:
+    """Persistent cache of label templates and their text-box geometry"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_distance=MAX_HAMMING_DISTANCE):
+        self.path = path
+        self.max_distance = max_distance
+        self.templates = []
+        self.mtime = None
+        self.stats = dict.fromkeys(STATS_KEYS, 0)
+        # Local changes not yet merged into the cache file
+        self.pending_stats = {}
+        self.pending_hits = {}      # template hash -> (hits, last_used)
+        self.learned = []
+        self.removed = set()
+        self.load()
+
+    def read(self):
+        """(templates, stats) stored in the cache file"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return [], {}
+        return data.get('templates', []), data.get('stats', {})
+
+    def load(self):
+        try:
+            self.mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        templates, stats = self.read()
+        self.templates = [t for t in templates if t['hash'] not in self.removed] + self.learned
+        self.stats = dict.fromkeys(STATS_KEYS, 0)
+        self.stats.update(stats)
+        for key, amount in self.pending_stats.items():
+            self.stats[key] += amount
+
+    def refresh(self):
+        """Reload templates learned by other processes"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self.mtime:
+            self.load()
+
+    def count(self, key, amount=1):
+        self.stats[key] += amount
+        self.pending_stats[key] = self.pending_stats.get(key, 0) + amount
+
+    def flush(self):
+        """
+        Merge local changes into the cache file: read-modify-write under a
+        lock, so templates and counters from other workers are kept
+        """
+        if not (self.pending_stats or self.pending_hits or self.learned or self.removed):
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(f'{self.path}.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            templates, stats = self.read()
+
+            by_hash = {t['hash']: t for t in templates if t['hash'] not in self.removed}
+            for template in self.learned:
+                by_hash[template['hash']] = template
+            learned = {id(t) for t in self.learned}     # their hits are counted already
+            for key, (hits, last_used) in self.pending_hits.items():
+                template = by_hash.get(key)
+                if template is not None and id(template) not in learned:
+                    template['hits'] += hits
+                    template['last_used'] = max(template['last_used'], last_used)
+            templates = sorted(by_hash.values(), key=lambda t: (t['hits'], t['last_used']), reverse=True)
+            del templates[MAX_TEMPLATES:]
+
+            merged = dict.fromkeys(STATS_KEYS, 0)
+            merged.update(stats)
+            for key, amount in self.pending_stats.items():
+                merged[key] += amount
+
+            tmp_path = f'{self.path}.tmp.{os.getpid()}'
+            with open(tmp_path, 'w') as f:
+                json.dump({'templates': templates, 'stats': merged}, f)
+            os.replace(tmp_path, self.path)
+            self.mtime = os.stat(self.path).st_mtime_ns
+
+        self.templates, self.stats = templates, merged
+        self.pending_stats, self.pending_hits = {}, {}
+        self.learned, self.removed = [], set()
+
+    def flush_if_due(self):
+        """Write the batched counters once FLUSH_LOOKUPS lookups piled up"""
+        if self.pending_stats.get('lookups', 0) >= FLUSH_LOOKUPS:
+            self.flush()
+
+    def match(self, img_grey, manufacturer=None):
+        """Return the best matching template or None"""
+        if not self.templates:
+            return None
+
+        query, aspect = fingerprint(img_grey)
+        candidates = [
+            t for t in self.templates
+            if (manufacturer is None or t.get('manufacturer') in (None, manufacturer))
+            and abs(t['aspect'] - aspect) / t['aspect'] <= MAX_ASPECT_DELTA
+        ]
+        if not candidates:
+            return None
+
+        hashes = np.array([np.frombuffer(bytes.fromhex(t['hash']), dtype=np.uint8) for t in candidates])
+        distances = hamming_distances(hashes, query)
+        best = int(distances.argmin())
+        if distances[best] > self.max_distance:
+            return None
+        return candidates[best]
+
+    def learn(self, img_grey, horizontal_list, free_list, manufacturer=None):
+        """Store the detected geometry for this label's template"""
+        height, width = img_grey.shape[:2]
+        query, aspect = fingerprint(img_grey)
+        horizontal, free = normalize_boxes(horizontal_list, free_list, width, height)
+        template = {
+            'hash': query.tobytes().hex(),
+            'aspect': aspect,
+            'manufacturer': manufacturer,
+            'horizontal': horizontal,
+            'free': free,
+            'hits': 0,
+            'last_used': time.time(),
+        }
+        self.templates.append(template)
+        self.learned.append(template)
+
+    def readtext(self, reader, image, manufacturer=None):
+        """
+        EasyOCR-compatible readtext that skips detection on known templates
+
+        Args:
+            reader: easyocr.Reader or OnnxReader (detect / recognize API)
+            image: Path, bytes or ndarray
+            manufacturer: Optional manufacturer name to scope the lookup
+
+        Returns:
+            (results, info) where info reports 'hit', 'miss' or 'fallback'
+        """
+        img, img_grey = load_image(image)
+        height, width = img_grey.shape[:2]
+        self.refresh()
+        self.count('lookups')
+
+        template = self.match(img_grey, manufacturer)
+        if template is not None:
+            horizontal_list, free_list = denormalize_boxes(
+                template['horizontal'], template['free'], width, height
+            )
+            results = reader.recognize(img_grey, horizontal_list, free_list)
+            if results and mean_confidence(results) >= MIN_HIT_CONFIDENCE:
+                now = time.time()
+                template['hits'] += 1
+                template['last_used'] = now
+                hits, _ = self.pending_hits.get(template['hash'], (0, now))
+                self.pending_hits[template['hash']] = (hits + 1, now)
+                self.count('hits')
+                self.flush_if_due()
+                return results, {'layout_cache': 'hit'}
+            # Template matched but boxes do not read well: relearn it
+            self.templates.remove(template)
+            if template in self.learned:
+                self.learned.remove(template)
+            else:
+                self.removed.add(template['hash'])
+            self.count('fallbacks')
+        else:
+            self.count('misses')
+
+        start = time.perf_counter()
+        horizontal_list, free_list = reader.detect(img)
+        horizontal_list, free_list = horizontal_list[0], free_list[0]
+        self.count('detections')
+        self.count('detection_seconds', time.perf_counter() - start)
+
+        results = reader.recognize(img_grey, horizontal_list, free_list)
+        if results and mean_confidence(results) >= MIN_LEARN_CONFIDENCE:
+            self.learn(img_grey, horizontal_list, free_list, manufacturer)
+        if self.learned or self.removed:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+        return results, {'layout_cache': 'fallback' if template is not None else 'miss'}
+
+    def report(self):
+        """Hit rate and estimated detection time saved"""
+        lookups = self.stats['lookups']
+        detections = self.stats['detections']
+        mean_detection = self.stats['detection_seconds'] / detections if detections else 0.0
+        return {
+            'templates': len(self.templates),
+            'lookups': lookups,
+            'hits': self.stats['hits'],
+            'misses': self.stats['misses'],
+            'fallbacks': self.stats['fallbacks'],
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+            'mean_detection_ms': mean_detection * 1000,
+            'detection_seconds_saved': self.stats['hits'] * mean_detection,
+        }
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Label layout cache')
+    parser.add_argument('command', choices=['stats', 'clear'])
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'clear':
+        if os.path.exists(args.cache):
+            os.remove(args.cache)
+        print(json.dumps({'success': True}))
+        return 0
+
+    print(json.dumps(LayoutCache(args.cache).report(), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
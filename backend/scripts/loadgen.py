@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Offline load generator for the OCR entry point
+Replays label images against easyocr_process.py, either as one subprocess per
+request (what the PHP backend does) or over the ocr_server.py socket, to find
+where the deployment saturates:
+
+    - open loop: requests arrive at fixed Poisson rates whatever the latency,
+      and latency is measured from the scheduled arrival time, so queueing
+      is not hidden (--rates 1 2 4 8)
+    - concurrency ramp: N clients send back-to-back requests
+      (--concurrency 1 2 4 8)
+    - mixed traffic: a share of the arrivals are bulk jobs of several images
+      sent back to back (--bulk-share 0.2 --bulk-size 10); latency is reported
+      per traffic class
+
+Every stage reports achieved throughput, latency percentiles, error and
+timeout rates and host CPU, memory and load sampled from /proc, which gives
+the latency-versus-throughput curve. Nothing leaves the machine.
+
+Usage:
+    python3 loadgen.py --target socket --rates 1 2 4 8 --duration 30
+    python3 loadgen.py --target subprocess --concurrency 1 2 4 --duration 60
+    python3 loadgen.py --target socket --rates 2 4 --bulk-share 0.2 --json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark_engines import DEFAULT_IMAGES, percentile
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROCESS_SCRIPT = os.path.join(SCRIPT_DIR, 'easyocr_process.py')
+SAMPLE_INTERVAL = 0.5          # seconds between host resource samples
+MAX_IN_FLIGHT = 256            # open-loop requests running at once
+SATURATION_THROUGHPUT = 0.9    # completed/arrived rate below this means saturated
+SATURATION_LATENCY = 3.0       # p95 this many times the first stage's p95 means saturated
+
+
+# ---------------------------------------------------------------------------
+# Targets
+# ---------------------------------------------------------------------------
+
+class SubprocessTarget:
+    """One easyocr_process.py invocation per request"""
+
+    def __init__(self, engine=None, timeout=120, script=PROCESS_SCRIPT):
+        self.command = [sys.executable, script]
+        self.engine = engine
+        self.timeout = timeout
+        # Always run in-process, never through a running server
+        self.env = {k: v for k, v in os.environ.items() if k != 'EASYOCR_SOCKET'}
+
+    def __call__(self, image_path):
+        command = self.command + [image_path]
+        if self.engine:
+            command += ['--engine', self.engine]
+        result = subprocess.run(command, capture_output=True, text=True,
+                                timeout=self.timeout, env=self.env)
+        try:
+            return json.loads(result.stdout.strip().splitlines()[-1])
+        except (ValueError, IndexError):
+            return {'success': False, 'error': (result.stderr or 'No output').strip()[-200:]}
+
+
+class SocketTarget:
+    """Requests to a running ocr_server.py"""
+
+    def __init__(self, socket_path, timeout=120):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def __call__(self, image_path):
+        from ocr_server import request_ocr
+        return request_ocr(self.socket_path, {'image_path': os.path.abspath(image_path)},
+                           timeout=self.timeout)
+
+
+def send(target, images):
+    """
+    Run one interactive request (one image) or bulk job (several images)
+
+    Returns:
+        (ok, error) for the whole job
+    """
+    for image_path in images:
+        try:
+            result = target(image_path)
+        except subprocess.TimeoutExpired:
+            return False, 'timeout'
+        except OSError as e:
+            return False, 'timeout' if 'timed out' in str(e) else str(e)
+        if not result.get('success'):
+            return False, result.get('error_code') or result.get('error') or 'failed'
+    return True, None
+
+
+# ---------------------------------------------------------------------------
+# Host resources
+# ---------------------------------------------------------------------------
+
+def read_cpu_times():
+    """(busy, total) jiffies of all CPUs from /proc/stat"""
+    with open('/proc/stat') as f:
+        fields = [int(v) for v in f.readline().split()[1:]]
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+    return sum(fields) - idle, sum(fields)
+
+
+def read_memory_mb():
+    """Used memory (total - available) in MB from /proc/meminfo"""
+    info = {}
+    with open('/proc/meminfo') as f:
+        for line in f:
+            key, value = line.split(':', 1)
+            info[key] = int(value.split()[0])
+    return (info['MemTotal'] - info.get('MemAvailable', info.get('MemFree', 0))) / 1024.0
+
+
+class ResourceSampler:
+    """Background sampling of host CPU, memory and load average"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.samples = []
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        busy, total = read_cpu_times()
+        while not self.stopped.wait(self.interval):
+            new_busy, new_total = read_cpu_times()
+            elapsed = new_total - total
+            self.samples.append({
+                'cpu_percent': 100.0 * (new_busy - busy) / elapsed if elapsed else 0.0,
+                'memory_mb': read_memory_mb(),
+                'load1': os.getloadavg()[0],
+            })
+            busy, total = new_busy, new_total
+
+    def stop(self):
+        """Stop sampling and summarize"""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        if not self.samples:
+            return {}
+        cpu = [s['cpu_percent'] for s in self.samples]
+        return {
+            'cpu_mean_percent': sum(cpu) / len(cpu),
+            'cpu_max_percent': max(cpu),
+            'memory_max_mb': max(s['memory_mb'] for s in self.samples),
+            'load1_max': max(s['load1'] for s in self.samples),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Traffic
+# ---------------------------------------------------------------------------
+
+class Traffic:
+    """Seeded choice of images and traffic class for every request"""
+
+    def __init__(self, images, seed=0, bulk_share=0.0, bulk_size=10):
+        if not images:
+            raise ValueError('No images to replay')
+        self.images = list(images)
+        self.rng = random.Random(seed)
+        self.bulk_share = bulk_share
+        self.bulk_size = bulk_size
+        self.lock = threading.Lock()
+
+    def next_job(self):
+        """(traffic class, image paths) of the next request"""
+        with self.lock:
+            if self.bulk_share and self.rng.random() < self.bulk_share:
+                return 'bulk', [self.rng.choice(self.images) for _ in range(self.bulk_size)]
+            return 'interactive', [self.rng.choice(self.images)]
+
+    def gap(self, rate):
+        """Seconds to the next Poisson arrival"""
+        with self.lock:
+            return self.rng.expovariate(rate)
+
+
+def summarize(records, elapsed, resources, offered=None):
+    """Latency, throughput and error summary of one stage"""
+    def latency_stats(items):
+        latencies = [r['latency_ms'] for r in items]
+        return {
+            'requests': len(items),
+            'errors': sum(not r['ok'] for r in items),
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'p99_ms': percentile(latencies, 99),
+            'max_ms': max(latencies) if latencies else 0.0,
+        }
+
+    summary = latency_stats(records)
+    errors = {}
+    for record in records:
+        if not record['ok']:
+            errors[record['error']] = errors.get(record['error'], 0) + 1
+    summary.update(
+        offered_rps=offered,
+        throughput_rps=len(records) / elapsed if elapsed else 0.0,
+        images_per_second=sum(r['images'] for r in records) / elapsed if elapsed else 0.0,
+        error_rate=summary['errors'] / len(records) if records else 0.0,
+        timeouts=errors.get('timeout', 0),
+        error_kinds=errors,
+        elapsed_seconds=elapsed,
+        classes={name: latency_stats([r for r in records if r['class'] == name])
+                 for name in sorted({r['class'] for r in records})},
+        resources=resources,
+    )
+    return summary
+
+
+def run_job(target, traffic_class, images, scheduled):
+    ok, error = send(target, images)
+    return {
+        'class': traffic_class,
+        'images': len(images),
+        'ok': ok,
+        'error': error,
+        'latency_ms': (time.perf_counter() - scheduled) * 1000,
+    }
+
+
+def open_loop_stage(target, traffic, rate, duration, max_in_flight=MAX_IN_FLIGHT):
+    """
+    Poisson arrivals at a fixed rate for `duration` seconds
+
+    Latency runs from the scheduled arrival, so time spent waiting for a free
+    slot counts (no coordinated omission).
+    """
+    sampler = ResourceSampler()
+    sampler.start()
+    start = time.perf_counter()
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        arrival = start
+        while True:
+            arrival += traffic.gap(rate)
+            if arrival - start >= duration:
+                break
+            delay = arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            traffic_class, images = traffic.next_job()
+            futures.append(pool.submit(run_job, target, traffic_class, images, arrival))
+        records = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+    summary = summarize(records, elapsed, sampler.stop(), offered=rate)
+    # Compare with the arrivals actually drawn, not the nominal rate, so
+    # Poisson noise in short stages does not look like saturation
+    summary['arrival_rps'] = len(records) / duration
+    return summary
+
+
+def closed_loop_stage(target, traffic, concurrency, duration):
+    """`concurrency` clients sending back-to-back requests for `duration` seconds"""
+    records = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        while time.perf_counter() < deadline:
+            traffic_class, images = traffic.next_job()
+            record = run_job(target, traffic_class, images, time.perf_counter())
+            with lock:
+                records.append(record)
+
+    sampler = ResourceSampler()
+    sampler.start()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = summarize(records, time.perf_counter() - start, sampler.stop())
+    summary['concurrency'] = concurrency
+    return summary
+
+
+def mark_saturation(stages):
+    """Flag stages that could not keep up with their arrivals or whose p95 blew up"""
+    baseline = stages[0]['p95_ms'] if stages else None
+    for stage in stages:
+        reasons = []
+        if stage.get('arrival_rps') and stage['throughput_rps'] < SATURATION_THROUGHPUT * stage['arrival_rps']:
+            reasons.append('throughput')
+        if baseline and stage['p95_ms'] and stage['p95_ms'] > SATURATION_LATENCY * baseline:
+            reasons.append('latency')
+        if stage['error_rate'] > 0.01:
+            reasons.append('errors')
+        stage['saturated'] = reasons
+    return next((stage for stage in stages if stage['saturated']), None)
+
+
+def run_load(target, traffic, rates=None, concurrency=None, duration=30.0, warmup=2,
+             progress=None):
+    """
+    Run the open-loop rates and/or concurrency ramp
+
+    Returns:
+        {'stages': [...], 'saturation': first saturated stage or None}
+    """
+    for _ in range(warmup):
+        send(target, traffic.next_job()[1])
+
+    stages = []
+    for rate in rates or []:
+        stage = open_loop_stage(target, traffic, rate, duration)
+        stage['mode'] = 'open'
+        stages.append(stage)
+        if progress:
+            progress(stage)
+    open_stages = list(stages)
+    for level in concurrency or []:
+        stage = closed_loop_stage(target, traffic, level, duration)
+        stage['mode'] = 'closed'
+        stages.append(stage)
+        if progress:
+            progress(stage)
+
+    saturation = mark_saturation(open_stages) if open_stages else None
+    closed_stages = [s for s in stages if s['mode'] == 'closed']
+    if closed_stages:
+        saturation = saturation or mark_saturation(closed_stages)
+    return {'stages': stages, 'saturation': saturation}
+
+
+def corpus_images(corpus):
+    """Image paths of a generate_corpus.py corpus (directory layout)"""
+    paths = []
+    with open(os.path.join(corpus, 'manifest.jsonl'), encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if 'archive' in record:
+                raise ValueError('Tar corpora are not supported, generate the corpus without --tar')
+            paths.append(os.path.join(corpus, record['path']))
+    return paths
+
+
+def stage_label(stage):
+    if stage['mode'] == 'open':
+        return f"{stage['offered_rps']:g} req/s"
+    return f"{stage['concurrency']} clients"
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Offline load generator for the OCR entry point')
+    parser.add_argument('images', nargs='*', default=DEFAULT_IMAGES)
+    parser.add_argument('--corpus', default=None, help='Corpus directory with a manifest.jsonl')
+    parser.add_argument('--target', choices=['subprocess', 'socket'], default='socket')
+    parser.add_argument('--socket', default=os.environ.get('EASYOCR_SOCKET', '/tmp/easyocr.sock'))
+    parser.add_argument('--engine', choices=['pytorch', 'onnx'], default=None,
+                        help='Engine of the subprocess target')
+    parser.add_argument('--rates', nargs='*', type=float, default=None, help='Open-loop arrival rates (req/s)')
+    parser.add_argument('--concurrency', nargs='*', type=int, default=None, help='Closed-loop client counts')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds per stage')
+    parser.add_argument('--bulk-share', type=float, default=0.0, help='Fraction of arrivals that are bulk jobs')
+    parser.add_argument('--bulk-size', type=int, default=10, help='Images per bulk job')
+    parser.add_argument('--timeout', type=float, default=120.0, help='Per-request timeout in seconds')
+    parser.add_argument('--warmup', type=int, default=2, help='Requests sent before measuring')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='Print raw JSON results')
+    args = parser.parse_args()
+
+    if not args.rates and not args.concurrency:
+        args.rates = [0.5, 1, 2, 4]
+
+    images = corpus_images(args.corpus) if args.corpus else args.images
+    traffic = Traffic(images, args.seed, args.bulk_share, args.bulk_size)
+    if args.target == 'socket':
+        target = SocketTarget(args.socket, args.timeout)
+    else:
+        target = SubprocessTarget(args.engine, args.timeout)
+
+    header = f"{'stage':<14}{'thru/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'cpu %':>7}{'mem MB':>8}"
+
+    def progress(stage):
+        if args.json:
+            return
+        if progress.first:
+            print("=" * 70)
+            print(f"OCR load test ({args.target}, {len(images)} images, {args.duration:g} s per stage)")
+            print("=" * 70)
+            print(header)
+            progress.first = False
+        resources = stage['resources']
+        print(f"{stage_label(stage):<14}{stage['throughput_rps']:>8.2f}{stage['p50_ms']:>9.0f}"
+              f"{stage['p95_ms']:>9.0f}{stage['p99_ms']:>9.0f}{stage['error_rate']:>8.1%}"
+              f"{resources.get('cpu_mean_percent', 0):>7.0f}{resources.get('memory_max_mb', 0):>8.0f}",
+              flush=True)
+    progress.first = True
+
+    result = run_load(target, traffic, args.rates, args.concurrency, args.duration, args.warmup, progress)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+
+    saturation = result['saturation']
+    print()
+    if saturation:
+        print(f"✗ Saturated at {stage_label(saturation)} ({', '.join(saturation['saturated'])})")
+    else:
+        print("✓ No saturation in the tested range")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Multi-label mode: every label of a shelf or pallet photo in one pass
+Instead of one joined raw_text for the whole frame, the photo is split into
+label regions and every label gets its own code, fields and catalog match:
+
+    1. one text detection over the whole image (CRAFT runs once, not per label)
+    2. label regions: bright rectangles found by contours, and text boxes
+       outside any rectangle clustered by proximity
+    3. one recognition call over the text boxes of every label, batched
+    4. tokens grouped back per label, field_extractor.py on each group and
+       a lookup in the published catalog (ingest_catalog.py) or products.json
+
+Detection dominates the cost of a single-label request, so N labels cost one
+detection plus one larger recognition batch instead of N full requests
+('bench' measures both on the same photo).
+
+Usage:
+    python3 multi_label.py read <image_path> [--engine onnx]
+    python3 multi_label.py bench <image_path> [--engine onnx] [--repeat 3]
+    python3 multi_label.py bench --synthetic 8 [--engine onnx]
+"""
+
+import os
+import sys
+import json
+import time
+
+MIN_LABEL_AREA = 0.004         # label rectangles below this fraction of the frame are noise
+MAX_LABEL_AREA = 0.8           # a rectangle this large is the frame itself (single label)
+MIN_RECTANGULARITY = 0.75      # contour area / bounding box area of a label
+CLUSTER_GAP = 1.5              # max gap between boxes of one label, in line heights
+LABEL_PADDING = 0.25           # padding around clustered labels, in line heights
+RECOGNITION_BATCH = 32         # crops per recognizer forward pass (pytorch engine)
+
+
+def box_of(points):
+    """[x_min, x_max, y_min, y_max] of a free-form box (4 points)"""
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return [int(min(xs)), int(max(xs)), int(min(ys)), int(max(ys))]
+
+
+def center_of(box):
+    return (box[0] + box[1]) / 2.0, (box[2] + box[3]) / 2.0
+
+
+def contains(region, x, y):
+    return region[0] <= x <= region[1] and region[2] <= y <= region[3]
+
+
+def label_regions(grey):
+    """
+    Bright rectangles (paper labels) of a shelf photo
+
+    Returns:
+        [x_min, x_max, y_min, y_max] regions, empty when the photo holds a
+        single label or the labels do not stand out from the background
+    """
+    import cv2
+    import numpy as np
+
+    height, width = grey.shape[:2]
+    blurred = cv2.GaussianBlur(grey, (5, 5), 0)
+    _, mask = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    kernel = np.ones((5, 5), np.uint8)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    frame = float(height * width)
+    regions = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        area = w * h
+        if not MIN_LABEL_AREA * frame <= area <= MAX_LABEL_AREA * frame:
+            continue
+        if cv2.contourArea(contour) < MIN_RECTANGULARITY * area:
+            continue
+        regions.append([x, x + w, y, y + h])
+    return regions
+
+
+def split_boxes(horizontal_list, regions):
+    """Cut detection lines that run across neighbouring labels at the label edges"""
+    if not regions:
+        return horizontal_list
+    boxes = []
+    for box in horizontal_list:
+        y = (box[2] + box[3]) / 2.0
+        pieces = [[max(box[0], r[0]), min(box[1], r[1]), box[2], box[3]]
+                  for r in regions if r[2] <= y <= r[3] and box[0] < r[1] and r[0] < box[1]]
+        if len(pieces) > 1:
+            boxes.extend(p for p in pieces if p[1] - p[0] > 1)
+        else:
+            boxes.append(box)
+    return boxes
+
+
+def cluster_boxes(boxes, gap=CLUSTER_GAP):
+    """
+    Group text boxes whose extents, grown by gap line heights, overlap
+
+    Returns:
+        Lists of indexes into boxes, one list per cluster
+    """
+    parent = list(range(len(boxes)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    grown = []
+    for box in boxes:
+        margin = gap * max(1, box[3] - box[2])
+        grown.append((box[0] - margin, box[1] + margin, box[2] - margin, box[3] + margin))
+
+    for i in range(len(boxes)):
+        for j in range(i + 1, len(boxes)):
+            a, b = grown[i], grown[j]
+            if a[0] <= b[1] and b[0] <= a[1] and a[2] <= b[3] and b[2] <= a[3]:
+                parent[find(i)] = find(j)
+
+    clusters = {}
+    for i in range(len(boxes)):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
+
+
+def assign_labels(boxes, regions, width, height):
+    """
+    Label extent and member boxes for every label in the photo
+
+    Returns:
+        [{'box': [x_min, x_max, y_min, y_max], 'members': [box indexes]}, ...]
+    """
+    labels = [{'box': list(region), 'members': []} for region in regions]
+    loose = []
+    for i, box in enumerate(boxes):
+        x, y = center_of(box)
+        for label in labels:
+            if contains(label['box'], x, y):
+                label['members'].append(i)
+                break
+        else:
+            loose.append(i)
+
+    for cluster in cluster_boxes([boxes[i] for i in loose]):
+        members = [loose[i] for i in cluster]
+        line = min(boxes[i][3] - boxes[i][2] for i in members)
+        pad = int(LABEL_PADDING * line)
+        labels.append({
+            'box': [
+                max(0, min(boxes[i][0] for i in members) - pad),
+                min(width, max(boxes[i][1] for i in members) + pad),
+                max(0, min(boxes[i][2] for i in members) - pad),
+                min(height, max(boxes[i][3] for i in members) + pad),
+            ],
+            'members': members,
+        })
+
+    return [label for label in labels if label['members']]
+
+
+def reading_order(labels):
+    """Labels sorted shelf row by shelf row, left to right"""
+    from field_extractor import group_lines
+
+    rows = group_lines([
+        {'x0': l['box'][0], 'x1': l['box'][1], 'y0': l['box'][2], 'y1': l['box'][3], 'label': l}
+        for l in labels
+    ])
+    rows.sort(key=lambda row: row['y0'])
+    return [item['label'] for row in rows for item in row['tokens']]
+
+
+def recognize_kwargs(reader):
+    """Batch size argument for readers that recognize one crop at a time by default"""
+    import inspect
+
+    try:
+        parameters = inspect.signature(reader.recognize).parameters
+    except (TypeError, ValueError):
+        return {}
+    return {'batch_size': RECOGNITION_BATCH} if 'batch_size' in parameters else {}
+
+
+class CatalogMatcher:
+    """Product lookup in the published catalog, then in products.json"""
+
+    def __init__(self, catalog_dir=None, products_path=None):
+        from ingest_catalog import DEFAULT_CATALOG_DIR, DEFAULT_BASE
+
+        self.catalog_dir = catalog_dir or DEFAULT_CATALOG_DIR
+        self.products_path = products_path or DEFAULT_BASE
+        self.products = {}
+        self.mtime = None
+
+    def base_products(self):
+        """products.json by normalized code, reloaded when the file changes"""
+        try:
+            mtime = os.path.getmtime(self.products_path)
+        except OSError:
+            mtime = None
+        if mtime != self.mtime:
+            from ingest_catalog import catalog_code
+
+            self.products, self.mtime = {}, mtime
+            try:
+                with open(self.products_path, encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            for product in data.get('products', []):
+                self.products.setdefault(catalog_code(product.get('code')), product)
+        return self.products
+
+    def match(self, code):
+        if not code:
+            return None
+        from ingest_catalog import lookup, catalog_code
+
+        product = lookup(code, self.catalog_dir)
+        if product is None:
+            product = self.base_products().get(catalog_code(code))
+        return product
+
+
+def read_labels(reader, image, matcher=None, engine=None):
+    """
+    Read every label of a shelf photo with one detection and one recognition call
+
+    Args:
+        reader: easyocr.Reader or OnnxReader (detect / recognize API)
+        image: Path, bytes or ndarray
+        matcher: CatalogMatcher, or None to skip the catalog lookup
+
+    Returns:
+        {'success', 'engine', 'count', 'labels': [{'index', 'box', 'code',
+        'fields', 'tokens', 'raw_text', 'confidence', 'product'}], 'timings'}
+        with boxes as 4 points in image pixels
+    """
+    from image_utils import load_image
+    from field_extractor import make_token, public_token, extract_fields
+
+    start = time.perf_counter()
+    img, grey = load_image(image)
+    height, width = grey.shape[:2]
+
+    horizontal_list, free_list = reader.detect(img)
+    horizontal_list, free_list = horizontal_list[0], free_list[0]
+    detected = time.perf_counter()
+
+    regions = label_regions(grey)
+    horizontal_list = split_boxes(horizontal_list, regions)
+    boxes = list(horizontal_list) + [box_of(points) for points in free_list]
+    labels = assign_labels(boxes, regions, width, height) if boxes else []
+    segmented = time.perf_counter()
+
+    # One batched recognition over the text of every label
+    results = reader.recognize(grey, horizontal_list, free_list, **recognize_kwargs(reader)) \
+        if boxes else []
+    recognized = time.perf_counter()
+
+    # Results are matched back by position, recognizers may reorder crops
+    members = [[] for _ in labels]
+    for result in results:
+        token = make_token(result)
+        x, y = (token['x0'] + token['x1']) / 2.0, (token['y0'] + token['y1']) / 2.0
+        for index, label in enumerate(labels):
+            if contains(label['box'], x, y):
+                members[index].append(token)
+                break
+
+    for label, tokens in zip(labels, members):
+        label['tokens'] = sorted(tokens, key=lambda t: (t['y0'], t['x0']))
+
+    output = []
+    for index, label in enumerate(reading_order([l for l in labels if l['tokens']])):
+        tokens = label['tokens']
+        fields = extract_fields(tokens)
+        code = fields['code']['value'] if fields['code'] else None
+        x0, x1, y0, y1 = (int(v) for v in label['box'])
+        output.append({
+            'index': index,
+            'box': [[x0, y0], [x1, y0], [x1, y1], [x0, y1]],
+            'code': code,
+            'fields': fields,
+            'tokens': [public_token(token) for token in tokens],
+            'raw_text': ' '.join(token['text'] for token in tokens).strip(),
+            'confidence': round(sum(t['confidence'] for t in tokens) / len(tokens), 4),
+            'product': matcher.match(code) if matcher is not None else None,
+        })
+
+    return {
+        'success': True,
+        'mode': 'multi',
+        'engine': engine,
+        'count': len(output),
+        'labels': output,
+        'timings': {
+            'detect_ms': round((detected - start) * 1000, 1),
+            'segment_ms': round((segmented - detected) * 1000, 1),
+            'recognize_ms': round((recognized - segmented) * 1000, 1),
+            'total_ms': round((time.perf_counter() - start) * 1000, 1),
+            'boxes': len(boxes),
+        },
+    }
+
+
+def run_multi(reader, image_path, engine, matcher=None, max_side=None):
+    """read_labels with the error handling of easyocr_process.run_reader"""
+    try:
+        image = image_path
+        if max_side:
+            from image_utils import load_image
+            from easyocr_process import limit_size
+            image = limit_size(load_image(image_path)[0], max_side)
+        return read_labels(reader, image, matcher, engine)
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+
+def process_shelf(image_path, engine=None, catalog_dir=None):
+    """Load the reader like easyocr_process.process_image and read every label"""
+    from easyocr_process import load_profile, load_reader, ENGINES
+
+    try:
+        profile = load_profile()
+        engine = engine or os.environ.get('EASYOCR_ENGINE') or profile.get('engine', 'pytorch')
+        if engine not in ENGINES:
+            raise ValueError(f'Unknown engine: {engine}')
+        reader = load_reader(engine, profile.get('languages'))
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+    return run_multi(reader, image_path, engine, CatalogMatcher(catalog_dir), profile.get('max_side'))
+
+
+def synthetic_shelf(labels, seed=0):
+    """
+    Shelf photo with the given number of printed labels on a dark background
+
+    Returns:
+        (RGB image, [codes]) codes in reading order
+    """
+    import random
+    import cv2
+    import numpy as np
+
+    rng = random.Random(seed)
+    columns = min(labels, 4)
+    rows = (labels + columns - 1) // columns
+    label_w, label_h, gap = 300, 170, 60
+    image = np.full((rows * (label_h + gap) + gap, columns * (label_w + gap) + gap, 3), 70, np.uint8)
+
+    codes = []
+    for i in range(labels):
+        x = gap + (i % columns) * (label_w + gap)
+        y = gap + (i // columns) * (label_h + gap)
+        code = str(rng.randint(10000, 99999))
+        codes.append(code)
+        cv2.rectangle(image, (x, y), (x + label_w, y + label_h), (250, 250, 245), -1)
+        cv2.putText(image, 'TORNILLO M8', (x + 20, y + 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (20, 20, 20), 2)
+        cv2.putText(image, code, (x + 40, y + 110), cv2.FONT_HERSHEY_SIMPLEX, 2.0, (0, 0, 0), 4)
+        cv2.putText(image, f'{rng.randint(1, 99)},{rng.randint(0, 99):02d} EUR', (x + 20, y + 150),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (20, 20, 20), 2)
+    return image, codes
+
+
+def benchmark(reader, image, repeat=3):
+    """
+    Multi-label pass against one full single-label request per label crop
+
+    Returns:
+        {'labels', 'multi_ms', 'separate_ms', 'speedup'} with the best of
+        repeat runs of each
+    """
+    from image_utils import load_image
+
+    img, _ = load_image(image)
+    result = read_labels(reader, img)
+
+    crops = []
+    for label in result['labels']:
+        (x0, y0), _, (x1, y1), _ = label['box']
+        crops.append(img[y0:y1, x0:x1].copy())
+
+    multi, separate = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        read_labels(reader, img)
+        multi.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for crop in crops:
+            reader.readtext(crop)
+        separate.append(time.perf_counter() - start)
+
+    multi_ms, separate_ms = min(multi) * 1000, min(separate) * 1000
+    return {
+        'labels': result['count'],
+        'codes': [label['code'] for label in result['labels']],
+        'multi_ms': round(multi_ms, 1),
+        'separate_ms': round(separate_ms, 1),
+        'speedup': round(separate_ms / multi_ms, 2) if multi_ms else None,
+    }
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Read every label of a shelf photo')
+    parser.add_argument('command', choices=['read', 'bench'])
+    parser.add_argument('image_path', nargs='?')
+    parser.add_argument('--engine', choices=['pytorch', 'onnx'], default=None)
+    parser.add_argument('--catalog', default=None, help='Published catalog directory')
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help='bench: draw a shelf with this many labels instead of a photo')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == 'read':
+        if not args.image_path:
+            parser.error('read needs an image path')
+        result = process_shelf(args.image_path, args.engine, args.catalog)
+        print(json.dumps(result, ensure_ascii=False))
+        return 0 if result['success'] else 1
+
+    from easyocr_process import load_profile, load_reader
+
+    profile = load_profile()
+    engine = args.engine or os.environ.get('EASYOCR_ENGINE') or profile.get('engine', 'pytorch')
+    if args.synthetic:
+        image, codes = synthetic_shelf(args.synthetic)
+    elif args.image_path:
+        image, codes = args.image_path, None
+    else:
+        parser.error('bench needs an image path or --synthetic N')
+
+    reader = load_reader(engine, profile.get('languages'))
+    report = benchmark(reader, image, args.repeat)
+
+    print("=" * 70)
+    print(f"Multi-label benchmark ({engine}): {report['labels']} labels")
+    print("=" * 70)
+    print(f"  • one multi-label pass:      {report['multi_ms']:>9.1f} ms")
+    print(f"  • one request per label:     {report['separate_ms']:>9.1f} ms")
+    print(f"  • speedup:                   {report['speedup']}x")
+    if codes is not None:
+        found = sum(code in report['codes'] for code in codes)
+        mark = '✓' if found == len(codes) else '✗'
+        print(f"  {mark} codes read: {found}/{len(codes)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Pre-forked EasyOCR worker server
+Loads the OCR models once in the parent process, then forks the workers so
+every worker shares the model memory copy-on-write. Workers accept requests
+on a Unix socket using newline-delimited JSON:
+
+    request:  {"image_path": "/abs/path/to/image.jpg"}
+    response: same JSON as easyocr_process.py
+
+With "multi": true the request reads every label of a shelf photo and
+answers like multi_label.py.
+
+Usage:
+    python3 ocr_server.py --socket /tmp/easyocr.sock --workers 4 [--engine onnx]
+    python3 ocr_server.py --socket /tmp/easyocr.sock --shared-weights   # mmap mode
+    python3 ocr_server.py --socket /tmp/easyocr.sock --no-preload       # private copies
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import signal
+import socket
+
+DEFAULT_SOCKET = os.environ.get('EASYOCR_SOCKET', '/tmp/easyocr.sock')
+REQUEST_TIMEOUT = 120
+
+
+# ---------------------------------------------------------------------------
+# Protocol helpers
+# ---------------------------------------------------------------------------
+
+def send_message(conn, message):
+    """Send one JSON message terminated by a newline"""
+    conn.sendall(json.dumps(message).encode('utf-8') + b'\n')
+
+
+def recv_message(conn, limit=1 << 20):
+    """Receive one newline-terminated JSON message"""
+    chunks = []
+    size = 0
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        if chunk.endswith(b'\n') or size > limit:
+            break
+    data = b''.join(chunks).strip()
+    if not data:
+        raise ConnectionError('Empty message')
+    return json.loads(data.decode('utf-8'))
+
+
+def request_ocr(socket_path, payload, timeout=REQUEST_TIMEOUT):
+    """Send a request to a running server and return its response"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(timeout)
+        conn.connect(socket_path)
+        send_message(conn, payload)
+        return recv_message(conn)
+
+
+# ---------------------------------------------------------------------------
+# Memory reporting
+# ---------------------------------------------------------------------------
+
+def process_memory(pid):
+    """
+    Memory usage of a process from /proc/<pid>/smaps_rollup in MB
+
+    PSS divides shared pages between the processes mapping them, so the sum
+    of PSS over all workers is the real memory cost of the pool.
+    """
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[-1] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024.0
+
+    shared = fields.get('Shared_Clean', 0.0) + fields.get('Shared_Dirty', 0.0)
+    private = fields.get('Private_Clean', 0.0) + fields.get('Private_Dirty', 0.0)
+    return {
+        'pid': pid,
+        'rss_mb': round(fields.get('Rss', 0.0), 1),
+        'pss_mb': round(fields.get('Pss', 0.0), 1),
+        'shared_mb': round(shared, 1),
+        'private_mb': round(private, 1),
+    }
+
+
+def memory_report(pids):
+    """Per-worker memory plus pool totals"""
+    workers = [process_memory(pid) for pid in pids]
+    return {
+        'workers': workers,
+        'total_rss_mb': round(sum(w['rss_mb'] for w in workers), 1),
+        'total_pss_mb': round(sum(w['pss_mb'] for w in workers), 1),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class OCRServer:
+    """Pre-fork server: parent loads models, workers serve the socket"""
+
+    def __init__(self, socket_path, workers=2, engine=None, preload=True,
+                 shared_weights=None, status_file=None):
+        self.socket_path = socket_path
+        self.num_workers = workers
+        self.preload = preload
+        self.shared_weights = shared_weights
+        self.status_file = status_file
+        self.reader = None
+        self.sock = None
+        self.children = {}
+        self.running = True
+        from easyocr_process import load_profile
+        self.profile = load_profile()
+        self.engine = engine or os.environ.get('EASYOCR_ENGINE') or self.profile.get('engine', 'pytorch')
+
+    def load(self):
+        from easyocr_process import load_reader
+        return load_reader(self.engine, self.profile.get('languages'),
+                           shared_weights=self.shared_weights)
+
+    def warm_up(self, reader):
+        """Run one inference so lazily allocated buffers exist before forking"""
+        import numpy as np
+        reader.readtext(np.full((64, 256, 3), 255, dtype=np.uint8))
+
+    def bind(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+        self.sock.listen(128)
+
+    def spawn_worker(self):
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            code = 0
+            try:
+                self.worker_main(ready_w)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+
+        os.close(ready_w)
+        self.children[pid] = ready_r
+        return pid
+
+    def worker_main(self, ready_fd):
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+        reader = self.reader
+        if reader is None:
+            reader = self.load()
+            self.warm_up(reader)
+        state = self.request_state()
+
+        os.write(ready_fd, b'1')
+        os.close(ready_fd)
+
+        while True:
+            conn, _ = self.sock.accept()
+            with conn:
+                self.serve_connection(conn, reader, state)
+
+    def request_state(self):
+        """Layout cache, quality gates and profile defaults used by requests"""
+        from easyocr_process import load_layout_cache, load_quality_gate, auto_orient_enabled
+        from multi_label import CatalogMatcher
+
+        return {
+            'layout_cache': load_layout_cache(),
+            'catalog': CatalogMatcher(),
+            'quality_gates': {None: load_quality_gate()},
+            'orient': auto_orient_enabled(self.profile.get('orient', True)),
+            'max_side': self.profile.get('max_side'),
+        }
+
+    def serve_connection(self, conn, reader, state):
+        """Answer one request on an accepted connection"""
+        from easyocr_process import run_reader, load_quality_gate
+
+        try:
+            conn.settimeout(REQUEST_TIMEOUT)
+            request = recv_message(conn)
+            if request.get('command') == 'ping':
+                response = {'success': True, 'pid': os.getpid(), 'engine': self.engine}
+            elif request.get('multi'):
+                from multi_label import run_multi
+                response = run_multi(reader, request['image_path'], self.engine,
+                                     state['catalog'], state['max_side'])
+            else:
+                quality_gates = state['quality_gates']
+                quality = request.get('quality')
+                if quality not in quality_gates:
+                    quality_gates[quality] = load_quality_gate(quality)
+                orient = request.get('orient')
+                response = run_reader(
+                    reader, request['image_path'], self.engine,
+                    state['layout_cache'], request.get('manufacturer'),
+                    state['orient'] if orient is None else orient,
+                    quality_gates[quality], state['max_side']
+                )
+            send_message(conn, response)
+        except Exception as e:
+            try:
+                send_message(conn, {'success': False, 'error': str(e)})
+            except OSError:
+                pass
+
+    def wait_ready(self):
+        for pid, ready_fd in list(self.children.items()):
+            if ready_fd is not None:
+                os.read(ready_fd, 1)
+                os.close(ready_fd)
+                self.children[pid] = None
+
+    def write_status(self):
+        if not self.status_file:
+            return
+        status = {
+            'pid': os.getpid(),
+            'workers': sorted(self.children),
+            'engine': self.engine,
+            'preload': self.preload,
+            'shared_weights': self.shared_weights,
+            'socket': self.socket_path,
+        }
+        tmp_path = f'{self.status_file}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(status, f)
+        os.replace(tmp_path, self.status_file)
+
+    def stop(self, *_):
+        self.running = False
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def serve_forever(self):
+        if self.preload:
+            self.reader = self.load()
+            self.warm_up(self.reader)
+            # Keep the GC from touching (and un-sharing) objects created so far
+            gc.collect()
+            gc.freeze()
+
+        self.bind()
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        for _ in range(self.num_workers):
+            self.spawn_worker()
+        self.wait_ready()
+        self.write_status()
+
+        try:
+            while self.children:
+                try:
+                    pid, _ = os.wait()
+                except ChildProcessError:
+                    break
+                except InterruptedError:
+                    continue
+                self.children.pop(pid, None)
+                if self.running:
+                    time.sleep(0.1)
+                    self.spawn_worker()
+                    self.wait_ready()
+                    self.write_status()
+        finally:
+            self.sock.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Pre-forked EasyOCR worker server')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--engine', choices=['pytorch', 'onnx'], default=None,
+                        help='OCR engine (default: EASYOCR_ENGINE, the tuned profile or pytorch)')
+    parser.add_argument('--no-preload', action='store_true',
+                        help='Load a private model copy in every worker')
+    parser.add_argument('--shared-weights', nargs='?', const='default', default=None,
+                        help='Map packed weights shared by all workers (pytorch engine)')
+    parser.add_argument('--status-file', default=None,
+                        help='Write server and worker pids as JSON once workers are ready')
+    parser.add_argument('--memory-report', action='store_true',
+                        help='Print per-worker memory of a running server (reads --status-file)')
+    args = parser.parse_args()
+
+    if args.memory_report:
+        with open(args.status_file) as f:
+            status = json.load(f)
+        print(json.dumps(memory_report(status['workers']), indent=2))
+        return 0
+
+    shared_weights = args.shared_weights
+    if shared_weights == 'default':
+        from shared_weights import default_weights_path
+        shared_weights = default_weights_path()
+
+    server = OCRServer(
+        args.socket,
+        workers=args.workers,
+        engine=args.engine,
+        preload=not args.no_preload,
+        shared_weights=shared_weights,
+        status_file=args.status_file,
+    )
+    server.serve_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
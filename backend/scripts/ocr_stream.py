@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Continuous camera-stream scanning
+Takes a sequence of frames from a live camera (or a video file) and runs OCR
+only when the camera has settled on a label:
+
+    1. Every frame is reduced to a tiny greyscale thumbnail; frames that
+       barely differ from the previous one are dropped without further work.
+    2. Large differences mean the camera is moving; the current stable
+       window ends there.
+    3. While the view is stable the sharpest frame is kept, and once the
+       window has lasted long enough OCR runs on that frame only, once per
+       window.
+
+Results are yielded as they are produced, so a handheld can show a code as
+soon as it is read.
+
+Usage:
+    python3 ocr_stream.py <video_file|frames_dir> [--engine onnx] [--fps 30]
+"""
+
+import os
+import sys
+import json
+import time
+
+import numpy as np
+
+from image_utils import load_image, resize_area
+from quality import laplacian_variance
+
+THUMB_SIZE = (64, 48)          # width, height of the frame-difference thumbnail
+SHARPNESS_SIDE = 320           # longest side used to score sharpness
+UNCHANGED_DIFF = 1.0           # mean abs grey difference of a duplicate frame
+MOTION_DIFF = 3.0              # mean abs grey difference of a moving camera
+STABLE_FRAMES = 4              # steady frames before OCR runs on the sharpest one
+
+
+class FrameSelector:
+    """Pick the sharpest frame of every stable window"""
+
+    def __init__(self, unchanged_diff=UNCHANGED_DIFF, motion_diff=MOTION_DIFF,
+                 stable_frames=STABLE_FRAMES):
+        self.unchanged_diff = unchanged_diff
+        self.motion_diff = motion_diff
+        self.stable_frames = stable_frames
+        self.previous = None
+        self.reset_window()
+        self.stats = {
+            'frames': 0,
+            'unchanged': 0,
+            'moving': 0,
+            'scored': 0,
+            'selected': 0,
+            'select_cpu_seconds': 0.0,
+        }
+
+    def reset_window(self):
+        self.window = 0
+        self.best = None
+        self.best_sharpness = -1.0
+        self.best_index = None
+        self.anchor = None
+        self.done = False
+
+    def retry(self):
+        """The selected frame was unusable: keep looking in this window"""
+        self.reset_window()
+
+    def score(self, grey):
+        """Sharpness of a frame, measured at a fixed scale"""
+        height, width = grey.shape[:2]
+        scale = min(1.0, SHARPNESS_SIDE / float(max(height, width)))
+        if scale < 1.0:
+            grey = resize_area(grey, max(1, int(width * scale)), max(1, int(height * scale)))
+        return laplacian_variance(grey)
+
+    def push(self, frame, index):
+        """
+        Feed one frame
+
+        Returns:
+            (frame, index, sharpness) of the frame to OCR, or None
+        """
+        start = time.process_time()
+        try:
+            return self._push(frame, index)
+        finally:
+            self.stats['select_cpu_seconds'] += time.process_time() - start
+
+    def _push(self, frame, index):
+        self.stats['frames'] += 1
+        _, grey = load_image(frame)
+        thumb = resize_area(grey, *THUMB_SIZE).astype(np.float32)
+        diff = float(np.abs(thumb - self.previous).mean()) if self.previous is not None else None
+        self.previous = thumb
+
+        if diff is not None and diff >= self.motion_diff:
+            self.stats['moving'] += 1
+            self.reset_window()
+            return None
+
+        if self.done:
+            # A slow pan never trips the motion check between two frames:
+            # compare with the frame that was read instead
+            if float(np.abs(thumb - self.anchor).mean()) < self.motion_diff:
+                self.stats['unchanged'] += 1
+                return None
+            self.reset_window()
+
+        self.window += 1
+        if diff is not None and diff < self.unchanged_diff and self.best is not None:
+            # Same picture as the last frame: nothing new to score
+            self.stats['unchanged'] += 1
+        else:
+            self.stats['scored'] += 1
+            sharpness = self.score(grey)
+            if sharpness > self.best_sharpness:
+                self.best, self.best_sharpness, self.best_index = frame, sharpness, index
+
+        if self.window >= self.stable_frames:
+            self.done = True
+            self.anchor = thumb
+            self.stats['selected'] += 1
+            return self.best, self.best_index, self.best_sharpness
+        return None
+
+
+def scan_stream(frames, reader, engine='pytorch', selector=None, layout_cache=None,
+                quality_gate=None, orient=None, suppress_repeats=True):
+    """
+    Scan a stream of frames, yielding OCR results as they are read
+
+    Args:
+        frames: Iterable of frames (ndarray, bytes or paths)
+        reader: Loaded OCR reader (see easyocr_process.load_reader)
+        selector: FrameSelector, a default one when None
+        suppress_repeats: Skip results with the same text as the last one
+
+    Yields:
+        easyocr_process result dictionaries plus 'frame_index' and 'sharpness'
+    """
+    from easyocr_process import run_reader
+
+    selector = selector or FrameSelector()
+    stats = selector.stats
+    stats.setdefault('ocr_runs', 0)
+    stats.setdefault('ocr_cpu_seconds', 0.0)
+    last_text = None
+
+    for index, frame in enumerate(frames):
+        picked = selector.push(frame, index)
+        if picked is None:
+            continue
+
+        best, best_index, sharpness = picked
+        start = time.process_time()
+        result = run_reader(reader, best, engine, layout_cache, orient=orient,
+                            quality_gate=quality_gate)
+        stats['ocr_runs'] += 1
+        stats['ocr_cpu_seconds'] += time.process_time() - start
+        if result.get('error_code') == 'low_quality':
+            selector.retry()
+
+        text = result.get('raw_text')
+        if suppress_repeats and result.get('success') and text and text == last_text:
+            continue
+        if result.get('success'):
+            last_text = text
+        result['frame_index'] = best_index
+        result['sharpness'] = round(sharpness, 1)
+        yield result
+
+
+def stream_report(stats, fps=None):
+    """CPU cost of the stream compared with OCR on every frame"""
+    runs = stats.get('ocr_runs', 0)
+    mean_ocr = stats.get('ocr_cpu_seconds', 0.0) / runs if runs else 0.0
+    spent = stats['select_cpu_seconds'] + stats.get('ocr_cpu_seconds', 0.0)
+    every_frame = mean_ocr * stats['frames']
+    report = dict(stats)
+    report['cpu_seconds'] = spent
+    report['every_frame_cpu_seconds'] = every_frame
+    report['cpu_fraction'] = spent / every_frame if every_frame else None
+    if fps and stats['frames']:
+        report['cpu_seconds_per_video_second'] = spent / (stats['frames'] / float(fps))
+    return report
+
+
+def read_frames(source):
+    """Frames of a video file, or of the images of a directory in name order"""
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')):
+                yield load_image(os.path.join(source, name))[0]
+        return
+
+    import cv2
+    capture = cv2.VideoCapture(source)
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    finally:
+        capture.release()
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Continuous camera-stream scanning')
+    parser.add_argument('source', help='Video file or directory of frames')
+    parser.add_argument('--engine', choices=['pytorch', 'onnx'],
+                        default=os.environ.get('EASYOCR_ENGINE', 'pytorch'))
+    parser.add_argument('--fps', type=float, default=30.0, help='Frame rate of a frames directory')
+    parser.add_argument('--stable-frames', type=int, default=STABLE_FRAMES)
+    parser.add_argument('--all', action='store_true', help='Also print repeated readings')
+    args = parser.parse_args()
+
+    from easyocr_process import load_reader, load_layout_cache, load_quality_gate
+
+    reader = load_reader(args.engine)
+    selector = FrameSelector(stable_frames=args.stable_frames)
+    cache = load_layout_cache()
+    results = scan_stream(
+        read_frames(args.source), reader, args.engine, selector,
+        cache, load_quality_gate(), suppress_repeats=not args.all
+    )
+    for result in results:
+        print(json.dumps(result), flush=True)
+    if cache is not None:
+        cache.flush()
+
+    print(json.dumps({'stats': stream_report(selector.stats, args.fps)}), flush=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
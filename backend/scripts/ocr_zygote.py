@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Zygote (fork-server) mode for one-shot EasyOCR calls
+One pre-warmed parent imports numpy, OpenCV, torch/onnxruntime and EasyOCR,
+loads the Reader and runs a warm-up inference, then waits on a Unix socket.
+Every request is served by a freshly forked child that shares the loaded
+model copy-on-write, answers exactly one request and exits, so no state
+leaks between requests and a crash only loses that request.
+
+The socket speaks the ocr_server.py protocol, so the thin clients are:
+
+    - the PHP EasyOCRService, which writes to the socket directly (no Python
+      process at all) when EASYOCR_SOCKET points to the zygote
+    - easyocr_process.py with EASYOCR_SOCKET set (imports only the stdlib)
+
+The availability probe ('check') answers from importlib.util.find_spec and
+the package metadata without importing torch or EasyOCR. 'importtime'
+prints where interpreter startup goes, and the zygote records its own
+startup phases in --status-file.
+
+Usage:
+    python3 ocr_zygote.py serve [--socket /tmp/easyocr.sock] [--engine onnx] [--max-children 4]
+    python3 ocr_zygote.py check [--engine onnx]
+    python3 ocr_zygote.py importtime [--engine onnx] [--top 15]
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import signal
+import socket
+
+from ocr_server import OCRServer, DEFAULT_SOCKET, REQUEST_TIMEOUT, request_ocr
+
+MAX_CHILDREN = 4               # concurrent requests; more wait for a free slot
+ACCEPT_POLL = 1.0              # seconds between checks of the stop flag
+
+# Modules imported before the Reader is created, per engine
+ENGINE_MODULES = {
+    'pytorch': ('torch', 'easyocr'),
+    'onnx': ('onnxruntime', 'onnx_engine'),
+}
+BASE_MODULES = ('numpy', 'cv2', 'easyocr_process', 'orientation', 'quality', 'field_extractor',
+                'multi_label')
+ENGINE_PACKAGES = {
+    'pytorch': ('easyocr', 'torch'),
+    'onnx': ('onnxruntime',),
+}
+
+
+def check_installed(engine='pytorch', socket_path=None):
+    """
+    Whether an engine can be used, answered without importing it
+
+    Returns:
+        {'installed', 'engine', 'versions', 'missing', 'zygote'} where zygote
+        tells whether a server answers on the socket
+    """
+    from importlib import metadata
+    from importlib.util import find_spec
+
+    versions, missing = {}, []
+    for package in ENGINE_PACKAGES[engine]:
+        if find_spec(package) is None:
+            missing.append(package)
+            continue
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+
+    zygote = False
+    socket_path = socket_path or os.environ.get('EASYOCR_SOCKET')
+    if socket_path and os.path.exists(socket_path):
+        try:
+            zygote = bool(request_ocr(socket_path, {'command': 'ping'}, timeout=2).get('success'))
+        except (OSError, ValueError):
+            zygote = False
+
+    return {
+        'installed': zygote or not missing,
+        'engine': engine,
+        'versions': versions,
+        'missing': missing,
+        'zygote': zygote,
+    }
+
+
+def parse_importtime(stderr, top=15):
+    """
+    Cumulative import time per top-level package from python -X importtime
+
+    Returns:
+        {'total_ms', 'packages': [{'package', 'ms', 'share'}, ...]} sorted by time
+    """
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue                # header line
+        name = parts[2][1:]
+        if name.startswith(' '):
+            continue                # nested import, already in its parent's cumulative time
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(parts[1]) / 1000.0
+
+    total = sum(packages.values())
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return {
+        'total_ms': round(total, 1),
+        'packages': [{'package': name, 'ms': round(ms, 1), 'share': round(ms / total, 3) if total else 0.0}
+                     for name, ms in ranked[:top]],
+    }
+
+
+def import_breakdown(engine='pytorch', top=15):
+    """Import time of a cold interpreter loading the OCR modules"""
+    import subprocess
+    from importlib.util import find_spec
+
+    modules = [m for m in BASE_MODULES + ENGINE_MODULES[engine] if find_spec(m) is not None]
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {", ".join(modules)}'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True
+    )
+    breakdown = parse_importtime(completed.stderr, top)
+    breakdown['wall_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    breakdown['modules'] = modules
+    return breakdown
+
+
+class ZygoteServer(OCRServer):
+    """Pre-warmed parent forking one short-lived child per request"""
+
+    def __init__(self, socket_path, engine=None, max_children=MAX_CHILDREN,
+                 shared_weights=None, status_file=None, loader=None):
+        super().__init__(socket_path, workers=max_children, engine=engine, preload=True,
+                         shared_weights=shared_weights, status_file=status_file)
+        self.max_children = max_children
+        self.loader = loader
+        self.startup = {}
+        self.served = 0
+
+    def load(self):
+        if self.loader is not None:
+            return self.loader()
+        return super().load()
+
+    def timed(self, phase, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        self.startup[phase] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    def prepare(self):
+        """Import, load and warm up everything the children will need"""
+        import importlib
+        from importlib.util import find_spec
+
+        def import_modules(modules):
+            for module in modules:
+                if find_spec(module) is not None:
+                    importlib.import_module(module)
+
+        self.timed('import_base_ms', import_modules, BASE_MODULES)
+        if self.loader is None:
+            self.timed('import_engine_ms', import_modules, ENGINE_MODULES[self.engine])
+        self.reader = self.timed('load_reader_ms', self.load)
+        self.timed('warm_up_ms', self.warm_up, self.reader)
+        self.state = self.timed('request_state_ms', self.request_state)
+
+        # Keep the GC from touching (and un-sharing) objects created so far
+        gc.collect()
+        gc.freeze()
+
+    def write_status(self):
+        if not self.status_file:
+            return
+        status = {
+            'pid': os.getpid(),
+            'mode': 'zygote',
+            'engine': self.engine,
+            'socket': self.socket_path,
+            'max_children': self.max_children,
+            'startup': self.startup,
+        }
+        tmp_path = f'{self.status_file}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(status, f)
+        os.replace(tmp_path, self.status_file)
+
+    def reap(self, block=False):
+        """Collect exited children (waiting for one when block is set)"""
+        while self.children:
+            try:
+                pid, _ = os.waitpid(-1, 0 if block else os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            except InterruptedError:
+                continue
+            if pid == 0:
+                return
+            self.children.pop(pid, None)
+            block = False
+
+    def fork_child(self, conn):
+        """Serve one connection in a forked child"""
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                # A request that hangs is killed instead of holding a slot forever
+                signal.alarm(REQUEST_TIMEOUT + 5)
+                self.sock.close()
+                with conn:
+                    self.serve_connection(conn, self.reader, self.state)
+                # The child exits after one request: merge its layout cache
+                # counters now that the answer is sent
+                if self.state['layout_cache'] is not None:
+                    self.state['layout_cache'].flush()
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+
+        conn.close()
+        self.children[pid] = None
+        self.served += 1
+        return pid
+
+    def stop(self, *_):
+        self.running = False
+
+    def serve_forever(self):
+        self.prepare()
+        self.bind()
+        self.sock.settimeout(ACCEPT_POLL)
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.write_status()
+
+        try:
+            while self.running:
+                self.reap()
+                if len(self.children) >= self.max_children:
+                    self.reap(block=True)
+                    continue
+                try:
+                    conn, _ = self.sock.accept()
+                except socket.timeout:
+                    continue
+                except InterruptedError:
+                    continue
+                except OSError:
+                    if not self.running:
+                        break
+                    raise
+                conn.settimeout(None)
+                self.fork_child(conn)
+        finally:
+            self.sock.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            while self.children:
+                self.reap(block=True)
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Zygote (fork-server) mode for EasyOCR')
+    parser.add_argument('command', choices=['serve', 'check', 'importtime'])
+    parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    parser.add_argument('--engine', choices=['pytorch', 'onnx'], default=None,
+                        help='OCR engine (default: EASYOCR_ENGINE, the tuned profile or pytorch)')
+    parser.add_argument('--max-children', type=int, default=MAX_CHILDREN)
+    parser.add_argument('--shared-weights', default=None,
+                        help='Map packed weights instead of loading them (pytorch engine)')
+    parser.add_argument('--status-file', default=None,
+                        help='Write the zygote pid and startup breakdown as JSON once ready')
+    parser.add_argument('--top', type=int, default=15, help='importtime: packages to show')
+    args = parser.parse_args()
+
+    if args.command == 'check':
+        engine = args.engine or os.environ.get('EASYOCR_ENGINE') or 'pytorch'
+        result = check_installed(engine, args.socket)
+        print(json.dumps(result))
+        return 0 if result['installed'] else 1
+
+    if args.command == 'importtime':
+        engine = args.engine or os.environ.get('EASYOCR_ENGINE') or 'pytorch'
+        breakdown = import_breakdown(engine, args.top)
+        print("=" * 70)
+        print(f"Import time breakdown ({engine}): {breakdown['total_ms']:.0f} ms imports, "
+              f"{breakdown['wall_ms']:.0f} ms interpreter wall time")
+        print("=" * 70)
+        for entry in breakdown['packages']:
+            print(f"  • {entry['package']:<24} {entry['ms']:>9.1f} ms  {entry['share']:>6.1%}")
+        return 0
+
+    server = ZygoteServer(args.socket, engine=args.engine, max_children=args.max_children,
+                          shared_weights=args.shared_weights, status_file=args.status_file)
+    server.serve_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,646 @@
+#!/usr/bin/env python3
+"""
+ONNX Runtime engine for EasyOCR
+Runs the CRAFT detector and the CRNN recognizer exported from EasyOCR with
+ONNX Runtime on CPU. The runtime path only needs numpy, OpenCV, Pillow and
+onnxruntime; torch and easyocr are imported only by the one-off export step.
+
+Usage:
+    python3 onnx_engine.py export [--model-dir DIR] [--lang en es]
+    python3 onnx_engine.py <image_path> [--model-dir DIR]
+"""
+
+import os
+import sys
+import json
+import math
+
+import numpy as np
+
+from image_utils import load_image
+
+DEFAULT_LANGUAGES = ['en', 'es']
+DEFAULT_MODEL_DIR = os.environ.get(
+    'EASYOCR_ONNX_DIR',
+    os.path.join(os.path.expanduser('~'), '.EasyOCR', 'onnx')
+)
+
+DETECTOR_FILE = 'craft_detector.onnx'
+RECOGNIZER_FILE = 'crnn_recognizer.onnx'
+METADATA_FILE = 'metadata.json'
+
+# Recognizer input height used by every EasyOCR latin/generation2 model
+MODEL_HEIGHT = 64
+
+# CRAFT input normalization (ImageNet mean/variance, scaled to 0-255)
+DETECTOR_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32) * 255.0
+DETECTOR_VARIANCE = np.array([0.229, 0.224, 0.225], dtype=np.float32) * 255.0
+
+
+def default_thread_count():
+    """Number of intra-op threads for ONNX Runtime"""
+    configured = os.environ.get('EASYOCR_ONNX_THREADS')
+    if configured:
+        return max(1, int(configured))
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+def create_session(model_path, threads=None):
+    """Create a CPU inference session with full graph optimizations"""
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = threads or default_thread_count()
+    options.inter_op_num_threads = 1
+
+    return ort.InferenceSession(
+        model_path,
+        sess_options=options,
+        providers=['CPUExecutionProvider']
+    )
+
+
+# ---------------------------------------------------------------------------
+# Export (requires torch + easyocr, run once)
+# ---------------------------------------------------------------------------
+
+def export_models(model_dir=DEFAULT_MODEL_DIR, languages=None, opset=14):
+    """
+    Export the EasyOCR detector and recognizer to ONNX
+
+    Args:
+        model_dir: Directory where the .onnx files and metadata are written
+        languages: EasyOCR language list
+        opset: ONNX opset version
+
+    Returns:
+        Dictionary with the written file paths
+    """
+    import torch
+    import easyocr
+
+    languages = languages or DEFAULT_LANGUAGES
+    os.makedirs(model_dir, exist_ok=True)
+
+    # Quantized modules cannot be exported, load the float weights
+    reader = easyocr.Reader(languages, gpu=False, quantize=False, verbose=False)
+
+    class DetectorExport(torch.nn.Module):
+        def __init__(self, net):
+            super().__init__()
+            self.net = net
+
+        def forward(self, image):
+            score, _ = self.net(image)
+            return score
+
+    class RecognizerExport(torch.nn.Module):
+        def __init__(self, net):
+            super().__init__()
+            self.net = net
+
+        def forward(self, image):
+            # CTC models ignore the text argument
+            return self.net(image, None)
+
+    detector_path = os.path.join(model_dir, DETECTOR_FILE)
+    recognizer_path = os.path.join(model_dir, RECOGNIZER_FILE)
+
+    with torch.no_grad():
+        torch.onnx.export(
+            DetectorExport(reader.detector).eval(),
+            torch.randn(1, 3, 640, 640),
+            detector_path,
+            input_names=['image'],
+            output_names=['score'],
+            dynamic_axes={
+                'image': {0: 'batch', 2: 'height', 3: 'width'},
+                'score': {0: 'batch', 1: 'score_height', 2: 'score_width'},
+            },
+            opset_version=opset
+        )
+        torch.onnx.export(
+            RecognizerExport(reader.recognizer).eval(),
+            torch.randn(1, 1, MODEL_HEIGHT, 256),
+            recognizer_path,
+            input_names=['image'],
+            output_names=['logits'],
+            dynamic_axes={
+                'image': {0: 'batch', 3: 'width'},
+                'logits': {0: 'batch', 1: 'steps'},
+            },
+            opset_version=opset
+        )
+
+    metadata = {
+        'languages': languages,
+        'character': reader.character,
+        'lang_char': ''.join(reader.lang_char),
+        'model_height': MODEL_HEIGHT,
+        'easyocr_version': easyocr.__version__,
+        'opset': opset,
+    }
+    metadata_path = os.path.join(model_dir, METADATA_FILE)
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+    return {
+        'detector': detector_path,
+        'recognizer': recognizer_path,
+        'metadata': metadata_path,
+    }
+
+
+def models_available(model_dir=DEFAULT_MODEL_DIR):
+    """Check whether exported models exist in model_dir"""
+    return all(
+        os.path.exists(os.path.join(model_dir, name))
+        for name in (DETECTOR_FILE, RECOGNIZER_FILE, METADATA_FILE)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Detection helpers (ported from easyocr.craft_utils / easyocr.utils)
+# ---------------------------------------------------------------------------
+
+def resize_aspect_ratio(img, square_size, mag_ratio=1.0):
+    """Resize keeping aspect ratio and pad to a multiple of 32"""
+    import cv2
+
+    height, width, channel = img.shape
+    target_size = min(mag_ratio * max(height, width), square_size)
+    ratio = target_size / max(height, width)
+
+    target_h, target_w = int(height * ratio), int(width * ratio)
+    proc = cv2.resize(img, (target_w, target_h), interpolation=cv2.INTER_LINEAR)
+
+    target_h32 = target_h + (-target_h % 32)
+    target_w32 = target_w + (-target_w % 32)
+    resized = np.zeros((target_h32, target_w32, channel), dtype=np.float32)
+    resized[0:target_h, 0:target_w, :] = proc
+
+    return resized, ratio
+
+
+def get_det_boxes(textmap, linkmap, text_threshold, link_threshold, low_text):
+    """Extract quadrilateral text boxes from CRAFT score maps"""
+    import cv2
+
+    img_h, img_w = textmap.shape
+    text_score = (textmap > low_text).astype(np.float32)
+    link_score = (linkmap > link_threshold).astype(np.float32)
+    text_score_comb = np.clip(text_score + link_score, 0, 1)
+
+    n_labels, labels, stats, _ = cv2.connectedComponentsWithStats(
+        text_score_comb.astype(np.uint8), connectivity=4
+    )
+
+    boxes = []
+    for k in range(1, n_labels):
+        size = stats[k, cv2.CC_STAT_AREA]
+        if size < 10:
+            continue
+
+        component = labels == k
+        if np.max(textmap[component]) < text_threshold:
+            continue
+
+        segmap = np.zeros(textmap.shape, dtype=np.uint8)
+        segmap[component] = 255
+        segmap[np.logical_and(link_score == 1, text_score == 0)] = 0
+
+        x, y = stats[k, cv2.CC_STAT_LEFT], stats[k, cv2.CC_STAT_TOP]
+        w, h = stats[k, cv2.CC_STAT_WIDTH], stats[k, cv2.CC_STAT_HEIGHT]
+        niter = int(math.sqrt(size * min(w, h) / (w * h)) * 2)
+        sx, ex = max(0, x - niter), min(img_w, x + w + niter + 1)
+        sy, ey = max(0, y - niter), min(img_h, y + h + niter + 1)
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1 + niter, 1 + niter))
+        segmap[sy:ey, sx:ex] = cv2.dilate(segmap[sy:ey, sx:ex], kernel)
+
+        contours = np.roll(np.array(np.where(segmap != 0)), 1, axis=0).transpose().reshape(-1, 2)
+        box = cv2.boxPoints(cv2.minAreaRect(contours))
+
+        # Align diamond-shaped boxes
+        w, h = np.linalg.norm(box[0] - box[1]), np.linalg.norm(box[1] - box[2])
+        box_ratio = max(w, h) / (min(w, h) + 1e-5)
+        if abs(1 - box_ratio) <= 0.1:
+            left, right = contours[:, 0].min(), contours[:, 0].max()
+            top, bottom = contours[:, 1].min(), contours[:, 1].max()
+            box = np.array([[left, top], [right, top], [right, bottom], [left, bottom]], dtype=np.float32)
+
+        # Clockwise order starting at top-left
+        start = box.sum(axis=1).argmin()
+        boxes.append(np.roll(box, 4 - start, 0))
+
+    return boxes
+
+
+def group_text_box(polys, slope_ths=0.1, ycenter_ths=0.5, height_ths=0.5,
+                   width_ths=0.5, add_margin=0.1):
+    """
+    Merge character-level boxes into text lines
+
+    Returns:
+        (horizontal_list, free_list) in EasyOCR format: horizontal boxes as
+        [x_min, x_max, y_min, y_max], free boxes as four [x, y] points
+    """
+    horizontal_list, free_list, combined_list, merged_list = [], [], [], []
+
+    for poly in polys:
+        slope_up = (poly[3] - poly[1]) / np.maximum(10, (poly[2] - poly[0]))
+        slope_down = (poly[5] - poly[7]) / np.maximum(10, (poly[4] - poly[6]))
+        if max(abs(slope_up), abs(slope_down)) < slope_ths:
+            x_max = max(poly[0], poly[2], poly[4], poly[6])
+            x_min = min(poly[0], poly[2], poly[4], poly[6])
+            y_max = max(poly[1], poly[3], poly[5], poly[7])
+            y_min = min(poly[1], poly[3], poly[5], poly[7])
+            horizontal_list.append([x_min, x_max, y_min, y_max, 0.5 * (y_min + y_max), y_max - y_min])
+        else:
+            height = np.linalg.norm([poly[6] - poly[0], poly[7] - poly[1]])
+            width = np.linalg.norm([poly[2] - poly[0], poly[3] - poly[1]])
+            margin = int(1.44 * add_margin * min(width, height))
+
+            theta13 = abs(np.arctan((poly[1] - poly[5]) / np.maximum(10, (poly[0] - poly[4]))))
+            theta24 = abs(np.arctan((poly[3] - poly[7]) / np.maximum(10, (poly[2] - poly[6]))))
+            x1 = poly[0] - np.cos(theta13) * margin
+            y1 = poly[1] - np.sin(theta13) * margin
+            x2 = poly[2] + np.cos(theta24) * margin
+            y2 = poly[3] - np.sin(theta24) * margin
+            x3 = poly[4] + np.cos(theta13) * margin
+            y3 = poly[5] + np.sin(theta13) * margin
+            x4 = poly[6] - np.cos(theta24) * margin
+            y4 = poly[7] + np.sin(theta24) * margin
+            free_list.append([[x1, y1], [x2, y2], [x3, y3], [x4, y4]])
+
+    horizontal_list = sorted(horizontal_list, key=lambda item: item[4])
+
+    # Combine boxes that share a text line
+    new_box = []
+    for poly in horizontal_list:
+        if not new_box:
+            b_height, b_ycenter = [poly[5]], [poly[4]]
+            new_box.append(poly)
+        elif abs(np.mean(b_ycenter) - poly[4]) < ycenter_ths * np.mean(b_height):
+            b_height.append(poly[5])
+            b_ycenter.append(poly[4])
+            new_box.append(poly)
+        else:
+            b_height, b_ycenter = [poly[5]], [poly[4]]
+            combined_list.append(new_box)
+            new_box = [poly]
+    combined_list.append(new_box)
+
+    # Merge neighbouring boxes within each line
+    for boxes in combined_list:
+        if not boxes:
+            continue
+        if len(boxes) == 1:
+            box = boxes[0]
+            margin = int(add_margin * min(box[1] - box[0], box[5]))
+            merged_list.append([box[0] - margin, box[1] + margin, box[2] - margin, box[3] + margin])
+            continue
+
+        boxes = sorted(boxes, key=lambda item: item[0])
+        merged_box, new_box = [], []
+        for box in boxes:
+            if not new_box:
+                b_height, x_max = [box[5]], box[1]
+                new_box.append(box)
+            elif (abs(np.mean(b_height) - box[5]) < height_ths * np.mean(b_height)
+                  and (box[0] - x_max) < width_ths * (box[3] - box[2])):
+                b_height.append(box[5])
+                x_max = box[1]
+                new_box.append(box)
+            else:
+                b_height, x_max = [box[5]], box[1]
+                merged_box.append(new_box)
+                new_box = [box]
+        if new_box:
+            merged_box.append(new_box)
+
+        for mbox in merged_box:
+            x_min = min(b[0] for b in mbox)
+            x_max = max(b[1] for b in mbox)
+            y_min = min(b[2] for b in mbox)
+            y_max = max(b[3] for b in mbox)
+            margin = int(add_margin * min(x_max - x_min, y_max - y_min))
+            merged_list.append([x_min - margin, x_max + margin, y_min - margin, y_max + margin])
+
+    return merged_list, free_list
+
+
+# ---------------------------------------------------------------------------
+# Recognition helpers (ported from easyocr.recognition / easyocr.utils)
+# ---------------------------------------------------------------------------
+
+def four_point_transform(image, rect):
+    """Warp a free-form quadrilateral into an upright crop"""
+    import cv2
+
+    (tl, tr, br, bl) = rect
+    max_width = int(max(np.linalg.norm(br - bl), np.linalg.norm(tr - tl)))
+    max_height = int(max(np.linalg.norm(tr - br), np.linalg.norm(tl - bl)))
+    dst = np.array([[0, 0], [max_width - 1, 0], [max_width - 1, max_height - 1], [0, max_height - 1]],
+                   dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(rect, dst)
+    return cv2.warpPerspective(image, matrix, (max_width, max_height))
+
+
+def calculate_ratio(width, height):
+    """Aspect ratio of a crop, always >= 1"""
+    ratio = width / height
+    if ratio < 1.0:
+        ratio = 1.0 / ratio
+    return ratio
+
+
+def resize_to_model_height(crop, width, height, model_height=MODEL_HEIGHT):
+    """Resize a crop to the recognizer height keeping its aspect ratio"""
+    import cv2
+
+    ratio = width / height
+    if ratio < 1.0:
+        ratio = calculate_ratio(width, height)
+        return cv2.resize(crop, (model_height, int(model_height * ratio)), interpolation=cv2.INTER_LINEAR)
+    return cv2.resize(crop, (int(model_height * ratio), model_height), interpolation=cv2.INTER_LINEAR)
+
+
+def get_image_list(horizontal_list, free_list, img_grey, model_height=MODEL_HEIGHT):
+    """
+    Crop every text box from the greyscale image
+
+    Returns:
+        ([(box, crop, width)], max_width) where width is the padded input
+        width EasyOCR uses when it recognizes that box on its own
+    """
+    image_list = []
+    maximum_y, maximum_x = img_grey.shape
+    max_ratio_hori, max_ratio_free = 1, 1
+
+    for box in free_list:
+        rect = np.array(box, dtype=np.float32)
+        transformed = four_point_transform(img_grey, rect)
+        height, width = transformed.shape[:2]
+        if height == 0 or width == 0:
+            continue
+        ratio = calculate_ratio(width, height)
+        crop = resize_to_model_height(transformed, width, height, model_height)
+        image_list.append((box, crop, math.ceil(max(ratio, 1)) * model_height))
+        max_ratio_free = max(ratio, max_ratio_free)
+
+    for box in horizontal_list:
+        x_min, x_max = max(0, box[0]), min(box[1], maximum_x)
+        y_min, y_max = max(0, box[2]), min(box[3], maximum_y)
+        width, height = x_max - x_min, y_max - y_min
+        if width <= 0 or height <= 0:
+            continue
+        crop = img_grey[y_min:y_max, x_min:x_max]
+        ratio = calculate_ratio(width, height)
+        crop = resize_to_model_height(crop, width, height, model_height)
+        image_list.append(([[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]], crop,
+                           math.ceil(max(ratio, 1)) * model_height))
+        max_ratio_hori = max(ratio, max_ratio_hori)
+
+    max_width = math.ceil(max(max_ratio_hori, max_ratio_free)) * model_height
+    image_list = sorted(image_list, key=lambda item: item[0][0][1])
+    return image_list, max_width
+
+
+def adjust_contrast_grey(img, target=0.4):
+    """Stretch contrast of a low-contrast greyscale crop"""
+    high = np.percentile(img, 90)
+    low = np.percentile(img, 10)
+    contrast = (high - low) / np.maximum(10, high + low)
+    if contrast < target:
+        img = img.astype(int)
+        ratio = 200.0 / np.maximum(10, high - low)
+        img = (img - low + 25) * ratio
+        img = np.clip(img, 0, 255).astype(np.uint8)
+    return img
+
+
+def normalize_batch(crops, model_height, max_width, adjust_contrast=0.0):
+    """Resize, normalize to [-1, 1] and right-pad crops into one batch"""
+    from PIL import Image
+
+    batch = np.zeros((len(crops), 1, model_height, max_width), dtype=np.float32)
+    for i, crop in enumerate(crops):
+        if adjust_contrast > 0:
+            crop = adjust_contrast_grey(crop, target=adjust_contrast)
+        image = Image.fromarray(crop, 'L')
+        w, h = image.size
+        resized_w = min(max_width, math.ceil(model_height * w / float(h)))
+        resized = np.asarray(image.resize((resized_w, model_height), Image.BICUBIC), dtype=np.float32)
+        resized = (resized / 255.0 - 0.5) / 0.5
+        batch[i, 0, :, :resized_w] = resized
+        if resized_w < max_width:
+            # Pad by repeating the last column, like EasyOCR's NormalizePAD
+            batch[i, 0, :, resized_w:] = resized[:, resized_w - 1:resized_w]
+    return batch
+
+
+def softmax(logits, axis=-1):
+    """Numerically stable softmax"""
+    shifted = logits - logits.max(axis=axis, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=axis, keepdims=True)
+
+
+def custom_mean(values):
+    """EasyOCR's confidence aggregate over per-character probabilities"""
+    return values.prod() ** (2.0 / np.sqrt(len(values)))
+
+
+def ctc_greedy_decode(probs, character, ignore_idx=()):
+    """
+    Greedy CTC decoding
+
+    Args:
+        probs: Array of shape (batch, steps, classes) with class probabilities
+        character: Character string, index 0 of the classes is the CTC blank
+        ignore_idx: Class indices that must never be emitted
+
+    Returns:
+        List of (text, confidence) tuples
+    """
+    probs = probs.copy()
+    if len(ignore_idx):
+        probs[:, :, list(ignore_idx)] = 0.0
+        probs = probs / np.expand_dims(probs.sum(axis=2), axis=-1)
+
+    indices = probs.argmax(axis=2)
+    values = probs.max(axis=2)
+    charset = np.array(['[blank]'] + list(character))
+
+    results = []
+    for index_row, value_row in zip(indices, values):
+        keep = np.insert(index_row[1:] != index_row[:-1], 0, True) & (index_row != 0)
+        text = ''.join(charset[index_row[keep]])
+        max_probs = value_row[index_row != 0]
+        confidence = custom_mean(max_probs) if len(max_probs) else 0.0
+        results.append((text, float(confidence)))
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Reader
+# ---------------------------------------------------------------------------
+
+class OnnxReader:
+    """
+    Drop-in replacement for easyocr.Reader backed by ONNX Runtime
+
+    Exposes the same detect / recognize / readtext methods and result
+    format as EasyOCR (list of (box, text, confidence)).
+    """
+
+    def __init__(self, languages=None, model_dir=DEFAULT_MODEL_DIR, threads=None):
+        if not models_available(model_dir):
+            raise FileNotFoundError(
+                f'ONNX models not found in {model_dir}. Run: python3 onnx_engine.py export'
+            )
+
+        with open(os.path.join(model_dir, METADATA_FILE)) as f:
+            self.metadata = json.load(f)
+
+        languages = languages or self.metadata['languages']
+        if sorted(languages) != sorted(self.metadata['languages']):
+            raise ValueError(
+                f"ONNX models were exported for {self.metadata['languages']}, not {languages}"
+            )
+
+        self.lang_list = languages
+        self.character = self.metadata['character']
+        self.lang_char = self.metadata['lang_char']
+        self.model_height = self.metadata.get('model_height', MODEL_HEIGHT)
+
+        ignore_char = set(self.character) - set(self.lang_char)
+        self.ignore_idx = sorted(self.character.index(c) + 1 for c in ignore_char)
+
+        self.detector = create_session(os.path.join(model_dir, DETECTOR_FILE), threads)
+        self.recognizer = create_session(os.path.join(model_dir, RECOGNIZER_FILE), threads)
+
+    def detect(self, image, min_size=20, text_threshold=0.7, low_text=0.4,
+               link_threshold=0.4, canvas_size=2560, mag_ratio=1.0,
+               slope_ths=0.1, ycenter_ths=0.5, height_ths=0.5, width_ths=0.5,
+               add_margin=0.1):
+        """
+        Run CRAFT and group the boxes into text lines
+
+        Returns:
+            ([horizontal_list], [free_list]) batched like easyocr.Reader.detect
+        """
+        img, _ = load_image(image)
+
+        resized, target_ratio = resize_aspect_ratio(img, canvas_size, mag_ratio)
+        x = ((resized - DETECTOR_MEAN) / DETECTOR_VARIANCE).transpose(2, 0, 1)[np.newaxis]
+        score = self.detector.run(None, {'image': x.astype(np.float32)})[0][0]
+
+        boxes = get_det_boxes(score[:, :, 0], score[:, :, 1], text_threshold, link_threshold, low_text)
+
+        ratio = 1.0 / target_ratio
+        polys = [np.array(box * (ratio * 2)).astype(np.int32).reshape(-1) for box in boxes]
+
+        horizontal_list, free_list = group_text_box(
+            polys, slope_ths, ycenter_ths, height_ths, width_ths, add_margin
+        )
+
+        if min_size:
+            horizontal_list = [b for b in horizontal_list if max(b[1] - b[0], b[3] - b[2]) > min_size]
+            free_list = [
+                b for b in free_list
+                if max(np.ptp([c[0] for c in b]), np.ptp([c[1] for c in b])) > min_size
+            ]
+
+        horizontal_list = [[int(v) for v in box] for box in horizontal_list]
+
+        # Batched output, like easyocr.Reader.detect
+        return [horizontal_list], [free_list]
+
+    def recognize(self, img_grey, horizontal_list=None, free_list=None,
+                  contrast_ths=0.1, adjust_contrast=0.5):
+        """
+        Recognize text inside the given boxes, batched by input width
+
+        EasyOCR on CPU recognizes one box at a time, padding it to its own
+        ceil(aspect ratio) * model_height width. Padding every crop to the
+        widest one adds frames the CTC decoder sees and can change text and
+        confidence, so crops are batched per width bucket instead: each
+        crop gets exactly the input tensor EasyOCR would build for it.
+        """
+        if horizontal_list is None and free_list is None:
+            y_max, x_max = img_grey.shape
+            horizontal_list = [[0, x_max, 0, y_max]]
+            free_list = []
+
+        image_list, _ = get_image_list(
+            horizontal_list or [], free_list or [], img_grey, self.model_height
+        )
+        if not image_list:
+            return []
+
+        coords = [item[0] for item in image_list]
+        crops = [item[1] for item in image_list]
+        buckets = {}
+        for i, item in enumerate(image_list):
+            buckets.setdefault(item[2], []).append(i)
+
+        predictions = [None] * len(crops)
+        for width, indexes in buckets.items():
+            for i, pred in zip(indexes, self._predict([crops[i] for i in indexes], width)):
+                predictions[i] = pred
+
+            # Second pass with contrast adjustment for low-confidence crops
+            low_idx = [i for i in indexes if predictions[i][1] < contrast_ths]
+            if low_idx:
+                retry = self._predict([crops[i] for i in low_idx], width, adjust_contrast)
+                for i, pred in zip(low_idx, retry):
+                    if pred[1] >= predictions[i][1]:
+                        predictions[i] = pred
+
+        return [(box, text, conf) for box, (text, conf) in zip(coords, predictions)]
+
+    def readtext(self, image, **detect_kwargs):
+        """Detect and recognize text, EasyOCR-compatible output"""
+        img, img_grey = load_image(image)
+        horizontal_list, free_list = self.detect(img, **detect_kwargs)
+        return self.recognize(img_grey, horizontal_list[0], free_list[0])
+
+    def _predict(self, crops, max_width, adjust_contrast=0.0):
+        batch = normalize_batch(crops, self.model_height, max_width, adjust_contrast)
+        logits = self.recognizer.run(None, {'image': batch})[0]
+        return ctc_greedy_decode(softmax(logits, axis=2), self.character, self.ignore_idx)
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='EasyOCR ONNX Runtime engine')
+    parser.add_argument('command', help="'export' or an image path")
+    parser.add_argument('--model-dir', default=DEFAULT_MODEL_DIR)
+    parser.add_argument('--lang', nargs='+', default=DEFAULT_LANGUAGES)
+    parser.add_argument('--threads', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        paths = export_models(args.model_dir, args.lang)
+        print(json.dumps({'success': True, **paths}))
+        return
+
+    reader = OnnxReader(args.lang, args.model_dir, args.threads)
+    results = reader.readtext(args.command)
+    print(json.dumps({
+        'success': True,
+        'raw_text': ' '.join(r[1] for r in results).strip(),
+        'confidence': sum(r[2] for r in results) / len(results) if results else 0
+    }))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
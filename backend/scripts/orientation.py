@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Orientation and skew estimation pre-pass
+Estimates how a label photo is rotated (0/90/180/270 degrees plus a small
+skew) from projection profiles of the ink pixels of a downscaled image, so
+the image can be straightened once before EasyOCR instead of retrying
+recognition at several rotations.
+
+    1. Text lines give a sharp projection profile perpendicular to the
+       line direction; the sharpest angle in [-45, 135) gives the line
+       direction modulo 180 degrees (quarter turn + skew).
+    2. Latin text has more ink in the ascender band than in the descender
+       band; the sign of that asymmetry resolves the remaining 180 degrees.
+       Labels of digits and capitals carry no such cue, so easyocr_process
+       retries the other half turn once when recognition confidence is low.
+
+Angles are counter-clockwise, in degrees, as in PIL's Image.rotate.
+
+Usage:
+    python3 orientation.py <image_path>
+"""
+
+import sys
+import json
+
+import numpy as np
+
+from image_utils import load_image, resize_area
+
+MAX_SIDE = 400
+MAX_POINTS = 30000
+COARSE_STEP = 1.0
+FINE_STEP = 0.1
+MIN_INK_POINTS = 200
+MIN_LINE_CONFIDENCE = 1.15     # best / orthogonal profile score
+MIN_FLIP_ASYMMETRY = 0.12      # ascender vs descender ink imbalance
+MIN_SKEW = 0.3                 # below this the image is not resampled
+MIN_UPRIGHT_CONFIDENCE = 0.5   # OCR confidence below which the half turn is retried
+INK_OFFSET = 12                # grey levels away from the local mean
+POLARITY_MARGIN = 1.5          # sharpness ratio to prefer the denser ink mask
+
+
+def local_mean(grey, radius):
+    """Box-filter mean over a (2 * radius + 1) window using an integral image"""
+    padded = np.pad(grey.astype(np.float64), radius + 1, mode='edge')
+    integral = padded.cumsum(axis=0).cumsum(axis=1)
+    size = 2 * radius + 1
+    total = (integral[size:, size:] - integral[:-size, size:]
+             - integral[size:, :-size] + integral[:-size, :-size])
+    height, width = grey.shape
+    return total[:height, :width] / float(size * size)
+
+
+def ink_masks(grey, offset=INK_OFFSET):
+    """
+    Adaptive ink masks for dark-on-light and light-on-dark text
+
+    Uniform regions (background, padding) produce no ink in either mask.
+    """
+    radius = max(3, max(grey.shape) // 40)
+    mean = local_mean(grey, radius)
+    return grey < mean - offset, grey > mean + offset
+
+
+def mask_points(mask, max_points=MAX_POINTS, seed=0):
+    """
+    Coordinates of mask pixels, subsampled and centred on the image centre
+
+    Points are jittered within their pixel so that projections at 0, 45 and
+    90 degrees do not fall exactly on the pixel lattice and look sharper
+    than any other angle.
+
+    Returns:
+        (xs, ys) float arrays
+    """
+    ys, xs = np.nonzero(mask)
+    rng = np.random.default_rng(seed)
+    if len(xs) > max_points:
+        keep = rng.choice(len(xs), max_points, replace=False)
+        xs, ys = xs[keep], ys[keep]
+    height, width = mask.shape
+    jitter = rng.random((2, len(xs))) - 0.5
+    return xs - width / 2.0 + jitter[0], ys - height / 2.0 + jitter[1]
+
+
+def profile_scores(xs, ys, angles):
+    """
+    Projection-profile sharpness for each candidate line angle
+
+    For line angle theta the profile is taken along the line normal
+    (sin theta, cos theta); sharp, well separated lines give a large sum of
+    squared differences between neighbouring bins.
+    """
+    radians = np.deg2rad(angles)[:, np.newaxis]
+    offsets = np.rint(xs * np.sin(radians) + ys * np.cos(radians)).astype(np.int64)
+    offsets -= offsets.min(axis=1, keepdims=True)
+    bins = int(offsets.max()) + 2
+
+    flat = (offsets + np.arange(len(angles))[:, np.newaxis] * bins).reshape(-1)
+    profiles = np.bincount(flat, minlength=len(angles) * bins).reshape(len(angles), bins)
+    return (np.diff(profiles.astype(np.float64), axis=1) ** 2).sum(axis=1)
+
+
+def line_asymmetry(xs, ys, angle):
+    """
+    Ascender minus descender ink, normalized, assuming text is upright at angle
+
+    Positive values mean the text reads upright at this angle.
+    """
+    radians = np.deg2rad(angle)
+    v = np.rint(xs * np.sin(radians) + ys * np.cos(radians)).astype(np.int64)
+    v -= v.min()
+    profile = np.bincount(v).astype(np.float64)
+    # Frame edges and other strokes across the lines add a floor to every bin
+    profile = np.maximum(profile - np.percentile(profile, 25), 0.0)
+
+    above = below = 0.0
+    in_line = profile > 0.02 * profile.max()
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], in_line.astype(np.int8), [0]))))
+    for start, end in zip(edges[::2], edges[1::2]):
+        band = profile[start:end]
+        if len(band) < 4:
+            continue
+        # x-height core; a robust level so rule lines do not become the core
+        core = np.flatnonzero(band >= 0.5 * np.percentile(band, 75))
+        above += band[:core[0]].sum()
+        below += band[core[-1] + 1:].sum()
+
+    total = above + below
+    return float((above - below) / total) if total else 0.0
+
+
+def estimate_orientation(grey):
+    """
+    Estimate the rotation of a greyscale image
+
+    Returns:
+        Dictionary with 'angle' (total counter-clockwise rotation of the
+        content), 'rotation' (nearest quarter turn), 'skew' (remainder),
+        'line_confidence' and 'flip_confidence'
+    """
+    height, width = grey.shape[:2]
+    scale = min(1.0, MAX_SIDE / float(max(height, width)))
+    if scale < 1.0:
+        grey = resize_area(grey, max(1, int(width * scale)), max(1, int(height * scale)))
+
+    # Pick the text polarity whose ink forms the sharpest lines
+    coarse = np.arange(-45.0, 135.0, COARSE_STEP)
+    candidates = []
+    for mask in ink_masks(grey):
+        xs, ys = mask_points(mask)
+        if len(xs) < MIN_INK_POINTS:
+            continue
+        scores = profile_scores(xs, ys, coarse)
+        best = int(scores.argmax())
+        sharpness = scores[best] / np.median(scores)
+        candidates.append((sharpness, xs, ys, coarse[best]))
+
+    if not candidates:
+        return {'angle': 0.0, 'rotation': 0, 'skew': 0.0, 'line_confidence': 0.0, 'flip_confidence': 0.0}
+    # The halo around strokes is also sharp but holds more pixels than the
+    # strokes themselves: prefer the sparser mask unless it is clearly worse
+    candidates.sort(key=lambda c: len(c[1]))
+    if len(candidates) > 1 and candidates[1][0] > POLARITY_MARGIN * candidates[0][0]:
+        candidates.reverse()
+    _, xs, ys, best = candidates[0]
+
+    fine = np.arange(best - COARSE_STEP, best + COARSE_STEP + FINE_STEP / 2, FINE_STEP)
+    fine_scores = profile_scores(xs, ys, fine)
+    theta = float(fine[int(fine_scores.argmax())])
+
+    orthogonal = profile_scores(xs, ys, np.array([theta + 90.0]))[0]
+    line_confidence = float(fine_scores.max() / max(orthogonal, 1e-9))
+
+    asymmetry = line_asymmetry(xs, ys, theta)
+    angle = theta + 180.0 if asymmetry < -MIN_FLIP_ASYMMETRY else theta
+    angle = angle % 360.0
+
+    rotation = int(round(angle / 90.0)) % 4 * 90
+    skew = (angle - rotation + 180.0) % 360.0 - 180.0
+
+    return {
+        'angle': round(angle, 2),
+        'rotation': rotation,
+        'skew': round(skew, 2),
+        'line_confidence': round(line_confidence, 3),
+        'flip_confidence': round(float(abs(asymmetry)), 3),
+    }
+
+
+def rotate_image(img, rotation, skew):
+    """Undo a counter-clockwise rotation: quarter turns first, then skew"""
+    import cv2
+
+    if rotation:
+        img = np.ascontiguousarray(np.rot90(img, -(rotation // 90)))
+    if abs(skew) < MIN_SKEW:
+        return img
+
+    height, width = img.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2.0, height / 2.0), -skew, 1.0)
+    cos, sin = abs(matrix[0, 0]), abs(matrix[0, 1])
+    new_width = int(height * sin + width * cos)
+    new_height = int(height * cos + width * sin)
+    matrix[0, 2] += new_width / 2.0 - width / 2.0
+    matrix[1, 2] += new_height / 2.0 - height / 2.0
+    return cv2.warpAffine(img, matrix, (new_width, new_height),
+                          flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+def orient_image(image):
+    """
+    Load an image and straighten it if the estimate is confident
+
+    Returns:
+        (image array, estimate dictionary with 'applied')
+    """
+    img, grey = load_image(image)
+    estimate = estimate_orientation(grey)
+
+    confident = estimate['line_confidence'] >= MIN_LINE_CONFIDENCE
+    applied = confident and (estimate['rotation'] != 0 or abs(estimate['skew']) >= MIN_SKEW)
+    if applied:
+        img = rotate_image(img, estimate['rotation'], estimate['skew'])
+
+    estimate['applied'] = applied
+    return img, estimate
+
+
+def main():
+    """Main entry point"""
+    if len(sys.argv) < 2:
+        print(json.dumps({'success': False, 'error': 'Image path required'}))
+        return 1
+
+    _, grey = load_image(sys.argv[1])
+    print(json.dumps({'success': True, **estimate_orientation(grey)}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
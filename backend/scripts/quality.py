@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Image quality gate
+Scores a frame for sharpness (variance of the Laplacian), exposure
+(histogram of grey levels) and the size of the largest text band (where the
+product code usually is) in a few milliseconds, so blurry, badly exposed or
+far-away captures can be rejected with a machine-readable reason before the
+full OCR pass and the client can re-capture straight away.
+
+Thresholds are configurable through a JSON file (EASYOCR_QUALITY_CONFIG) and
+the gate mode through EASYOCR_QUALITY_GATE: 'reject' (default), 'flag' (score
+but still run OCR) or 'off'. When EASYOCR_QUALITY_STATS names a file, gate
+and OCR CPU time are accumulated there to report the CPU-seconds saved; every
+worker merges its counters into the file under a lock.
+
+Usage:
+    python3 quality.py check <image_path> [--config thresholds.json]
+    python3 quality.py stats [--stats PATH]
+"""
+
+import os
+import sys
+import json
+import time
+import fcntl
+
+import numpy as np
+
+from image_utils import load_image, resize_area
+
+MODES = ('off', 'flag', 'reject')
+ANALYSIS_SIDE = 640            # frames are scored at this longest side
+EDGE_THRESHOLD = 40            # grey-level step counted as an edge
+MIN_ROW_EDGES = 0.01           # fraction of a row that must be edges to count as text
+MAX_COLUMN_EDGES = 0.3         # columns with more edges than this are frame lines
+DARK_LEVEL = 16
+BRIGHT_LEVEL = 240
+
+DEFAULT_THRESHOLDS = {
+    'min_side': 100,               # px, shortest side of the original frame
+    'min_sharpness': 100.0,        # Laplacian variance at ANALYSIS_SIDE
+    'min_mean': 35,                # mean grey level
+    'max_mean': 250,
+    'min_contrast': 40,            # grey levels between the 1st and 99th percentile
+    'min_code_height': 12,         # px, tallest text band in the original frame
+}
+
+# Checked in this order; the first failure is the reported reason
+REASONS = (
+    ('too_small', lambda m, t: m['min_side'] < t['min_side']),
+    ('underexposed', lambda m, t: m['mean'] < t['min_mean']
+        or (m['contrast'] < t['min_contrast'] and m['mean'] < 85)),
+    ('overexposed', lambda m, t: m['mean'] > t['max_mean']
+        or (m['contrast'] < t['min_contrast'] and m['mean'] > 170)),
+    ('low_contrast', lambda m, t: m['contrast'] < t['min_contrast']),
+    ('blurry', lambda m, t: m['sharpness'] < t['min_sharpness']),
+    ('no_text', lambda m, t: m['code_height'] == 0),
+    ('code_too_small', lambda m, t: m['code_height'] < t['min_code_height']),
+)
+
+
+def laplacian_variance(grey):
+    """Variance of the 4-neighbour Laplacian, a standard focus measure"""
+    g = grey.astype(np.float32)
+    lap = g[1:-1, :-2] + g[1:-1, 2:] + g[:-2, 1:-1] + g[2:, 1:-1] - 4.0 * g[1:-1, 1:-1]
+    return float(lap.var())
+
+
+def exposure_metrics(grey):
+    """Mean level, clipped fractions and 1-99 percentile contrast from the histogram"""
+    hist = np.bincount(grey.reshape(-1), minlength=256).astype(np.float64)
+    total = hist.sum()
+    cdf = np.cumsum(hist) / total
+    low = int(np.searchsorted(cdf, 0.01))
+    high = int(np.searchsorted(cdf, 0.99))
+    return {
+        'mean': float((hist * np.arange(256)).sum() / total),
+        'dark_fraction': float(hist[:DARK_LEVEL + 1].sum() / total),
+        'bright_fraction': float(hist[BRIGHT_LEVEL:].sum() / total),
+        'contrast': high - low,
+    }
+
+
+def code_region(grey, scale):
+    """
+    Size of the tallest band of text-like edges
+
+    Returns:
+        (height, width) in pixels of the original frame, (0, 0) without text
+    """
+    g = grey.astype(np.int16)
+    edges = (np.abs(np.diff(g, axis=1))[:-1, :] + np.abs(np.diff(g, axis=0))[:, :-1]) > EDGE_THRESHOLD
+    # Drop vertical frame lines and rules, which cross every text band
+    edges[:, edges.mean(axis=0) > MAX_COLUMN_EDGES] = False
+    in_text = edges.mean(axis=1) > MIN_ROW_EDGES
+    bounds = np.flatnonzero(np.diff(np.concatenate(([0], in_text.astype(np.int8), [0]))))
+    starts, ends = bounds[::2], bounds[1::2]
+    if not len(starts):
+        return 0, 0
+    tallest = int((ends - starts).argmax())
+    start, end = starts[tallest], ends[tallest]
+
+    cols = np.flatnonzero(edges[start:end].any(axis=0))
+    width = cols[-1] - cols[0] + 1 if len(cols) else 0
+    return int(round((end - start) / scale)), int(round(width / scale))
+
+
+def assess(grey, thresholds=None):
+    """
+    Score a greyscale frame against the quality thresholds
+
+    Returns:
+        Dictionary with 'ok', 'reason' (first failed check or None),
+        'reasons' (all failed checks), 'metrics' and 'elapsed_ms'
+    """
+    start = time.perf_counter()
+    limits = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+
+    height, width = grey.shape[:2]
+    scale = min(1.0, ANALYSIS_SIDE / float(max(height, width)))
+    small = grey
+    if scale < 1.0:
+        small = resize_area(grey, max(1, int(width * scale)), max(1, int(height * scale)))
+
+    metrics = {'width': width, 'height': height, 'min_side': min(width, height)}
+    metrics.update(exposure_metrics(small))
+    metrics['sharpness'] = laplacian_variance(small)
+    metrics['code_height'], metrics['code_width'] = code_region(small, scale)
+
+    reasons = [name for name, failed in REASONS if failed(metrics, limits)]
+    return {
+        'ok': not reasons,
+        'reason': reasons[0] if reasons else None,
+        'reasons': reasons,
+        'metrics': {k: round(v, 3) if isinstance(v, float) else v for k, v in metrics.items()},
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def load_thresholds(path=None):
+    """Default thresholds overridden by a JSON config file"""
+    path = path or os.environ.get('EASYOCR_QUALITY_CONFIG')
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    if path:
+        with open(path) as f:
+            overrides = json.load(f)
+        unknown = set(overrides) - set(DEFAULT_THRESHOLDS)
+        if unknown:
+            raise ValueError(f'Unknown quality thresholds: {", ".join(sorted(unknown))}')
+        thresholds.update(overrides)
+    return thresholds
+
+
+class QualityGate:
+    """Quality check in front of OCR, with CPU accounting"""
+
+    def __init__(self, mode='reject', thresholds=None, stats_path=None):
+        if mode not in MODES:
+            raise ValueError(f'Unknown quality gate mode: {mode}')
+        self.mode = mode
+        self.thresholds = thresholds or load_thresholds()
+        self.stats_path = stats_path
+        self.stats = self.empty_stats()
+        self.pending = self.empty_stats()      # counted here, not yet in the stats file
+        self.load()
+
+    @staticmethod
+    def empty_stats():
+        return {
+            'checked': 0,
+            'rejected': 0,
+            'reasons': {},
+            'gate_cpu_seconds': 0.0,
+            'ocr_runs': 0,
+            'ocr_cpu_seconds': 0.0,
+        }
+
+    def read(self):
+        """Counters stored in the stats file"""
+        stats = self.empty_stats()
+        try:
+            with open(self.stats_path) as f:
+                stats.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        return stats
+
+    def load(self):
+        if self.stats_path:
+            self.stats = self.read()
+
+    def count(self, key, amount=1, reason=None):
+        """Add to a counter (or to a reason count) locally and in the pending deltas"""
+        for stats in (self.stats, self.pending):
+            if reason is None:
+                stats[key] += amount
+            else:
+                stats[key][reason] = stats[key].get(reason, 0) + amount
+
+    def save(self):
+        """
+        Merge the pending counters into the stats file: read-modify-write
+        under a lock, so counts from other workers are kept
+        """
+        if not self.stats_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.stats_path)), exist_ok=True)
+        with open(f'{self.stats_path}.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            merged = self.read()
+            for key, amount in self.pending.items():
+                if key == 'reasons':
+                    for reason, count in amount.items():
+                        merged[key][reason] = merged[key].get(reason, 0) + count
+                else:
+                    merged[key] += amount
+
+            tmp_path = f'{self.stats_path}.tmp.{os.getpid()}'
+            with open(tmp_path, 'w') as f:
+                json.dump(merged, f)
+            os.replace(tmp_path, self.stats_path)
+
+        self.stats, self.pending = merged, self.empty_stats()
+
+    def check(self, grey):
+        """Assess a frame; 'reject' is True when OCR should be skipped"""
+        start = time.process_time()
+        result = assess(grey, self.thresholds)
+        self.count('gate_cpu_seconds', time.process_time() - start)
+        self.count('checked')
+        if not result['ok']:
+            self.count('reasons', reason=result['reason'])
+        result['reject'] = not result['ok'] and self.mode == 'reject'
+        if result['reject']:
+            self.count('rejected')
+            self.save()
+        return result
+
+    def record_ocr(self, cpu_seconds):
+        """Account the CPU time of an OCR pass that went through the gate"""
+        self.count('ocr_runs')
+        self.count('ocr_cpu_seconds', cpu_seconds)
+        self.save()
+
+    def report(self):
+        """Rejection counts and estimated CPU-seconds saved"""
+        runs = self.stats['ocr_runs']
+        mean_ocr = self.stats['ocr_cpu_seconds'] / runs if runs else 0.0
+        checked = self.stats['checked']
+        return {
+            'checked': checked,
+            'rejected': self.stats['rejected'],
+            'reject_rate': self.stats['rejected'] / checked if checked else 0.0,
+            'reasons': self.stats['reasons'],
+            'mean_gate_ms': self.stats['gate_cpu_seconds'] / checked * 1000 if checked else 0.0,
+            'mean_ocr_cpu_seconds': mean_ocr,
+            'cpu_seconds_saved': self.stats['rejected'] * mean_ocr - self.stats['gate_cpu_seconds'],
+        }
+
+
+def load_quality_gate(mode=None, stats_path=None):
+    """Quality gate configured from arguments or environment, None when off"""
+    mode = mode or os.environ.get('EASYOCR_QUALITY_GATE', 'reject')
+    if mode == 'off':
+        return None
+    return QualityGate(mode, stats_path=stats_path or os.environ.get('EASYOCR_QUALITY_STATS'))
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Image quality gate')
+    parser.add_argument('command', choices=['check', 'stats'])
+    parser.add_argument('image_path', nargs='?')
+    parser.add_argument('--config', default=None, help='JSON file with threshold overrides')
+    parser.add_argument('--stats', default=os.environ.get('EASYOCR_QUALITY_STATS'))
+    args = parser.parse_args()
+
+    if args.command == 'stats':
+        if not args.stats:
+            print(json.dumps({'success': False, 'error': 'Stats file required (--stats)'}))
+            return 1
+        print(json.dumps(QualityGate('flag', stats_path=args.stats).report(), indent=2))
+        return 0
+
+    if not args.image_path:
+        print(json.dumps({'success': False, 'error': 'Image path required'}))
+        return 1
+    _, grey = load_image(args.image_path)
+    print(json.dumps({'success': True, **assess(grey, load_thresholds(args.config))}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Shared memory-mapped model weights for EasyOCR
+Packs the detector and recognizer weights into a single flat file and maps
+it into every OCR process, so all workers share the same physical pages
+instead of each holding a private copy.
+
+File layout:
+    MAGIC (8 bytes) | header length (8 bytes, little endian) | JSON header |
+    padding | tensor data (each tensor aligned to ALIGNMENT bytes)
+
+Usage:
+    python3 shared_weights.py pack [--output PATH] [--lang en es]
+"""
+
+import os
+import sys
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b'LQWTS001'
+ALIGNMENT = 4096
+DEFAULT_LANGUAGES = ['en', 'es']
+DEFAULT_WEIGHTS_DIR = os.path.join(os.path.expanduser('~'), '.EasyOCR', 'shared')
+
+# Reader attributes holding the networks
+MODULES = ('detector', 'recognizer')
+
+
+def default_weights_path(languages=None):
+    """Default location of the packed weights for a language set"""
+    configured = os.environ.get('EASYOCR_SHARED_WEIGHTS')
+    if configured:
+        return configured
+    languages = languages or DEFAULT_LANGUAGES
+    return os.path.join(DEFAULT_WEIGHTS_DIR, '_'.join(sorted(languages)) + '.weights')
+
+
+def _aligned(offset):
+    return offset + (-offset % ALIGNMENT)
+
+
+def pack_arrays(groups, path):
+    """
+    Write named numpy arrays into a single aligned weights file
+
+    Args:
+        groups: {group_name: {tensor_name: ndarray}}
+        path: Output file (written atomically)
+    """
+    header = {}
+    offset = 0
+    for group, arrays in groups.items():
+        header[group] = {}
+        for name, array in arrays.items():
+            array = np.require(array, requirements='C')
+            header[group][name] = {
+                'dtype': array.dtype.str,
+                'shape': list(array.shape),
+                'offset': offset,
+            }
+            offset = _aligned(offset + array.nbytes)
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _aligned(len(MAGIC) + 8 + len(header_bytes))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f'{path}.tmp.{os.getpid()}'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        for group, arrays in groups.items():
+            for name, array in arrays.items():
+                f.seek(data_start + header[group][name]['offset'])
+                f.write(np.require(array, requirements='C').tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def map_arrays(path):
+    """
+    Map a weights file and return numpy views into the shared mapping
+
+    The mapping is private copy-on-write: pages stay shared between
+    processes (and with the page cache) as long as nobody writes to them.
+
+    Returns:
+        {group_name: {tensor_name: ndarray}}
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'Not a shared weights file: {path}')
+        (header_len,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_len).decode('utf-8'))
+
+    data_start = _aligned(len(MAGIC) + 8 + header_len)
+    mapping = np.memmap(path, mode='c')
+
+    groups = {}
+    for group, entries in header.items():
+        groups[group] = {}
+        for name, entry in entries.items():
+            groups[group][name] = np.ndarray(
+                tuple(entry['shape']),
+                dtype=np.dtype(entry['dtype']),
+                buffer=mapping,
+                offset=data_start + entry['offset']
+            )
+    return groups
+
+
+def pack_reader(reader, path):
+    """Pack the weights of a (non-quantized) easyocr.Reader"""
+    groups = {}
+    for module in MODULES:
+        state = getattr(reader, module).state_dict()
+        groups[module] = {name: tensor.detach().cpu().numpy() for name, tensor in state.items()}
+    pack_arrays(groups, path)
+
+
+def attach_shared_weights(reader, path):
+    """
+    Replace the reader's parameters with tensors backed by the shared mapping
+
+    The private copies loaded by easyocr.Reader are released once the
+    state dicts are reassigned.
+    """
+    import gc
+    import torch
+
+    groups = map_arrays(path)
+    for module in MODULES:
+        tensors = {name: torch.from_numpy(array) for name, array in groups[module].items()}
+        getattr(reader, module).load_state_dict(tensors, assign=True)
+    gc.collect()
+    return reader
+
+
+def load_shared_reader(languages=None, path=None):
+    """
+    Create an easyocr.Reader whose weights live in the shared mapping
+
+    Quantized models keep packed private weights, so the reader is created
+    with quantize=False. The weights file is created on first use.
+    """
+    import easyocr
+
+    languages = languages or DEFAULT_LANGUAGES
+    path = path or default_weights_path(languages)
+
+    reader = easyocr.Reader(languages, gpu=False, quantize=False, verbose=False)
+    if not os.path.exists(path):
+        pack_reader(reader, path)
+    return attach_shared_weights(reader, path)
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Pack EasyOCR weights for shared memory mapping')
+    parser.add_argument('command', choices=['pack'])
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--lang', nargs='+', default=DEFAULT_LANGUAGES)
+    args = parser.parse_args()
+
+    import easyocr
+
+    path = args.output or default_weights_path(args.lang)
+    reader = easyocr.Reader(args.lang, gpu=False, quantize=False, verbose=False)
+    pack_reader(reader, path)
+    print(json.dumps({'success': True, 'path': path, 'size': os.path.getsize(path)}))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
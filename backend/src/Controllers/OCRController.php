@@ -61,6 +61,7 @@ class OCRController
             }
 
             $results = [];
+            $qualityRejection = null;
 
             // Process with OpenAI Vision
             if ($engine === 'openai-vision') {
@@ -121,6 +122,8 @@ class OCRController
                 $easyOCRResult = $this->easyOCRService->processImage($imageBase64);
                 if ($easyOCRResult['success']) {
                     $results['easyocr'] = $easyOCRResult;
+                } elseif (($easyOCRResult['error_code'] ?? null) === 'low_quality') {
+                    $qualityRejection = $easyOCRResult;
                 }
             }
 
@@ -134,6 +137,14 @@ class OCRController
                 $ocrResult = $results['tesseract'];
             } elseif (isset($results['easyocr'])) {
                 $ocrResult = $results['easyocr'];
+            } elseif (isset($qualityRejection)) {
+                return $this->jsonResponse($response, [
+                    'success' => false,
+                    'error_code' => 'low_quality',
+                    'reason' => $qualityRejection['reason'],
+                    'quality' => $qualityRejection['quality'],
+                    'message' => 'Image quality too low, please capture again'
+                ], 422);
             } else {
                 return $this->jsonResponse($response, [
                     'success' => false,
@@ -166,6 +177,55 @@ class OCRController
         }
     }
 
+    /**
+     * Read every label of a shelf or pallet photo
+     * POST /api/ocr/process-shelf
+     */
+    public function processShelf(Request $request, Response $response): Response
+    {
+        try {
+            $data = $request->getParsedBody();
+
+            if (!isset($data['image']) || empty($data['image'])) {
+                return $this->jsonResponse($response, [
+                    'success' => false,
+                    'message' => 'No image provided'
+                ], 400);
+            }
+
+            $result = $this->easyOCRService->processShelfImage($data['image']);
+            if (!$result['success']) {
+                return $this->jsonResponse($response, [
+                    'success' => false,
+                    'message' => $result['error'] ?? 'OCR processing failed'
+                ], 500);
+            }
+
+            // Labels the OCR layer could not match are looked up like single scans
+            $labels = [];
+            foreach ($result['labels'] as $label) {
+                if (empty($label['product']) && !empty($label['code'])) {
+                    $label['product'] = $this->productService->getProductByCode($label['code']);
+                }
+                $labels[] = $label;
+            }
+
+            return $this->jsonResponse($response, [
+                'success' => true,
+                'labels' => $labels,
+                'count' => count($labels),
+                'matched' => count(array_filter($labels, fn ($label) => !empty($label['product']))),
+                'timings' => $result['timings'],
+                'engine_used' => $result['engine_used']
+            ], 200);
+        } catch (\Exception $e) {
+            return $this->jsonResponse($response, [
+                'success' => false,
+                'message' => 'Internal server error: ' . $e->getMessage()
+            ], 500);
+        }
+    }
+
     /**
      * Get product by code
      * GET /api/products/{code}
@@ -7,6 +7,15 @@ class EasyOCRService
     private string $uploadsDir;
     private string $scriptsDir;
     private string $pythonCmd;
+    private string $socketPath;
+
+    // Seconds an installation probe result is reused across requests
+    private const PROBE_TTL = 300;
+    // Seconds to wait for a zygote answer (matches ocr_server.REQUEST_TIMEOUT)
+    private const ZYGOTE_TIMEOUT = 120;
+
+    // Probe result already read during this request
+    private static ?bool $installed = null;
 
     public function __construct(
         string $uploadsDir = __DIR__ . '/../../uploads',
@@ -15,6 +24,8 @@ class EasyOCRService
         $this->uploadsDir = $uploadsDir;
         $this->scriptsDir = $scriptsDir;
         $this->pythonCmd = $this->detectPythonCommand();
+        // Pre-warmed ocr_zygote.py / ocr_server.py socket
+        $this->socketPath = getenv('EASYOCR_SOCKET') ?: '';
 
         if (!is_dir($this->uploadsDir)) {
             mkdir($this->uploadsDir, 0755, true);
@@ -35,14 +46,6 @@ class EasyOCRService
                 ];
             }
 
-            // Check if EasyOCR is installed
-            if (!$this->isEasyOCRInstalled()) {
-                return [
-                    'success' => false,
-                    'error' => 'EasyOCR no está instalado. Run: setup-easyocr.sh'
-                ];
-            }
-
             // Save temporary image
             $tempImage = $this->saveTempImage($imageBase64);
 
@@ -53,32 +56,31 @@ class EasyOCRService
                 ];
             }
 
-            // Check if Python script exists
-            $pythonScript = $this->scriptsDir . '/easyocr_process.py';
-            if (!file_exists($pythonScript)) {
-                unlink($tempImage);
+            $run = $this->runOCR($tempImage);
+            unlink($tempImage);
+
+            if (isset($run['error'])) {
                 return [
                     'success' => false,
-                    'error' => 'Script de EasyOCR no encontrado'
+                    'error' => $run['error']
                 ];
             }
+            $output = $run['output'];
 
-            // Run Python script with proper escaping
-            $command = $this->buildPythonCommand($pythonScript, $tempImage);
-            $output = @shell_exec($command);
-
-            unlink($tempImage);
+            // Parse JSON response from Python
+            $result = json_decode($output, true);
 
-            if (!$output) {
+            // Frame rejected by the quality gate: let the client re-capture
+            if (is_array($result) && ($result['error_code'] ?? null) === 'low_quality') {
                 return [
                     'success' => false,
-                    'error' => 'Error al procesar OCR con EasyOCR'
+                    'error' => 'Imagen de baja calidad: ' . $result['reason'],
+                    'error_code' => 'low_quality',
+                    'reason' => $result['reason'],
+                    'quality' => $result['quality'] ?? null
                 ];
             }
 
-            // Parse JSON response from Python
-            $result = json_decode($output, true);
-
             if (!$result || !isset($result['raw_text'])) {
                 return [
                     'success' => false,
@@ -86,12 +88,64 @@ class EasyOCRService
                 ];
             }
 
-            $filteredCode = $this->filterText($result['raw_text']);
+            // Prefer the code picked by the layout-aware extractor
+            $fields = $result['fields'] ?? null;
+            $filteredCode = $fields['code']['value'] ?? $this->filterText($result['raw_text']);
 
             return [
                 'success' => true,
                 'raw_text' => $result['raw_text'],
                 'filtered_code' => $filteredCode,
+                'fields' => $fields,
+                'tokens' => $result['tokens'] ?? [],
+                'engine_used' => 'easyocr'
+            ];
+        } catch (\Exception $e) {
+            return [
+                'success' => false,
+                'error' => 'Excepción: ' . $e->getMessage()
+            ];
+        }
+    }
+
+    /**
+     * Read every label of a shelf or pallet photo (multi_label.py)
+     */
+    public function processShelfImage(string $imageBase64): array
+    {
+        try {
+            if (!$this->pythonCmd) {
+                return [
+                    'success' => false,
+                    'error' => 'Python no está instalado en el servidor'
+                ];
+            }
+
+            $tempImage = $this->saveTempImage($imageBase64);
+            if (!$tempImage) {
+                return [
+                    'success' => false,
+                    'error' => 'No se pudo guardar la imagen temporal'
+                ];
+            }
+
+            // One detection and one batched recognition for all the labels
+            $run = $this->runOCR($tempImage, true);
+            unlink($tempImage);
+
+            $result = isset($run['output']) ? json_decode($run['output'], true) : null;
+            if (!$result || !isset($result['labels'])) {
+                return [
+                    'success' => false,
+                    'error' => $run['error'] ?? $result['error'] ?? 'Error al procesar OCR con EasyOCR'
+                ];
+            }
+
+            return [
+                'success' => true,
+                'labels' => $result['labels'],
+                'count' => $result['count'] ?? count($result['labels']),
+                'timings' => $result['timings'] ?? null,
                 'engine_used' => 'easyocr'
             ];
         } catch (\Exception $e) {
@@ -102,6 +156,42 @@ class EasyOCRService
         }
     }
 
+    /**
+     * OCR output for an image: pre-warmed zygote first, a one-shot Python
+     * process only when no zygote accepts the connection
+     *
+     * @return array ['output' => string] or ['error' => string]
+     */
+    private function runOCR(string $imagePath, bool $multi = false): array
+    {
+        try {
+            $output = $this->requestZygote($imagePath, $multi);
+        } catch (\RuntimeException $e) {
+            // The zygote took the job: running it again would double the latency
+            return ['error' => 'Error al procesar OCR con EasyOCR: ' . $e->getMessage()];
+        }
+
+        if ($output === null) {
+            if (!$this->isEasyOCRInstalled()) {
+                return ['error' => 'EasyOCR no está instalado. Run: setup-easyocr.sh'];
+            }
+
+            $pythonScript = $this->scriptsDir . '/easyocr_process.py';
+            if (!file_exists($pythonScript)) {
+                return ['error' => 'Script de EasyOCR no encontrado'];
+            }
+
+            $command = $this->buildPythonCommand($pythonScript, $imagePath, $multi ? ['--multi'] : []);
+            $output = @shell_exec($command);
+        }
+
+        if (!$output) {
+            return ['error' => 'Error al procesar OCR con EasyOCR'];
+        }
+
+        return ['output' => $output];
+    }
+
     /**
      * Save base64 image to temporary file
      */
@@ -164,23 +254,142 @@ class EasyOCRService
             return false;
         }
 
-        $command = $this->pythonCmd . ' -c "import easyocr; print(easyocr.__version__)" 2>&1';
-        $output = @shell_exec($command);
+        // A zygote answering on the socket has EasyOCR loaded already
+        if ($this->pingZygote()) {
+            return true;
+        }
+
+        // find_spec probe: answers without importing torch or EasyOCR. Static
+        // properties reset with every request, so the result is kept in a
+        // temp file for PROBE_TTL seconds
+        if (self::$installed === null) {
+            self::$installed = $this->readProbeCache();
+        }
+        if (self::$installed === null) {
+            $probe = escapeshellarg($this->scriptsDir . '/ocr_zygote.py');
+            $output = [];
+            $returnCode = 1;
+            @exec("{$this->pythonCmd} {$probe} check 2>/dev/null", $output, $returnCode);
+            self::$installed = $returnCode === 0;
+            $this->writeProbeCache(self::$installed);
+        }
+
+        return self::$installed;
+    }
+
+    /**
+     * Probe cache file of this interpreter (command and PATH) and scripts directory
+     */
+    private function probeCachePath(): string
+    {
+        $key = $this->pythonCmd . '|' . (getenv('PATH') ?: '') . '|' . realpath($this->scriptsDir);
+        return sys_get_temp_dir() . '/logistiq_easyocr_probe_' . md5($key) . '.json';
+    }
+
+    /**
+     * Cached probe result, null when missing or older than PROBE_TTL
+     */
+    private function readProbeCache(): ?bool
+    {
+        $path = $this->probeCachePath();
+        $modified = @filemtime($path);
+        if ($modified === false || time() - $modified > self::PROBE_TTL) {
+            return null;
+        }
+        $cached = json_decode((string)@file_get_contents($path), true);
+        return is_array($cached) && is_bool($cached['installed'] ?? null) ? $cached['installed'] : null;
+    }
+
+    /**
+     * Store the probe result (written to a temp name, then renamed)
+     */
+    private function writeProbeCache(bool $installed): void
+    {
+        $path = $this->probeCachePath();
+        $tmpPath = $path . '.' . getmypid();
+        if (@file_put_contents($tmpPath, json_encode(['installed' => $installed])) !== false) {
+            @rename($tmpPath, $path);
+        }
+    }
+
+    /**
+     * Connection to the EASYOCR_SOCKET zygote, null when nothing accepts it
+     * (a socket file left by a crashed zygote refuses the connection)
+     *
+     * @return resource|null
+     */
+    private function connectZygote()
+    {
+        if ($this->socketPath === '' || !file_exists($this->socketPath)) {
+            return null;
+        }
+
+        $conn = @stream_socket_client('unix://' . $this->socketPath, $errno, $errstr, 2);
+        return $conn === false ? null : $conn;
+    }
+
+    /**
+     * Whether a zygote answers a ping on the socket
+     */
+    private function pingZygote(): bool
+    {
+        $conn = $this->connectZygote();
+        if ($conn === null) {
+            return false;
+        }
+
+        stream_set_timeout($conn, 2);
+        fwrite($conn, json_encode(['command' => 'ping']) . "\n");
+        $response = json_decode((string)fgets($conn), true);
+        fclose($conn);
+
+        return is_array($response) && ($response['success'] ?? false) === true;
+    }
+
+    /**
+     * Send the image to the pre-warmed zygote
+     *
+     * @return string|null Response line, null when no zygote accepts the connection
+     * @throws \RuntimeException When the zygote took the request but did not answer
+     */
+    private function requestZygote(string $imagePath, bool $multi = false): ?string
+    {
+        $conn = $this->connectZygote();
+        if ($conn === null) {
+            return null;
+        }
+
+        stream_set_timeout($conn, self::ZYGOTE_TIMEOUT);
+        $request = ['image_path' => realpath($imagePath)];
+        if ($multi) {
+            $request['multi'] = true;
+        }
+        fwrite($conn, json_encode($request) . "\n");
+        $output = fgets($conn);
+        $timedOut = stream_get_meta_data($conn)['timed_out'];
+        fclose($conn);
+
+        if ($output === false) {
+            throw new \RuntimeException($timedOut
+                ? 'el zygote no respondió en ' . self::ZYGOTE_TIMEOUT . ' s'
+                : 'el zygote cerró la conexión sin responder');
+        }
 
-        return !empty($output);
+        return $output;
     }
 
     /**
      * Build Python command with proper escaping
      */
-    private function buildPythonCommand(string $scriptPath, string $imagePath): string
+    private function buildPythonCommand(string $scriptPath, string $imagePath, array $options = []): string
     {
         // Escape paths for shell
         $scriptPath = escapeshellarg($scriptPath);
         $imagePath = escapeshellarg($imagePath);
+        $options = implode('', array_map(fn ($option) => ' ' . escapeshellarg($option), $options));
 
         // Build command with stderr redirected
-        return "{$this->pythonCmd} {$scriptPath} {$imagePath} 2>/dev/null";
+        return "{$this->pythonCmd} {$scriptPath} {$imagePath}{$options} 2>/dev/null";
     }
 
     /**
@@ -4,11 +4,21 @@ namespace LogistiQ\Services;
 
 class ProductService
 {
+    // Fixed-width records of codes.idx written by backend/scripts/ingest_catalog.py
+    private const CODE_WIDTH = 40;
+    private const INDEX_RECORD = 63;
+    // Products returned by one search
+    public const SEARCH_LIMIT = 50;
+
     private string $dataPath;
+    private string $catalogPath;
 
-    public function __construct(string $dataPath = __DIR__ . '/../../data/products.json')
-    {
+    public function __construct(
+        string $dataPath = __DIR__ . '/../../data/products.json',
+        string $catalogPath = __DIR__ . '/../../data/catalog/current'
+    ) {
         $this->dataPath = $dataPath;
+        $this->catalogPath = $catalogPath;
     }
 
     /**
@@ -16,10 +26,20 @@ class ProductService
      */
     public function getProductByCode(string $code): ?array
     {
-        $products = $this->getAllProducts();
+        $key = $this->catalogCode($code);
 
-        foreach ($products as $product) {
-            if ($product['code'] === $code) {
+        $catalog = $this->catalogDirectory();
+        if ($catalog !== null && $key !== '') {
+            $product = $this->lookupCatalog($catalog, $key);
+            if ($product !== null) {
+                return $product;
+            }
+        }
+
+        // Hand-maintained products.json, also when the catalog index misses
+        foreach ($this->readProductsFile() as $product) {
+            $productCode = (string)($product['code'] ?? '');
+            if ($productCode === $code || ($key !== '' && $this->catalogCode($productCode) === $key)) {
                 return $product;
             }
         }
@@ -27,10 +47,118 @@ class ProductService
         return null;
     }
 
+    /**
+     * Catalog key of a code, as ingest_catalog.catalog_code builds it
+     * ('12-345' -> '12345', 'B-105' stays 'B-105')
+     */
+    private function catalogCode(string $code): string
+    {
+        $code = trim($code);
+        $digits = preg_replace('/[\s\-_.]/', '', $code);
+        if ($digits !== '' && ctype_digit($digits)) {
+            return $digits;
+        }
+        return preg_replace('/[^A-Za-z0-9\-_]/', '', $code);
+    }
+
+    /**
+     * Directory of the published catalog generation, or null when none was ingested
+     */
+    private function catalogDirectory(): ?string
+    {
+        // Resolve the symlink once so index and data come from the same generation
+        $directory = realpath($this->catalogPath);
+        if ($directory === false || !file_exists($directory . '/codes.idx')) {
+            return null;
+        }
+        return $directory;
+    }
+
+    /**
+     * Binary search of codes.idx, then one read of products.jsonl
+     */
+    private function lookupCatalog(string $directory, string $code): ?array
+    {
+        $index = fopen($directory . '/codes.idx', 'rb');
+        if ($index === false) {
+            return null;
+        }
+
+        $low = 0;
+        $high = intdiv(filesize($directory . '/codes.idx'), self::INDEX_RECORD);
+        $found = null;
+        while ($low < $high) {
+            $middle = intdiv($low + $high, 2);
+            fseek($index, $middle * self::INDEX_RECORD);
+            $record = fread($index, self::INDEX_RECORD);
+            $recordCode = rtrim(substr($record, 0, self::CODE_WIDTH));
+            $cmp = strcmp($recordCode, $code);
+            if ($cmp === 0) {
+                $found = $record;
+                break;
+            }
+            if ($cmp < 0) {
+                $low = $middle + 1;
+            } else {
+                $high = $middle;
+            }
+        }
+        fclose($index);
+
+        if ($found === null) {
+            return null;
+        }
+
+        $offset = (int)substr($found, self::CODE_WIDTH, 12);
+        $length = (int)substr($found, self::CODE_WIDTH + 12, 10);
+        $data = fopen($directory . '/products.jsonl', 'rb');
+        if ($data === false) {
+            return null;
+        }
+        fseek($data, $offset);
+        $product = json_decode(fread($data, $length), true);
+        fclose($data);
+
+        return is_array($product) ? $product : null;
+    }
+
     /**
      * Get all products
+     * Loads the whole catalog; searches stream it through products() instead
      */
     public function getAllProducts(): array
+    {
+        return iterator_to_array($this->products(), false);
+    }
+
+    /**
+     * Products one by one: the catalog products.jsonl read line by line,
+     * or products.json when no catalog was ingested
+     */
+    private function products(?string $filter = null): \Generator
+    {
+        $catalog = $this->catalogDirectory();
+        if ($catalog === null) {
+            yield from $this->readProductsFile();
+            return;
+        }
+
+        foreach (new \SplFileObject($catalog . '/products.jsonl') as $line) {
+            // Lines without the raw query text cannot match, skip decoding them
+            if (trim($line) === '' || ($filter !== null && stripos($line, $filter) === false)) {
+                continue;
+            }
+            $product = json_decode($line, true);
+            if (is_array($product)) {
+                yield $product;
+            }
+        }
+    }
+
+    /**
+     * Products of the hand-maintained products.json
+     */
+    private function readProductsFile(): array
     {
         if (!file_exists($this->dataPath)) {
             return [];
@@ -43,21 +171,32 @@ class ProductService
     }
 
     /**
-     * Search products by query (searches in name and description)
+     * Search products by query (searches in code, name and description)
+     * Streams the catalog and stops after $limit matches
      */
-    public function searchProducts(string $query): array
+    public function searchProducts(string $query, int $limit = self::SEARCH_LIMIT): array
     {
-        $products = $this->getAllProducts();
         $query = strtolower($query);
         $results = [];
+        if ($limit < 1) {
+            return $results;
+        }
+
+        // products.jsonl stores text unescaped (ingest_catalog ENCODER), so a
+        // query JSON would not escape can pre-filter the raw lines
+        $encoded = json_encode($query, JSON_UNESCAPED_UNICODE | JSON_UNESCAPED_SLASHES);
+        $filter = $encoded === '"' . $query . '"' ? $query : null;
 
-        foreach ($products as $product) {
+        foreach ($this->products($filter) as $product) {
             if (
-                strpos(strtolower($product['code']), $query) !== false ||
-                strpos(strtolower($product['name']), $query) !== false ||
-                strpos(strtolower($product['description']), $query) !== false
+                strpos(strtolower((string)($product['code'] ?? '')), $query) !== false ||
+                strpos(strtolower((string)($product['name'] ?? '')), $query) !== false ||
+                strpos(strtolower((string)($product['description'] ?? '')), $query) !== false
             ) {
                 $results[] = $product;
+                if (count($results) >= $limit) {
+                    break;
+                }
             }
         }
 
@@ -34,6 +34,61 @@ class ProductServiceTest extends TestCase
         $this->assertNull($product);
     }
 
+    public function testGetProductByCodeNormalized(): void
+    {
+        $this->assertEquals('12345', $this->productService->getProductByCode(' 12-345 ')['code']);
+        $this->assertNull($this->productService->getProductByCode('I2345'));
+    }
+
+    public function testGetProductByCodeFromCatalogWithFallback(): void
+    {
+        // Published generation, as backend/scripts/ingest_catalog.py writes it
+        $catalog = sys_get_temp_dir() . '/catalog_' . uniqid();
+        mkdir($catalog);
+        $line = json_encode(['code' => '54321', 'name' => 'Arandela (tarifa)']) . "\n";
+        file_put_contents($catalog . '/products.jsonl', $line);
+        file_put_contents($catalog . '/codes.idx', sprintf("%-40s%12d%10d\n", '54321', 0, strlen($line)));
+
+        $service = new ProductService($this->testDataPath, $catalog);
+        try {
+            $this->assertEquals('Arandela (tarifa)', $service->getProductByCode('54-321')['name']);
+            // Codes missing from the index still come from products.json
+            $this->assertEquals('Tornillo M8x20', $service->getProductByCode(' 12345 ')['name']);
+            $this->assertNull($service->getProductByCode('99999'));
+        } finally {
+            unlink($catalog . '/products.jsonl');
+            unlink($catalog . '/codes.idx');
+            rmdir($catalog);
+        }
+    }
+
+    public function testSearchProductsStreamsCatalogUpToLimit(): void
+    {
+        $catalog = sys_get_temp_dir() . '/catalog_' . uniqid();
+        mkdir($catalog);
+        $lines = '';
+        for ($i = 0; $i < 200; $i++) {
+            $lines .= json_encode(['code' => sprintf('%05d', $i), 'name' => 'Tuerca M' . $i],
+                JSON_UNESCAPED_UNICODE) . "\n";
+        }
+        $lines .= json_encode(['code' => '99999', 'name' => 'Arandela métrica'], JSON_UNESCAPED_UNICODE) . "\n";
+        file_put_contents($catalog . '/products.jsonl', $lines);
+        file_put_contents($catalog . '/codes.idx', '');
+
+        $service = new ProductService($this->testDataPath, $catalog);
+        try {
+            $this->assertCount(ProductService::SEARCH_LIMIT, $service->searchProducts('tuerca'));
+            $this->assertCount(3, $service->searchProducts('tuerca', 3));
+            $results = $service->searchProducts('métrica');
+            $this->assertCount(1, $results);
+            $this->assertEquals('99999', $results[0]['code']);
+        } finally {
+            unlink($catalog . '/products.jsonl');
+            unlink($catalog . '/codes.idx');
+            rmdir($catalog);
+        }
+    }
+
     public function testGetAllProducts(): void
     {
         $products = $this->productService->getAllProducts();
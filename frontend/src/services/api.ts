@@ -1,5 +1,11 @@
 import axios from 'axios'
-import { APIResponse, OCREngine, APIKeyStatus, SaveAPIKeysRequest } from '../types/product'
+import {
+  APIResponse,
+  OCREngine,
+  APIKeyStatus,
+  SaveAPIKeysRequest,
+  ShelfResponse
+} from '../types/product'
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api'
 
@@ -72,6 +78,24 @@ export const processImage = async (
   }
 }
 
+export const processShelfImage = async (imageBase64: string): Promise<ShelfResponse> => {
+  try {
+    const response = await apiClient.post('/ocr/process-shelf', { image: imageBase64 })
+    return response.data
+  } catch (error) {
+    if (axios.isAxiosError(error)) {
+      return {
+        success: false,
+        message: error.response?.data?.message || 'Error al procesar la foto de la estantería'
+      }
+    }
+    return {
+      success: false,
+      message: 'Ocurrió un error al procesar la solicitud'
+    }
+  }
+}
+
 export const getProduct = async (code: string): Promise<APIResponse> => {
   try {
     const response = await apiClient.get(`/products/${code}`)
@@ -9,10 +9,52 @@ export interface Product {
   category: string
 }
 
+export interface OCRToken {
+  text: string
+  confidence: number
+  box: number[][]
+}
+
+export interface OCRField {
+  value: string
+  text: string
+  confidence: number
+  score: number
+  box: number[][]
+}
+
+export interface OCRFields {
+  code: OCRField | null
+  price: OCRField | null
+  name: OCRField | null
+  barcode: OCRField | null
+}
+
 export interface OCRResult {
   raw_text: string
   filtered_code: string
   engine_used: string
+  fields?: OCRFields | null
+  tokens?: OCRToken[]
+}
+
+export interface ShelfLabel {
+  index: number
+  box: number[][]
+  code: string | null
+  fields: OCRFields
+  tokens: OCRToken[]
+  raw_text: string
+  confidence: number
+  product: Product | null
+}
+
+export interface ShelfResponse {
+  success: boolean
+  labels?: ShelfLabel[]
+  count?: number
+  matched?: number
+  message?: string
 }
 
 export interface ErrorDetails {
@@ -6,6 +6,15 @@ if (empty($referencia)) {
     respond(['success' => false, 'message' => 'Referencia requerida'], 400);
 }
 
+// Almacén indexado: búsqueda por índice sin leer todas las entradas
+if (entriesStoreActive()) {
+    $result = entriesStore(['check', '--', $referencia]);
+    if ($result === null) {
+        respond(['success' => false, 'message' => 'Error al consultar las entradas'], 500);
+    }
+    respond($result, 200);
+}
+
 // Cargar entries.json
 $entriesFile = DATA_PATH . '/entries.json';
 if (!file_exists($entriesFile)) {
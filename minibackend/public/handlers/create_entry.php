@@ -89,10 +89,6 @@ if ($savedImageCount === 0) {
     respond(['success' => false, 'message' => 'Error al guardar las imágenes'], 500);
 }
 
-// Cargar entries.json
-$entriesFile = DATA_PATH . '/entries.json';
-$entriesData = json_decode(file_get_contents($entriesFile), true);
-
 // Crear nueva entrada
 $newEntry = [
     'id' => $entryId,
@@ -106,11 +102,22 @@ $newEntry = [
     'imagenes' => $imagePaths
 ];
 
-$entriesData['entries'][] = $newEntry;
+if (entriesStoreActive()) {
+    // Almacén indexado: se añade un registro al log, sin reescribir el resto
+    if (entriesStore(['append'], json_encode($newEntry, JSON_UNESCAPED_SLASHES)) === null) {
+        respond(['success' => false, 'message' => 'Error al guardar la entrada'], 500);
+    }
+} else {
+    // Cargar entries.json
+    $entriesFile = DATA_PATH . '/entries.json';
+    $entriesData = json_decode(file_get_contents($entriesFile), true);
+
+    $entriesData['entries'][] = $newEntry;
 
-// Guardar entries.json
-if (file_put_contents($entriesFile, json_encode($entriesData, JSON_PRETTY_PRINT | JSON_UNESCAPED_SLASHES)) === false) {
-    respond(['success' => false, 'message' => 'Error al guardar la entrada'], 500);
+    // Guardar entries.json
+    if (file_put_contents($entriesFile, json_encode($entriesData, JSON_PRETTY_PRINT | JSON_UNESCAPED_SLASHES)) === false) {
+        respond(['success' => false, 'message' => 'Error al guardar la entrada'], 500);
+    }
 }
 
 // Agregar fabricante si es nuevo
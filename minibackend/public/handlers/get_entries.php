@@ -11,6 +11,15 @@ if ($offset < 0) {
     $offset = 0;
 }
 
+// Almacén indexado: página por índice de fecha sin leer todas las entradas
+if (entriesStoreActive()) {
+    $result = entriesStore(['list', '--limit', $limit, '--offset', $offset]);
+    if ($result === null) {
+        respond(['success' => false, 'message' => 'Error al consultar las entradas'], 500);
+    }
+    respond($result, 200);
+}
+
 // Cargar entries.json
 $entriesFile = DATA_PATH . '/entries.json';
 if (!file_exists($entriesFile)) {
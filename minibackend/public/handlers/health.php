@@ -25,7 +25,17 @@ $manufacturersFile = DATA_PATH . '/manufacturers.json';
 $entriesCount = 0;
 $manufacturersCount = 0;
 
-if (file_exists($entriesFile)) {
+// El recuento sale de meta.json y la cola del log; las estadísticas completas del
+// almacén (que lanzan Python) solo se piden con ?detail=1
+$storeCount = entriesStoreCount();
+$storeStats = null;
+if (($_GET['detail'] ?? '') === '1') {
+    $storeStats = entriesStore(['stats']);
+}
+
+if ($storeCount !== null) {
+    $entriesCount = $storeCount;
+} elseif (file_exists($entriesFile)) {
     $entriesData = json_decode(file_get_contents($entriesFile), true);
     $entriesCount = count($entriesData['entries'] ?? []);
 }
@@ -68,4 +78,8 @@ $response = [
     'encryption_key' => $config['encryption']['key'] ?? null,
 ];
 
+if ($storeStats !== null) {
+    $response['entries_store'] = $storeStats;
+}
+
 respond($response, 200);
@@ -40,6 +40,9 @@ define('BASE_PATH', __DIR__ . '/..');
 define('DATA_PATH', BASE_PATH . '/data');
 define('STORAGE_PATH', BASE_PATH . '/storage/almacen_imagenes');
 define('HANDLERS_PATH', __DIR__ . '/handlers');
+// Almacén indexado de entradas (se activa al migrar con scripts/entries_store.py migrate)
+define('ENTRIES_STORE_PATH', DATA_PATH . '/entries_store');
+define('ENTRIES_STORE_SCRIPT', BASE_PATH . '/scripts/entries_store.py');
 
 // Asegurar que existen los directorios
 if (!is_dir(DATA_PATH)) {
@@ -117,6 +120,78 @@ function initializeJsonFiles() {
     }
 }
 
+/**
+ * Indica si el almacén indexado de entradas está activo
+ * migrate escribe meta.json y mueve el almacén ya cargado a su sitio; un directorio
+ * sin meta.json (una migración fallida o en curso) no oculta entries.json
+ */
+function entriesStoreActive() {
+    return is_file(ENTRIES_STORE_PATH . '/meta.json');
+}
+
+/**
+ * Ejecutar un comando del almacén indexado de entradas
+ * Devuelve la respuesta JSON decodificada, o null si el almacén no está activo o falla
+ */
+function entriesStore(array $args, ?string $stdin = null) {
+    if (!entriesStoreActive()) {
+        return null;
+    }
+
+    $command = 'python3 ' . escapeshellarg(ENTRIES_STORE_SCRIPT)
+        . ' --store ' . escapeshellarg(ENTRIES_STORE_PATH);
+    foreach ($args as $arg) {
+        $command .= ' ' . escapeshellarg((string)$arg);
+    }
+
+    $process = proc_open($command, [0 => ['pipe', 'r'], 1 => ['pipe', 'w'], 2 => ['pipe', 'w']], $pipes);
+    if (!is_resource($process)) {
+        return null;
+    }
+    fwrite($pipes[0], $stdin ?? '');
+    fclose($pipes[0]);
+    $output = stream_get_contents($pipes[1]);
+    fclose($pipes[1]);
+    fclose($pipes[2]);
+
+    if (proc_close($process) !== 0) {
+        return null;
+    }
+    return json_decode($output, true);
+}
+
+/**
+ * Número de entradas del almacén indexado, leído sin lanzar Python
+ * meta.json da las entradas indexadas; se suman los registros válidos de la cola del log
+ * (como mucho las 2000 entradas anteriores a la siguiente compactación)
+ * Devuelve null si el almacén no está activo
+ */
+function entriesStoreCount() {
+    if (!entriesStoreActive()) {
+        return null;
+    }
+
+    $meta = @json_decode((string)@file_get_contents(ENTRIES_STORE_PATH . '/meta.json'), true);
+    $count = (int)($meta['indexed_count'] ?? 0);
+    $log = @fopen(ENTRIES_STORE_PATH . '/entries.log', 'rb');
+    if ($log === false) {
+        return $count;
+    }
+
+    fseek($log, (int)($meta['indexed_offset'] ?? 0));
+    while (($line = fgets($log)) !== false) {
+        if (substr($line, -1) !== "\n") {
+            break;  // registro que aún se está escribiendo
+        }
+        $payload = substr($line, 9, -1);
+        if (strlen($line) >= 10 && substr($line, 0, 8) === hash('crc32b', $payload)) {
+            $count++;
+        }
+    }
+    fclose($log);
+    return $count;
+}
+
 /**
  * Responder con JSON
  */
@@ -0,0 +1,707 @@
+#!/usr/bin/env python3
+"""
+Append-only indexed store for warehouse entries
+Replaces data/entries.json, which is rewritten on every new entry and parsed
+whole on every listing or reference check. Entries go to an append-only log
+and two sorted, fixed-width index files answer the API queries:
+
+    entries.log        one record per line: '<crc32> <entry json>'
+    refs.<gen>.idx     reference hash -> count, total quantity, last entry
+    dates.<gen>.idx    (timestamp, log offset) ascending, for newest-first pages
+    meta.json          index generation and the log offset it covers
+
+Reference checks are a binary search in refs.idx, pages are a binary search
+plus a seek in dates.idx. Entries appended after the last compaction (the log
+tail, at most COMPACT_TAIL records) are read from the log and merged in.
+Compaction folds the tail into a new index generation; meta.json is replaced
+atomically last, so a crash leaves the previous generation in use. Appends are
+fsynced under an exclusive lock and a torn last record is dropped.
+
+The check and list commands print the same JSON as the PHP handlers, which
+use this store once data/entries_store/meta.json exists. Only migrate creates
+the store, and it renames a fully loaded store into place.
+
+Usage:
+    python3 entries_store.py migrate [--from data/entries.json] [--store DIR]
+    python3 entries_store.py append < entry.json
+    python3 entries_store.py check <referencia>
+    python3 entries_store.py list [--limit 50] [--offset 0]
+    python3 entries_store.py stats | compact
+    python3 entries_store.py bench [--entries 1000000] [--baseline]
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import heapq
+import hashlib
+from datetime import datetime, timezone
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPT_DIR, '..', 'data')
+DEFAULT_STORE = os.path.join(DATA_DIR, 'entries_store')
+DEFAULT_ENTRIES_JSON = os.path.join(DATA_DIR, 'entries.json')
+
+LOG_NAME = 'entries.log'
+META_NAME = 'meta.json'
+LOCK_NAME = 'lock'
+COMPACT_TAIL = 2000            # log records past the indexes before compacting
+REF_RECORD = 56                # '<key:16> <count:10> <quantity:14> <offset:12>\n'
+DATE_RECORD = 26               # '<epoch:12> <offset:12>\n'
+LIST_MAX_LIMIT = 500           # same bounds as get_entries.php
+LIST_DEFAULT_LIMIT = 50
+
+
+def reference_key(referencia):
+    """Fixed-width index key of a reference code"""
+    return hashlib.sha1(str(referencia).encode('utf-8')).hexdigest()[:16]
+
+
+def timestamp_epoch(timestamp):
+    """Seconds since the epoch of an ISO 8601 timestamp (0 when unparseable)"""
+    try:
+        moment = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+    except ValueError:
+        return 0
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0, int(moment.timestamp()))
+
+
+def encode_record(entry):
+    """Log line of one entry, prefixed with the CRC32 of its JSON"""
+    payload = json.dumps(entry, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return b'%08x %s\n' % (zlib.crc32(payload), payload)
+
+
+def decode_record(line):
+    """Entry of a log line, or None when the line is torn or corrupt"""
+    if len(line) < 10 or not line.endswith(b'\n'):
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def entry_summary(entry):
+    """Entry as listed by GET /entries"""
+    return {
+        'id': entry.get('id'),
+        'referencia': entry.get('referencia'),
+        'fabricante': entry.get('fabricante'),
+        'cantidad': entry.get('cantidad'),
+        'operario': entry.get('operario'),
+        'timestamp': entry.get('timestamp'),
+        'image_count': len(entry.get('imagenes') or []),
+    }
+
+
+def write_atomic(path, data):
+    """Write bytes to path through a fsynced temporary file"""
+    tmp_path = f'{path}.tmp.{os.getpid()}'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class FixedIndex:
+    """Sorted file of fixed-width text records, read by binary search"""
+
+    def __init__(self, path, record_size):
+        self.record_size = record_size
+        try:
+            self.file = open(path, 'rb')
+            self.size = os.fstat(self.file.fileno()).st_size // record_size
+        except FileNotFoundError:
+            self.file = None
+            self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, position):
+        self.file.seek(position * self.record_size)
+        return self.file.read(self.record_size).split()
+
+    def bisect(self, key, parse):
+        """First position whose parsed record is >= key"""
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if parse(self[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def records(self):
+        """All records in order, streamed"""
+        if self.file is None:
+            return
+        self.file.seek(0)
+        for line in self.file:
+            yield line.split()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+def parse_ref(fields):
+    return fields[0].decode('ascii'), int(fields[1]), int(fields[2]), int(fields[3])
+
+
+def parse_date(fields):
+    return int(fields[0]), int(fields[1])
+
+
+class EntriesStore:
+    """Append-only entry log with reference and date indexes"""
+
+    def __init__(self, root=None, compact_tail=COMPACT_TAIL, create=False):
+        self.root = root or os.environ.get('ENTRIES_STORE', DEFAULT_STORE)
+        self.compact_tail = compact_tail
+        # The PHP handlers switch to the store once it exists: only migrate
+        # (and the benchmark) may create one
+        if create:
+            os.makedirs(self.root, exist_ok=True)
+        elif not os.path.isdir(self.root):
+            raise FileNotFoundError(f'no entries store at {self.root} (run migrate)')
+        self.log_path = os.path.join(self.root, LOG_NAME)
+        self.meta_path = os.path.join(self.root, META_NAME)
+        self.meta = None
+        self.meta_mtime = None
+        self.refs = self.dates = None
+        self.log = None
+        self.refresh()
+
+    # --- reading -------------------------------------------------------
+
+    def refresh(self):
+        """Pick up appends and compactions made by other processes"""
+        try:
+            mtime = os.stat(self.meta_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if self.meta is None or mtime != self.meta_mtime:
+            try:
+                with open(self.meta_path, encoding='utf-8') as f:
+                    meta = json.load(f)
+            except FileNotFoundError:
+                meta = {'version': 1, 'generation': 0, 'indexed_offset': 0, 'indexed_count': 0}
+            self.close_indexes()
+            self.meta, self.meta_mtime = meta, mtime
+            self.refs = FixedIndex(self.index_path('refs', meta['generation']), REF_RECORD)
+            self.dates = FixedIndex(self.index_path('dates', meta['generation']), DATE_RECORD)
+            self.tail = []
+            self.tail_end = meta['indexed_offset']
+        self.read_tail()
+
+    def index_path(self, kind, generation):
+        return os.path.join(self.root, f'{kind}.{generation}.idx')
+
+    def read_tail(self):
+        """Parse log records appended since the last read"""
+        if self.log is None:
+            if not os.path.exists(self.log_path):
+                return
+            self.log = open(self.log_path, 'rb')
+        self.log.seek(self.tail_end)
+        while True:
+            offset = self.log.tell()
+            line = self.log.readline()
+            if not line.endswith(b'\n'):
+                break                  # end of log, or a record still being written
+            entry = decode_record(line)
+            if entry is not None:
+                self.tail.append((offset, entry))
+            self.tail_end = offset + len(line)
+
+    def read(self, offset):
+        """Entry stored at a log offset"""
+        self.log.seek(offset)
+        return decode_record(self.log.readline())
+
+    def count(self):
+        """Number of stored entries"""
+        return self.meta['indexed_count'] + len(self.tail)
+
+    def check_reference(self, referencia):
+        """
+        Entries of a reference, answered like check_reference.php
+
+        Returns:
+            {'exists': False} or {'exists', 'count', 'total_quantity', 'last_entry'}
+        """
+        self.refresh()
+        count = quantity = 0
+        last_offset = None
+
+        key = reference_key(referencia)
+        position = self.refs.bisect(key, lambda fields: fields[0].decode('ascii'))
+        if position < len(self.refs):
+            found, count, quantity, last_offset = parse_ref(self.refs[position])
+            if found != key:
+                count = quantity = 0
+                last_offset = None
+
+        last = self.read(last_offset) if last_offset is not None else None
+        if last is not None and last.get('referencia') != referencia:
+            count, quantity, last = 0, 0, None     # hash collision with another reference
+        for _, entry in self.tail:
+            if entry.get('referencia') == referencia:
+                count += 1
+                quantity += int(entry.get('cantidad') or 0)
+                last = entry
+
+        if not count:
+            return {'exists': False}
+        return {
+            'exists': True,
+            'count': count,
+            'total_quantity': quantity,
+            'last_entry': {
+                'fabricante': last.get('fabricante'),
+                'cantidad': last.get('cantidad'),
+                'timestamp': last.get('timestamp'),
+                'operario': last.get('operario'),
+                'observaciones': last.get('observaciones') or '',
+            },
+        }
+
+    def list_entries(self, limit=LIST_DEFAULT_LIMIT, offset=0):
+        """
+        Newest entries first, paginated like get_entries.php
+
+        The page start is found by binary search over the indexed entries
+        (newest first) merged with the sorted log tail, so the cost does not
+        grow with the offset.
+        """
+        if limit < 1 or limit > LIST_MAX_LIMIT:
+            limit = LIST_DEFAULT_LIMIT
+        offset = max(0, offset)
+        self.refresh()
+
+        # Both sequences newest first, keyed by (epoch, log offset)
+        indexed = len(self.dates)
+        tail = sorted(((timestamp_epoch(e.get('timestamp')), o) for o, e in self.tail), reverse=True)
+        tail_entries = dict(self.tail)
+
+        def newest(position):
+            return parse_date(self.dates[indexed - 1 - position])
+
+        # a indexed + b tail entries precede the page, with a + b == offset
+        start = min(offset, indexed + len(tail))
+        low, high = max(0, start - len(tail)), min(start, indexed)
+        while low < high:
+            a = (low + high) // 2
+            b = start - a
+            if b > 0 and a < indexed and tail[b - 1] < newest(a):
+                low = a + 1            # the tail entry is older: take more indexed ones
+            else:
+                high = a
+        a, b = low, start - low
+
+        page = []
+        while len(page) < limit and (a < indexed or b < len(tail)):
+            if b >= len(tail) or (a < indexed and newest(a) > tail[b]):
+                page.append(self.read(newest(a)[1]))
+                a += 1
+            else:
+                page.append(tail_entries[tail[b][1]])
+                b += 1
+
+        return {
+            'total': indexed + len(tail),
+            'limit': limit,
+            'offset': offset,
+            'entries': [entry_summary(entry) for entry in page if entry is not None],
+        }
+
+    # --- writing -------------------------------------------------------
+
+    def locked(self):
+        """Exclusive writer lock (released when the returned file is closed)"""
+        import fcntl
+
+        lock = open(os.path.join(self.root, LOCK_NAME), 'a')
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def repair_log(self, log):
+        """Drop a torn last record left by a crash mid-append"""
+        size = log.seek(0, os.SEEK_END)
+        if not size:
+            return
+        position = size
+        while position > self.meta['indexed_offset']:
+            step = min(65536, position - self.meta['indexed_offset'])
+            log.seek(position - step)
+            chunk = log.read(step)
+            newline = chunk.rfind(b'\n')
+            if newline >= 0:
+                position = position - step + newline + 1
+                break
+            position -= step
+        if position < size:
+            log.truncate(position)
+            os.fsync(log.fileno())
+
+    def append(self, entry):
+        """
+        Durably append one entry
+
+        Returns:
+            Log offset of the entry
+        """
+        with self.locked():
+            self.refresh()
+            with open(self.log_path, 'ab+') as log:
+                self.repair_log(log)
+                offset = log.seek(0, os.SEEK_END)
+                log.write(encode_record(entry))
+                log.flush()
+                os.fsync(log.fileno())
+            self.refresh()
+            if len(self.tail) >= self.compact_tail:
+                self.compact_locked()
+        return offset
+
+    def bulk_load(self, entries):
+        """Append many entries with one fsync, then index them (migration)"""
+        with self.locked():
+            self.refresh()
+            with open(self.log_path, 'ab+') as log:
+                self.repair_log(log)
+                log.seek(0, os.SEEK_END)
+                for entry in entries:
+                    log.write(encode_record(entry))
+                log.flush()
+                os.fsync(log.fileno())
+            self.compact_locked()
+
+    def compact(self):
+        """Fold the log tail into a new index generation"""
+        with self.locked():
+            self.compact_locked()
+
+    def compact_locked(self):
+        # The tail is re-read without keeping entries, so migrations of
+        # millions of records only hold index keys in memory
+        end = self.meta['indexed_offset']
+        refs, dates = {}, []
+        added = 0
+        if os.path.exists(self.log_path):
+            with open(self.log_path, 'rb') as log:
+                log.seek(end)
+                for line in log:
+                    if not line.endswith(b'\n'):
+                        break
+                    entry = decode_record(line)
+                    if entry is not None:
+                        key = reference_key(entry.get('referencia'))
+                        ref = refs.setdefault(key, [0, 0, 0])
+                        ref[0] += 1
+                        ref[1] += int(entry.get('cantidad') or 0)
+                        ref[2] = end
+                        dates.append((timestamp_epoch(entry.get('timestamp')), end))
+                        added += 1
+                    end += len(line)
+        if not added and end == self.meta['indexed_offset'] and os.path.exists(self.meta_path):
+            return
+
+        generation = self.meta['generation'] + 1
+        self.write_refs(self.index_path('refs', generation), sorted(refs.items()))
+        dates.sort()
+        self.write_dates(self.index_path('dates', generation), dates)
+
+        meta = {
+            'version': 1,
+            'generation': generation,
+            'indexed_offset': end,
+            'indexed_count': self.meta['indexed_count'] + added,
+        }
+        write_atomic(self.meta_path, json.dumps(meta, indent=2).encode('utf-8'))
+
+        # Readers may still hold the previous generation open; keep it
+        for name in os.listdir(self.root):
+            parts = name.split('.')
+            if len(parts) == 3 and parts[2] == 'idx' and int(parts[1]) < generation - 1:
+                os.remove(os.path.join(self.root, name))
+        self.meta = None
+        self.refresh()
+
+    def write_refs(self, path, tail_refs):
+        """Merge tail reference totals into the current reference index"""
+        def merged():
+            current = (parse_ref(fields) for fields in self.refs.records())
+            tail = ((key, count, quantity, last) for key, (count, quantity, last) in tail_refs)
+            pending = None
+            for key, count, quantity, last in heapq.merge(current, tail):
+                if pending and pending[0] == key:
+                    pending = (key, pending[1] + count, pending[2] + quantity, max(pending[3], last))
+                    continue
+                if pending:
+                    yield pending
+                pending = (key, count, quantity, last)
+            if pending:
+                yield pending
+
+        self.write_index(path, (f'{key} {count:10d} {quantity:14d} {last:12d}\n'
+                                for key, count, quantity, last in merged()))
+
+    def write_dates(self, path, tail_dates):
+        """Merge tail (epoch, offset) keys into the current date index"""
+        current = (parse_date(fields) for fields in self.dates.records())
+        self.write_index(path, (f'{epoch:12d} {offset:12d}\n'
+                                for epoch, offset in heapq.merge(current, tail_dates)))
+
+    def write_index(self, path, lines):
+        tmp_path = f'{path}.tmp.{os.getpid()}'
+        with open(tmp_path, 'w', encoding='ascii', buffering=1 << 20) as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def close_indexes(self):
+        for index in (self.refs, self.dates):
+            if index is not None:
+                index.close()
+
+    def close(self):
+        self.close_indexes()
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+    def stats(self):
+        """Entry counts and file sizes"""
+        self.refresh()
+        size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        return {
+            'store': self.root,
+            'entries': self.count(),
+            'indexed': self.meta['indexed_count'],
+            'tail': len(self.tail),
+            'references': len(self.refs),
+            'generation': self.meta['generation'],
+            'log_bytes': size,
+        }
+
+
+def migrate(json_path=DEFAULT_ENTRIES_JSON, root=None):
+    """
+    Load data/entries.json into a new store (the JSON file is kept)
+
+    The store is built in a temporary directory next to root and renamed into
+    place once loaded, so the PHP handlers never see a missing or half-filled
+    store, and a failed migration leaves nothing behind.
+
+    Returns:
+        Number of migrated entries
+    """
+    import shutil
+
+    root = root or os.environ.get('ENTRIES_STORE', DEFAULT_STORE)
+    if os.path.exists(os.path.join(root, META_NAME)) or os.path.exists(os.path.join(root, LOG_NAME)):
+        raise ValueError(f'store {root} already exists')
+    with open(json_path, encoding='utf-8') as f:
+        entries = json.load(f).get('entries', [])
+
+    build_root = f'{root.rstrip(os.sep)}.migrating.{os.getpid()}'
+    try:
+        store = EntriesStore(build_root, create=True)
+        try:
+            store.bulk_load(entries)
+            count = store.count()
+        finally:
+            store.close()
+        if os.path.isdir(root):
+            os.rmdir(root)             # an empty directory left by an older version
+        os.rename(build_root, root)
+    except BaseException:
+        shutil.rmtree(build_root, ignore_errors=True)
+        raise
+    return count
+
+
+def synthetic_entries(count, seed=0):
+    """Entries shaped like create_entry.php output, in time order"""
+    import random
+
+    rng = random.Random(seed)
+    references = max(1, count // 10)
+    start = 1700000000
+    for index in range(count):
+        ref = f'REF-{rng.randrange(references):07d}'
+        moment = datetime.fromtimestamp(start + index * 30 + rng.randrange(60), timezone.utc)
+        yield {
+            'id': f'entry_{start + index}_{index:08x}',
+            'referencia': ref,
+            'fabricante': f'Fabricante {rng.randrange(200)}',
+            'cantidad': rng.randrange(1, 500),
+            'operario': f'Operario {rng.randrange(30)}',
+            'observaciones': '',
+            'referenciaScanned': ref,
+            'timestamp': moment.isoformat(),
+            'imagenes': [f'Fabricante/{ref}/{start + index}_1.jpg'],
+        }
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return {
+        'p50_ms': round(ordered[len(ordered) // 2] * 1000, 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+    }
+
+
+def benchmark(count, root, samples=200, baseline=False, seed=0):
+    """Build a store of synthetic entries and time the API operations"""
+    import random
+
+    rng = random.Random(seed + 1)
+    results = {'entries': count}
+
+    start = time.perf_counter()
+    store = EntriesStore(root, create=True)
+    store.bulk_load(synthetic_entries(count, seed))
+    results['load_seconds'] = round(time.perf_counter() - start, 2)
+
+    references = [f'REF-{rng.randrange(max(1, count // 10)):07d}' for _ in range(samples)]
+    timings = []
+    for ref in references:
+        start = time.perf_counter()
+        store.check_reference(ref)
+        timings.append(time.perf_counter() - start)
+    results['check_reference'] = percentiles(timings)
+
+    # As the PHP handlers run it: a fresh process-level open per request
+    timings = []
+    for ref in references[:50]:
+        start = time.perf_counter()
+        fresh = EntriesStore(root)
+        fresh.check_reference(ref)
+        fresh.close()
+        timings.append(time.perf_counter() - start)
+    results['open_and_check'] = percentiles(timings)
+
+    for name, offset in (('list_first_page', 0), ('list_middle_page', count // 2),
+                         ('list_last_page', max(0, count - 50))):
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            store.list_entries(50, offset)
+            timings.append(time.perf_counter() - start)
+        results[name] = percentiles(timings)
+
+    timings = []
+    for entry in synthetic_entries(samples, seed + 2):
+        start = time.perf_counter()
+        store.append(entry)
+        timings.append(time.perf_counter() - start)
+    results['append_fsync'] = percentiles(timings)
+
+    start = time.perf_counter()
+    store.compact()
+    results['compact_seconds'] = round(time.perf_counter() - start, 2)
+    results['log_bytes'] = store.stats()['log_bytes']
+    store.close()
+
+    if baseline:
+        # The current handlers: parse the whole document per request
+        json_path = os.path.join(root, 'entries.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'entries': list(synthetic_entries(count, seed))}, f)
+        start = time.perf_counter()
+        with open(json_path, encoding='utf-8') as f:
+            entries = json.load(f)['entries']
+        [e for e in entries if e['referencia'] == references[0]]
+        results['baseline_check_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        os.remove(json_path)
+
+    return results
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Append-only indexed store for warehouse entries')
+    parser.add_argument('command', choices=['migrate', 'append', 'check', 'list', 'stats',
+                                            'compact', 'bench'])
+    parser.add_argument('referencia', nargs='?', help='Reference code (check)')
+    parser.add_argument('--store', default=None, help=f'Store directory (default: {DEFAULT_STORE})')
+    parser.add_argument('--from', dest='source', default=DEFAULT_ENTRIES_JSON,
+                        help='entries.json to migrate')
+    parser.add_argument('--limit', type=int, default=LIST_DEFAULT_LIMIT)
+    parser.add_argument('--offset', type=int, default=0)
+    parser.add_argument('--entries', type=int, default=1000000, help='Benchmark size')
+    parser.add_argument('--baseline', action='store_true',
+                        help='Benchmark: also time the whole-file JSON lookup')
+    args = parser.parse_args()
+
+    if args.command == 'migrate':
+        try:
+            count = migrate(args.source, args.store)
+        except (OSError, ValueError) as e:
+            print(f"✗ Migration failed: {e}", file=sys.stderr)
+            return 1
+        print(f"✓ Migrated {count} entries from {args.source}")
+        return 0
+
+    if args.command == 'bench':
+        import shutil
+        import tempfile
+
+        root = args.store or tempfile.mkdtemp(prefix='entries_store_bench_')
+        try:
+            print("=" * 70)
+            print(f"Entries store benchmark ({args.entries} entries)")
+            print("=" * 70)
+            results = benchmark(args.entries, root, baseline=args.baseline)
+            for name, value in results.items():
+                print(f"  • {name}: {value}")
+        finally:
+            if not args.store:
+                shutil.rmtree(root, ignore_errors=True)
+        return 0
+
+    try:
+        store = EntriesStore(args.store)
+    except FileNotFoundError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    try:
+        if args.command == 'append':
+            entry = json.load(sys.stdin)
+            result = {'success': True, 'offset': store.append(entry)}
+        elif args.command == 'check':
+            if not args.referencia:
+                parser.error('check needs a referencia')
+            result = store.check_reference(args.referencia)
+        elif args.command == 'list':
+            result = store.list_entries(args.limit, args.offset)
+        elif args.command == 'compact':
+            store.compact()
+            result = store.stats()
+        else:
+            result = store.stats()
+    finally:
+        store.close()
+
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Shared pytest configuration for OCR tests
+Makes the backend (and minibackend) Python scripts importable from the test modules and
+provides the OCR result store (--force-ocr re-runs every image)
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = ROOT_DIR / 'backend' / 'scripts'
+MINIBACKEND_SCRIPTS_DIR = ROOT_DIR / 'minibackend' / 'scripts'
+for scripts_dir in (SCRIPTS_DIR, MINIBACKEND_SCRIPTS_DIR):
+    if str(scripts_dir) not in sys.path:
+        sys.path.insert(0, str(scripts_dir))
+
+
+def pytest_addoption(parser):
+    parser.addoption('--force-ocr', action='store_true', default=False,
+                     help='Re-run OCR on every image instead of using stored results '
+                          '(same as OCR_FORCE_RERUN=1)')
+
+
+@pytest.fixture(scope='session')
+def ocr_store(request):
+    """Content-addressed OCR result store shared by the regression tests"""
+    from ocr_result_store import OCRResultStore, force_rerun_requested
+
+    store = OCRResultStore(force=request.config.getoption('--force-ocr') or force_rerun_requested())
+    request.config._ocr_store = store
+    return store
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Accuracy report of the OCR regression tests, stored or fresh"""
+    store = getattr(config, '_ocr_store', None)
+    if store is None or not store.outcomes:
+        return
+
+    report = store.report()
+    write = terminalreporter.write_line
+    terminalreporter.section('OCR accuracy report')
+    for engine, summary in sorted(report['engines'].items()):
+        write(f"  • {engine:<10} {summary['correct']}/{summary['images']} correct "
+              f"({summary['accuracy']:.1%}), {summary['cached']} from the result store")
+    for failure in report['failures']:
+        write(f"  ✗ {failure['engine']} {failure['image']}: expected {failure['expected']}, "
+              f"read '{failure['extracted']}'")
+    write(f"  OCR runs: {report['misses']} ({report['ocr_seconds']:.1f} s), "
+          f"store hits: {report['hits']} (~{report['saved_seconds']:.1f} s saved)")
@@ -6,10 +6,11 @@ Generates realistic product label images with multiple fonts, white backgrounds,
 and hardware/parts texture backgrounds
 """
 
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
-import random
+from PIL import Image, ImageDraw, ImageFont
 import os
 
+from label_rendering import metal_texture, encode
+
 # Test products matching backend data/products.json
 TEST_PRODUCTS = [
     {
@@ -51,6 +52,14 @@ FONT_VARIANTS = [
     ('Courier', 'bold'),
 ]
 
+# Label variants rendered for every product: (variant_name, font_variant)
+VARIANTS = [
+    ('white_modern', ('Helvetica', 'bold')),
+    ('white_classic', ('Times', 'regular')),
+    ('white_monospace', ('Courier', 'regular')),
+    ('white_mono_bold', ('Courier', 'bold')),
+]
+
 def get_available_fonts():
     """Get available system fonts"""
     font_paths = {}
@@ -89,33 +98,15 @@ def load_font(font_name, size, font_paths):
             return ImageFont.truetype(font_paths[font_name], size)
     except:
         pass
-    return ImageFont.load_default()
-
-def create_metal_texture(width, height, color_base=(200, 200, 200)):
-    """Create a metal/hardware texture background"""
-    img = Image.new('RGB', (width, height), color_base)
-    pixels = img.load()
-
-    # Add metallic pattern with subtle variations
-    for x in range(width):
-        for y in range(height):
-            # Add subtle metallic sheen
-            noise = random.randint(-10, 10)
-            r = max(0, min(255, color_base[0] + noise))
-            g = max(0, min(255, color_base[1] + noise))
-            b = max(0, min(255, color_base[2] + noise))
-
-            # Add some diagonal lines every 5 pixels (machined look)
-            if (x + y) % 8 == 0:
-                r = max(0, r - 5)
-                g = max(0, g - 5)
-                b = max(0, b - 5)
-
-            pixels[x, y] = (r, g, b)
-
-    # Add blur for smoothness
-    img = img.filter(ImageFilter.GaussianBlur(radius=1))
-    return img
+    try:
+        # Pillow >= 10.1 ships a scalable default font
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()
+
+def create_metal_texture(width, height, color_base=(200, 200, 200), seed=None):
+    """Create a metal/hardware texture background (seeded, vectorized)"""
+    return metal_texture(width, height, color_base, seed)
 
 def draw_part_pattern(draw, width, height, part_type):
     """Draw a subtle pattern representing the part type"""
@@ -169,7 +160,8 @@ def draw_part_pattern(draw, width, height, part_type):
             draw.arc([x - 2, center_y - 5, x + 2, center_y + 5],
                     0, 180, fill=(220, 220, 220), width=1)
 
-def generate_product_label_variant(product, variant_name, font_variant, output_path, font_paths):
+def generate_product_label_variant(product, variant_name, font_variant, output_path=None,
+                                   font_paths=None, seed=None, output='image'):
     """
     Generate a product label image variant
 
@@ -177,21 +169,25 @@ def generate_product_label_variant(product, variant_name, font_variant, output_p
         product: Dictionary with product information
         variant_name: Name of the variant (e.g., "white_modern")
         font_variant: Tuple of (font_name, font_style)
-        output_path: Path where to save the image
+        output_path: Path where to save the image, None to return it in memory
         font_paths: Dictionary of available fonts
+        seed: Texture seed; the same seed renders the same image
+        output: In-memory form when output_path is None:
+            'image' (PIL), 'array' (numpy RGB), 'png' or 'jpeg' (bytes)
     """
+    font_paths = font_paths if font_paths is not None else {}
     width, height = 500, 400
 
     # Create base: white background with subtle texture
     if variant_name.startswith('white'):
         # White background with subtle metallic texture
         img = Image.new('RGB', (width, height), (250, 250, 250))
-        texture_img = create_metal_texture(width, height, (250, 250, 250))
+        texture_img = create_metal_texture(width, height, (250, 250, 250), seed)
         img = Image.blend(img, texture_img, 0.3)
     else:
         # Alternative: light gray with texture
         img = Image.new('RGB', (width, height), (245, 245, 245))
-        texture_img = create_metal_texture(width, height, (245, 245, 245))
+        texture_img = create_metal_texture(width, height, (245, 245, 245), seed)
         img = Image.blend(img, texture_img, 0.2)
 
     draw = ImageDraw.Draw(img)
@@ -263,6 +259,9 @@ def generate_product_label_variant(product, variant_name, font_variant, output_p
     draw.text((width // 2, small_code_y), product['code'],
              fill=(100, 100, 100), font=info_font, anchor='mm')
 
+    if output_path is None:
+        return encode(img, output)
+
     # Save image
     img.save(output_path, 'PNG')
     print(f"✓ Generated: {os.path.basename(output_path)}")
@@ -281,19 +280,14 @@ def main():
     print(f"Available fonts found: {list(font_paths.keys())}")
     print()
 
-    variants = [
-        ('white_modern', ('Helvetica', 'bold')),
-        ('white_classic', ('Times', 'regular')),
-        ('white_monospace', ('Courier', 'regular')),
-        ('white_mono_bold', ('Courier', 'bold')),
-    ]
+    variants = VARIANTS
 
     total_images = 0
 
     for product in TEST_PRODUCTS:
         print(f"\n📦 Product: {product['name']} ({product['code']})")
 
-        for variant_name, font_variant in variants:
+        for variant_index, (variant_name, font_variant) in enumerate(variants):
             # Create variant folder if needed
             variant_dir = os.path.join(script_dir, 'variants')
             os.makedirs(variant_dir, exist_ok=True)
@@ -308,7 +302,8 @@ def main():
                     variant_name,
                     font_variant,
                     output_path,
-                    font_paths
+                    font_paths,
+                    seed=int(product['code']) * len(variants) + variant_index
                 )
                 total_images += 1
             except Exception as e:
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+
+"""
+Synthetic label corpus generator for LogistiQ MVP
+Renders tens of thousands of product labels in parallel for accuracy and
+tail-latency measurements. Codes are drawn from the product catalog, every
+label is rendered with generate_product_label_variant and then degraded like
+a handheld capture (perspective, rotation, lighting, blur, sensor noise and
+JPEG artefacts).
+
+Labels are written in shards (one directory or one tar file per shard) and a
+manifest.jsonl holds the ground truth of every label: code, name, price,
+variant, augmentation parameters and the label corners in the final image.
+Everything about a label is derived from (seed, label id), so the same seed
+rebuilds the same corpus whatever the number of workers.
+
+Usage:
+    python3 generate_corpus.py --count 20000 --seed 42 --workers 8 --output corpus/
+    python3 generate_corpus.py --count 20000 --tar --shard-size 2000
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import tarfile
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from label_rendering import add_noise, encode
+from generate_advanced_test_images import (
+    TEST_PRODUCTS, VARIANTS, get_available_fonts, generate_product_label_variant
+)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CATALOG = os.path.join(SCRIPT_DIR, '..', 'backend', 'data', 'products.json')
+DEFAULT_OUTPUT = os.path.join(SCRIPT_DIR, 'corpus')
+
+# Part pattern drawn for catalog categories without a TEST_PRODUCTS entry
+CATEGORY_PART_TYPES = {
+    'Tornillería': 'screw',
+    'Arandelas': 'washer',
+    'Tuercas': 'nut',
+    'Rodamientos': 'bearing',
+    'Cables': 'cable',
+}
+
+AUGMENT_PROBABILITY = 0.6      # each augmentation is applied to this fraction of labels
+AUGMENT_RANGES = {
+    'perspective': 0.08,       # max corner shift, fraction of the label side
+    'rotation': 12.0,          # max skew in degrees
+    'lighting': 0.35,          # max brightness gradient across the label
+    'blur': 1.8,               # max Gaussian sigma in px
+    'noise': 12.0,             # max sensor noise sigma in grey levels
+    'jpeg': 35,                # lowest JPEG quality
+}
+JPEG_QUALITY = 92              # quality of labels without JPEG artefacts
+
+
+def catalog_products(path=DEFAULT_CATALOG):
+    """
+    Catalog products in the TEST_PRODUCTS format
+
+    Known test products keep their part pattern; other categories are mapped
+    through CATEGORY_PART_TYPES, and unknown ones get no pattern.
+    """
+    with open(path, encoding='utf-8') as f:
+        catalog = json.load(f)
+    part_types = {p['code']: p['part_type'] for p in TEST_PRODUCTS}
+
+    items = catalog['products'] if isinstance(catalog, dict) else catalog
+    products = []
+    for item in items:
+        code = str(item['code'])
+        products.append({
+            'code': code,
+            'name': item['name'],
+            'price': f"{float(item.get('price', 0)):.2f}",
+            'part_type': part_types.get(code) or CATEGORY_PART_TYPES.get(item.get('category'), 'none'),
+        })
+    return products
+
+
+def item_rng(seed, index):
+    """Random stream of one label, independent of worker and shard layout"""
+    return np.random.default_rng([seed, index])
+
+
+def sample_augmentations(rng, strength=1.0):
+    """
+    Draw the augmentations of one label
+
+    Every parameter is drawn whether or not it is used, so the random stream
+    (and the rest of the corpus) does not depend on which ones apply.
+    """
+    applied = rng.random(len(AUGMENT_RANGES)) < AUGMENT_PROBABILITY
+    corners = rng.uniform(-1.0, 1.0, size=(4, 2)) * AUGMENT_RANGES['perspective'] * strength
+    rotation = rng.uniform(-1.0, 1.0) * AUGMENT_RANGES['rotation'] * strength
+    gain = rng.uniform(0.65, 1.15)
+    gradient = rng.uniform(0.0, AUGMENT_RANGES['lighting'] * strength)
+    direction = rng.uniform(0.0, 360.0)
+    blur = rng.uniform(0.5, 0.5 + AUGMENT_RANGES['blur'] * strength)
+    noise = rng.uniform(2.0, 2.0 + AUGMENT_RANGES['noise'] * strength)
+    quality = int(rng.integers(AUGMENT_RANGES['jpeg'], JPEG_QUALITY))
+
+    candidates = {
+        'perspective': [round(float(v), 4) for v in corners.reshape(-1)],
+        'rotation': round(float(rotation), 2),
+        'lighting': {'gain': round(float(gain), 3), 'gradient': round(float(gradient), 3),
+                     'direction': round(float(direction), 1)},
+        'blur': round(float(blur), 2),
+        'noise': round(float(noise), 2),
+        'jpeg': quality,
+    }
+    return {name: value for (name, value), on in zip(candidates.items(), applied) if on}
+
+
+def perspective_coefficients(source, target):
+    """PIL PERSPECTIVE coefficients mapping target (output) points to source points"""
+    rows, values = [], []
+    for (x, y), (u, v) in zip(target, source):
+        rows.append([x, y, 1, 0, 0, 0, -u * x, -u * y])
+        rows.append([0, 0, 0, x, y, 1, -v * x, -v * y])
+        values.extend((u, v))
+    return np.linalg.solve(np.array(rows, dtype=np.float64), np.array(values, dtype=np.float64))
+
+
+def augment(img, params, background, seed=None):
+    """
+    Apply the sampled augmentations, in capture order
+
+    Returns:
+        (augmented PIL image, label corners [[x, y], ...] in that image)
+    """
+    width, height = img.size
+    source = np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float64)
+    corners = source.copy()
+
+    # Perspective and rotation only move the label corners; the image is
+    # resampled once, with the homography from the final corners
+    if 'perspective' in params:
+        corners += np.array(params['perspective']).reshape(4, 2) * (width, height)
+
+    if 'rotation' in params:
+        theta = np.radians(params['rotation'])
+        cos, sin = np.cos(theta), np.sin(theta)
+        offset = corners - corners.mean(axis=0)
+        corners = np.stack((cos * offset[:, 0] + sin * offset[:, 1],
+                            -sin * offset[:, 0] + cos * offset[:, 1]), axis=1)
+
+    if 'perspective' in params or 'rotation' in params:
+        corners -= np.floor(corners.min(axis=0))
+        size = tuple(int(np.ceil(v)) for v in corners.max(axis=0))
+        coeffs = perspective_coefficients(source, corners)
+        img = img.transform(size, Image.PERSPECTIVE, tuple(coeffs), Image.BILINEAR,
+                            fillcolor=(background,) * 3)
+
+    if 'lighting' in params:
+        light = params['lighting']
+        pixels = np.asarray(img, dtype=np.float32)
+        h, w = pixels.shape[:2]
+        ys, xs = np.mgrid[0:h, 0:w].astype(np.float32)
+        theta = np.radians(light['direction'])
+        ramp = (xs / w - 0.5) * np.cos(theta) + (ys / h - 0.5) * np.sin(theta)
+        factor = light['gain'] * (1.0 + 2.0 * light['gradient'] * ramp)
+        pixels = pixels * factor[:, :, None]
+        img = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), 'RGB')
+
+    if 'blur' in params:
+        img = img.filter(ImageFilter.GaussianBlur(radius=params['blur']))
+
+    if 'noise' in params:
+        img = add_noise(img, params['noise'], seed)
+
+    return img, [[round(float(x), 1), round(float(y), 1)] for x, y in corners]
+
+
+def render_label(index, seed, products, font_paths, strength=1.0, image_format='jpeg'):
+    """
+    Render and augment one corpus label
+
+    Returns:
+        (encoded image bytes, ground-truth record without file location)
+    """
+    rng = item_rng(seed, index)
+    product = products[int(rng.integers(len(products)))]
+    variant_name, font_variant = VARIANTS[int(rng.integers(len(VARIANTS)))]
+    texture_seed = int(rng.integers(2 ** 31))
+    background = int(rng.integers(60, 200))
+    params = sample_augmentations(rng, strength)
+    noise_seed = int(rng.integers(2 ** 31))
+
+    img = generate_product_label_variant(product, variant_name, font_variant,
+                                         font_paths=font_paths, seed=texture_seed)
+    img, corners = augment(img, params, background, noise_seed)
+
+    if image_format == 'jpeg':
+        data = encode(img, 'jpeg', quality=params.get('jpeg', JPEG_QUALITY))
+    else:
+        data = encode(img, 'png')
+
+    record = {
+        'id': index,
+        'code': product['code'],
+        'name': product['name'],
+        'price': product['price'],
+        'variant': variant_name,
+        'font': list(font_variant),
+        'texture_seed': texture_seed,
+        'background': background,
+        'augmentations': params,
+        'corners': corners,
+        'width': img.size[0],
+        'height': img.size[1],
+    }
+    return data, record
+
+
+def shard_name(shard):
+    return f'shard-{shard:05d}'
+
+
+def render_shard(job):
+    """
+    Render one shard of labels into a directory or a tar file (worker entry point)
+
+    Returns:
+        (shard number, ground-truth records in label order)
+    """
+    shard, start, stop, settings = job
+    extension = 'jpg' if settings['format'] == 'jpeg' else 'png'
+    name = shard_name(shard)
+    records = []
+
+    archive = None
+    if settings['tar']:
+        archive_path = os.path.join(settings['output'], f'{name}.tar')
+        tmp_path = f'{archive_path}.tmp'
+        archive = tarfile.open(tmp_path, 'w')
+    else:
+        os.makedirs(os.path.join(settings['output'], name), exist_ok=True)
+
+    try:
+        for index in range(start, stop):
+            data, record = render_label(index, settings['seed'], settings['products'],
+                                        settings['font_paths'], settings['strength'],
+                                        settings['format'])
+            filename = f"{index:08d}_{record['code']}.{extension}"
+            if archive is not None:
+                info = tarfile.TarInfo(filename)
+                info.size = len(data)
+                info.mtime = 0          # byte-identical shards for the same seed
+                archive.addfile(info, io.BytesIO(data))
+                record['archive'] = f'{name}.tar'
+                record['path'] = filename
+            else:
+                with open(os.path.join(settings['output'], name, filename), 'wb') as f:
+                    f.write(data)
+                record['path'] = f'{name}/{filename}'
+            record['shard'] = shard
+            records.append(record)
+    finally:
+        if archive is not None:
+            archive.close()
+
+    if archive is not None:
+        os.replace(tmp_path, archive_path)
+    return shard, records
+
+
+def generate_corpus(output, count, seed=0, workers=None, shard_size=1000, tar=False,
+                    image_format='jpeg', strength=1.0, catalog=DEFAULT_CATALOG, progress=None):
+    """
+    Generate a corpus and its manifest
+
+    Args:
+        output: Corpus directory
+        count: Number of labels
+        seed: Base seed; the same seed rebuilds the same corpus
+        workers: Worker processes (default: CPU count)
+        shard_size: Labels per shard directory / tar file
+        tar: Write tar shards instead of directories
+        image_format: 'jpeg' or 'png'
+        strength: Scale of the augmentation ranges
+        catalog: Product catalog the codes are drawn from
+        progress: Optional callback(labels_done, count)
+
+    Returns:
+        Dictionary with the corpus settings and timing
+    """
+    if image_format not in ('jpeg', 'png'):
+        raise ValueError(f'Unknown image format: {image_format}')
+    products = catalog_products(catalog)
+    if not products:
+        raise ValueError(f'No products in catalog: {catalog}')
+
+    os.makedirs(output, exist_ok=True)
+    settings = {
+        'output': output,
+        'seed': seed,
+        'products': products,
+        'font_paths': get_available_fonts(),
+        'strength': strength,
+        'format': image_format,
+        'tar': tar,
+    }
+    jobs = [(shard, start, min(start + shard_size, count), settings)
+            for shard, start in enumerate(range(0, count, shard_size))]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+
+    start_time = time.perf_counter()
+    manifest_path = os.path.join(output, 'manifest.jsonl')
+    tmp_manifest = f'{manifest_path}.tmp'
+    done = 0
+    with open(tmp_manifest, 'w', encoding='utf-8') as manifest:
+        if workers == 1:
+            shards = map(render_shard, jobs)
+            pool = None
+        else:
+            import multiprocessing
+            pool = multiprocessing.Pool(workers)
+            shards = pool.imap(render_shard, jobs)
+        try:
+            for _, records in shards:
+                for record in records:
+                    manifest.write(json.dumps(record, ensure_ascii=False) + '\n')
+                done += len(records)
+                if progress:
+                    progress(done, count)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+    os.replace(tmp_manifest, manifest_path)
+
+    info = {
+        'count': count,
+        'seed': seed,
+        'shards': len(jobs),
+        'shard_size': shard_size,
+        'layout': 'tar' if tar else 'dir',
+        'format': image_format,
+        'strength': strength,
+        'augment_probability': AUGMENT_PROBABILITY,
+        'augment_ranges': AUGMENT_RANGES,
+        'codes': sorted(p['code'] for p in products),
+        'fonts': sorted(settings['font_paths']),
+    }
+    with open(os.path.join(output, 'corpus.json'), 'w', encoding='utf-8') as f:
+        json.dump(info, f, indent=2, ensure_ascii=False)
+
+    elapsed = time.perf_counter() - start_time
+    return dict(info, workers=workers, elapsed_seconds=elapsed,
+                labels_per_second=count / elapsed if elapsed else None)
+
+
+def iter_corpus(root):
+    """
+    Iterate a generated corpus (directory or tar shards)
+
+    Yields:
+        (manifest record, encoded image bytes)
+    """
+    archives = {}
+    try:
+        with open(os.path.join(root, 'manifest.jsonl'), encoding='utf-8') as manifest:
+            for line in manifest:
+                record = json.loads(line)
+                if 'archive' in record:
+                    archive = archives.get(record['archive'])
+                    if archive is None:
+                        for old in archives.values():
+                            old.close()
+                        archive = tarfile.open(os.path.join(root, record['archive']))
+                        archives = {record['archive']: archive}
+                    data = archive.extractfile(record['path']).read()
+                else:
+                    with open(os.path.join(root, record['path']), 'rb') as f:
+                        data = f.read()
+                yield record, data
+    finally:
+        for archive in archives.values():
+            archive.close()
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate a synthetic label corpus')
+    parser.add_argument('--count', type=int, default=1000, help='Number of labels')
+    parser.add_argument('--seed', type=int, default=0, help='Base seed of the corpus')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPUs)')
+    parser.add_argument('--shard-size', type=int, default=1000, help='Labels per shard')
+    parser.add_argument('--tar', action='store_true', help='Write tar shards instead of directories')
+    parser.add_argument('--format', choices=['jpeg', 'png'], default='jpeg')
+    parser.add_argument('--strength', type=float, default=1.0, help='Scale of the augmentation ranges')
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG, help='products.json to draw codes from')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Corpus directory')
+    args = parser.parse_args()
+
+    def progress(done, count):
+        print(f"  • {done}/{count} labels", flush=True)
+
+    print("=" * 70)
+    print(f"Synthetic label corpus ({args.count} labels, seed {args.seed})")
+    print("=" * 70)
+    info = generate_corpus(args.output, args.count, args.seed, args.workers, args.shard_size,
+                           args.tar, args.format, args.strength, args.catalog, progress)
+    print()
+    print(f"✓ {info['count']} labels in {info['shards']} {info['layout']} shards "
+          f"({info['workers']} workers, {info['elapsed_seconds']:.1f} s, "
+          f"{info['labels_per_second']:.0f} labels/s)")
+    print(f"✓ Ground truth: {os.path.join(args.output, 'manifest.jsonl')}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
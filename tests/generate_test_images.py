@@ -9,6 +9,8 @@ from PIL import Image, ImageDraw, ImageFont
 import os
 import json
 
+from label_rendering import encode
+
 # Test products matching backend data/products.json
 TEST_PRODUCTS = [
     {
@@ -48,13 +50,15 @@ def hex_to_rgb(hex_color):
     hex_color = hex_color.lstrip('#')
     return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
-def generate_product_label(product, output_path):
+def generate_product_label(product, output_path=None, output='image'):
     """
     Generate a realistic product label image
 
     Args:
         product: Dictionary with product information
-        output_path: Path where to save the image
+        output_path: Path where to save the image, None to return it in memory
+        output: In-memory form when output_path is None:
+            'image' (PIL), 'array' (numpy RGB), 'png' or 'jpeg' (bytes)
     """
     # Create image with specified background color
     width, height = 400, 300
@@ -105,6 +109,9 @@ def generate_product_label(product, output_path):
             fill='white'
         )
 
+    if output_path is None:
+        return encode(img, output)
+
     # Save image
     img.save(output_path, 'PNG')
     print(f"✓ Created: {output_path}")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+"""
+Vectorized label rendering helpers for the test image generators
+Builds textures and noise with seeded NumPy array operations and returns
+labels in memory (PIL image, numpy array or encoded bytes), so tests and
+benchmarks can feed images straight into OCR without a PNG round trip.
+
+Usage:
+    python3 label_rendering.py --benchmark
+"""
+
+import io
+import sys
+import time
+import random
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+OUTPUT_FORMATS = ('image', 'array', 'png', 'jpeg')
+
+
+def make_rng(seed=None):
+    """NumPy generator for a seed (or an existing generator)"""
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def metal_texture(width, height, color_base=(200, 200, 200), seed=None):
+    """
+    Metal/hardware texture as an RGB image
+
+    Same look as the original per-pixel version: +-10 grey-level noise shared
+    by the three channels, darker machined diagonals every 8 pixels and a
+    light blur.
+    """
+    rng = make_rng(seed)
+    # Index 0..20 is the noise -10..+10, plus 21 on the machined diagonals
+    index = rng.integers(0, 21, size=(height, width), dtype=np.uint8)
+    ys, xs = np.ogrid[:height, :width]
+    index += ((xs + ys) % 8 == 0).astype(np.uint8) * 21
+
+    # Channels with the same base value are identical: render and blur each
+    # distinct value once (grey bases need a single plane)
+    planes = {}
+    for value in set(color_base):
+        levels = np.clip(value + np.arange(-10, 11), 0, 255)
+        lut = np.concatenate((levels, np.maximum(levels - 5, 0))).astype(np.uint8)
+        planes[value] = Image.fromarray(lut[index], 'L').filter(ImageFilter.GaussianBlur(radius=1))
+    return Image.merge('RGB', [planes[value] for value in color_base])
+
+
+def metal_texture_reference(width, height, color_base=(200, 200, 200)):
+    """Original pixel-by-pixel texture, kept to benchmark metal_texture"""
+    img = Image.new('RGB', (width, height), color_base)
+    pixels = img.load()
+    for x in range(width):
+        for y in range(height):
+            noise = random.randint(-10, 10)
+            r = max(0, min(255, color_base[0] + noise))
+            g = max(0, min(255, color_base[1] + noise))
+            b = max(0, min(255, color_base[2] + noise))
+            if (x + y) % 8 == 0:
+                r = max(0, r - 5)
+                g = max(0, g - 5)
+                b = max(0, b - 5)
+            pixels[x, y] = (r, g, b)
+    return img.filter(ImageFilter.GaussianBlur(radius=1))
+
+
+def add_noise(img, sigma, seed=None):
+    """Add Gaussian sensor noise to an image"""
+    rng = make_rng(seed)
+    pixels = np.asarray(img, dtype=np.float32)
+    pixels = pixels + rng.normal(0.0, sigma, size=pixels.shape).astype(np.float32)
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), img.mode)
+
+
+def encode(img, output='image', quality=90):
+    """
+    Convert a rendered label to the requested in-memory form
+
+    Args:
+        img: PIL image
+        output: 'image' (PIL), 'array' (RGB uint8 ndarray), 'png' or 'jpeg' bytes
+        quality: JPEG quality
+    """
+    if output == 'image':
+        return img
+    if output == 'array':
+        return np.asarray(img.convert('RGB'))
+    if output in ('png', 'jpeg'):
+        buffer = io.BytesIO()
+        if output == 'jpeg':
+            img.convert('RGB').save(buffer, 'JPEG', quality=quality)
+        else:
+            img.save(buffer, 'PNG')
+        return buffer.getvalue()
+    raise ValueError(f'Unknown output format: {output}')
+
+
+def benchmark(width=500, height=400, repeat=3):
+    """Time the reference and vectorized textures"""
+    def best_of(func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    reference = best_of(lambda: metal_texture_reference(width, height, (250, 250, 250)))
+    vectorized = best_of(lambda: metal_texture(width, height, (250, 250, 250), seed=0))
+    return {
+        'reference_ms': reference * 1000,
+        'vectorized_ms': vectorized * 1000,
+        'speedup': reference / vectorized,
+    }
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Label rendering helpers')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Compare the vectorized texture with the per-pixel version')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+        return 0
+
+    result = benchmark()
+    print("=" * 70)
+    print("Metal texture rendering (500x400)")
+    print("=" * 70)
+    print(f"  • Per-pixel loop: {result['reference_ms']:8.1f} ms")
+    print(f"  • Vectorized:     {result['vectorized_ms']:8.1f} ms")
+    print(f"  ✓ Speedup:        {result['speedup']:8.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
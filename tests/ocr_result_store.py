@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+
+"""
+Content-addressed store of OCR results for the regression suite
+OCR output is saved under a key made of the image content hash, the engine,
+the engine version and the engine profile (languages, arguments...). A re-run
+only executes OCR for images or configurations that changed; everything else
+is served from the store, so the extraction logic and the accuracy report can
+be iterated on without paying for OCR again.
+
+Set OCR_FORCE_RERUN=1 (or pass --force-ocr to pytest) to re-run every image
+and refresh the stored results. OCR_RESULT_STORE moves the store directory.
+
+Usage:
+    python3 ocr_result_store.py stats [--store DIR]
+    python3 ocr_result_store.py clear [--store DIR]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STORE = os.path.join(SCRIPT_DIR, '.ocr_cache')
+
+
+def force_rerun_requested():
+    """True when OCR_FORCE_RERUN asks for a full re-run"""
+    return os.environ.get('OCR_FORCE_RERUN', '').lower() in ('1', 'true', 'yes')
+
+
+def to_json(value):
+    """Make OCR output (numpy numbers, tuples) JSON serializable"""
+    if isinstance(value, (list, tuple)):
+        return [to_json(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): to_json(v) for k, v in value.items()}
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+class OCRResultStore:
+    """OCR results keyed by (image hash, engine, engine version, profile)"""
+
+    def __init__(self, root=None, force=None):
+        self.root = root or os.environ.get('OCR_RESULT_STORE', DEFAULT_STORE)
+        self.force = force_rerun_requested() if force is None else force
+        self.hashes = {}
+        self.outcomes = []
+        self.stats = {'hits': 0, 'misses': 0, 'ocr_seconds': 0.0, 'saved_seconds': 0.0}
+
+    def image_hash(self, image_path):
+        """sha256 of the image content, memoized on (path, size, mtime)"""
+        stat = os.stat(image_path)
+        memo_key = (os.path.abspath(image_path), stat.st_size, stat.st_mtime_ns)
+        digest = self.hashes.get(memo_key)
+        if digest is None:
+            with open(image_path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            self.hashes[memo_key] = digest
+        return digest
+
+    def key(self, image_path, engine, version, profile):
+        """Store key of one OCR configuration applied to one image"""
+        identity = {
+            'image': self.image_hash(image_path),
+            'engine': engine,
+            'version': version,
+            'profile': profile,
+        }
+        return hashlib.sha256(json.dumps(identity, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], f'{key}.json')
+
+    def get(self, key):
+        """Stored entry for a key, or None"""
+        try:
+            with open(self.path(key), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, entry):
+        """Store an entry atomically"""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp.{os.getpid()}'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def cached(self, image_path, engine, version, profile, run):
+        """
+        OCR result of an image, running OCR only on a store miss
+
+        Args:
+            image_path: Image file
+            engine: Engine name ('tesseract', 'easyocr', ...)
+            version: Engine version string
+            profile: JSON-serializable engine settings that affect the output
+            run: Callable(image_path) returning the raw OCR output
+
+        Returns:
+            (result, cached) where cached is True when served from the store
+        """
+        key = self.key(image_path, engine, version, profile)
+        entry = None if self.force else self.get(key)
+        if entry is not None:
+            self.stats['hits'] += 1
+            self.stats['saved_seconds'] += entry.get('elapsed_seconds', 0.0)
+            return entry['result'], True
+
+        start = time.perf_counter()
+        result = to_json(run(image_path))
+        elapsed = time.perf_counter() - start
+        self.stats['misses'] += 1
+        self.stats['ocr_seconds'] += elapsed
+        if result is not None:
+            self.put(key, {
+                'image': os.path.basename(image_path),
+                'image_sha256': self.image_hash(image_path),
+                'engine': engine,
+                'version': version,
+                'profile': profile,
+                'elapsed_seconds': elapsed,
+                'result': result,
+            })
+        return result, False
+
+    def record(self, engine, image, expected, extracted, passed, cached):
+        """Keep one accuracy outcome for the end-of-run report"""
+        self.outcomes.append({
+            'engine': engine,
+            'image': image,
+            'expected': expected,
+            'extracted': extracted,
+            'passed': passed,
+            'cached': cached,
+        })
+
+    def report(self):
+        """Accuracy per engine plus store hit/miss accounting"""
+        engines = {}
+        for outcome in self.outcomes:
+            summary = engines.setdefault(outcome['engine'], {'images': 0, 'correct': 0, 'cached': 0})
+            summary['images'] += 1
+            summary['correct'] += outcome['passed']
+            summary['cached'] += outcome['cached']
+        for summary in engines.values():
+            summary['accuracy'] = summary['correct'] / summary['images']
+        return {
+            'engines': engines,
+            'failures': [o for o in self.outcomes if not o['passed']],
+            **self.stats,
+        }
+
+    def entries(self):
+        """Number of stored results and their total size in bytes"""
+        count = size = 0
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith('.json'):
+                    count += 1
+                    size += os.path.getsize(os.path.join(directory, name))
+        return count, size
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='OCR result store of the regression suite')
+    parser.add_argument('command', choices=['stats', 'clear'])
+    parser.add_argument('--store', default=None, help=f'Store directory (default: {DEFAULT_STORE})')
+    args = parser.parse_args()
+
+    store = OCRResultStore(args.store)
+    if args.command == 'clear':
+        shutil.rmtree(store.root, ignore_errors=True)
+        print(f"✓ Cleared {store.root}")
+        return 0
+
+    count, size = store.entries()
+    print(json.dumps({'store': store.root, 'results': count, 'bytes': size}, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
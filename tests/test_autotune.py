@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the OCR autotuner and the profile it writes
+Uses a fake reader so no OCR engine is needed
+"""
+
+import json
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('cv2')
+
+from autotune import (
+    DEFAULT_GRID, expand_grid, point_name, score, combine_both, pareto_frontier, select,
+    write_profile, labelled_images
+)
+from easyocr_process import load_profile, run_reader
+
+
+class ShapeReader:
+    """Reader that records the size of the images it is given"""
+
+    def __init__(self):
+        self.shapes = []
+
+    def readtext(self, image):
+        self.shapes.append(image.shape[:2])
+        return [([[0, 0], [1, 0], [1, 1], [0, 1]], '12345', 0.9)]
+
+
+def measured(texts, latency=10.0):
+    return [(code, {'text': text, 'latency_ms': latency, 'error': None}) for code, text in texts]
+
+
+def point_score(engine, accuracy, p50):
+    return {'engine': engine, 'name': f'{engine}-{accuracy}-{p50}', 'accuracy': accuracy, 'p50_ms': p50}
+
+
+class TestAutotune:
+    """Grid expansion, scoring, frontier and selection"""
+
+    def test_expand_grid(self):
+        points = expand_grid(DEFAULT_GRID, ['tesseract', 'pytorch'])
+        tesseract = [p for p in points if p['engine'] == 'tesseract']
+        pytorch = [p for p in points if p['engine'] == 'pytorch']
+        # Tesseract has no orientation pre-pass: its duplicates collapse
+        assert len(tesseract) == 2 * 4 and all(not p['orient'] for p in tesseract)
+        assert len(pytorch) == 2 * 4 * 2
+        assert len({point_name(p) for p in points}) == len(points)
+
+    def test_score_and_both(self):
+        first = measured([('12345', '12345'), ('54321', '')])
+        second = measured([('12345', '1234'), ('54321', '54321')], latency=30.0)
+        point = {'engine': 'tesseract', 'languages': ['en'], 'max_side': None, 'orient': False}
+        assert score(point, first)['accuracy'] == 0.5
+
+        both = score(dict(point, engine='both'), combine_both(first, second))
+        assert both['accuracy'] == 1.0 and both['p50_ms'] == 40.0
+
+    def test_frontier_and_selection(self):
+        scores = [
+            point_score('pytorch', 0.99, 300.0),
+            point_score('pytorch', 0.98, 120.0),
+            point_score('onnx', 0.90, 80.0),
+            point_score('pytorch', 0.85, 150.0),     # dominated
+            point_score('tesseract', 0.70, 40.0),
+        ]
+        frontier = pareto_frontier(scores)
+        assert [s['accuracy'] for s in frontier] == [0.70, 0.90, 0.98, 0.99]
+        assert select(frontier)['p50_ms'] == 120.0
+        assert select(frontier, min_accuracy=0.9)['engine'] == 'onnx'
+        assert select(frontier, min_accuracy=0.5, engines=('tesseract', 'pytorch', 'onnx'))['engine'] == 'tesseract'
+
+    def test_profile_chosen_among_easyocr_points(self):
+        # A tesseract point faster and as accurate as every EasyOCR point
+        scores = [
+            point_score('tesseract', 1.0, 50.0),
+            point_score('pytorch', 1.0, 900.0),
+            point_score('onnx', 0.98, 400.0),
+        ]
+        assert [s['engine'] for s in pareto_frontier(scores)] == ['tesseract']
+        assert select(scores)['engine'] == 'pytorch'
+        assert select(scores, min_accuracy=0.95)['engine'] == 'onnx'
+        assert select(scores, engines=('tesseract', 'pytorch', 'onnx'))['engine'] == 'tesseract'
+
+    def test_profile_round_trip(self, tmp_path):
+        chosen = dict(point_score('onnx', 0.95, 90.0), languages=['en'], max_side=960, orient=False,
+                      p95_ms=150.0)
+        path = str(tmp_path / 'profile.json')
+        write_profile(path, chosen, chosen, 25)
+        assert load_profile(path) == {'engine': 'onnx', 'languages': ['en'], 'max_side': 960,
+                                      'orient': False}
+
+        with open(path, 'w') as f:
+            json.dump({'profile': {'engine': 'paddle'}}, f)
+        with pytest.raises(ValueError):
+            load_profile(path)
+
+    def test_run_reader_limits_size(self):
+        reader = ShapeReader()
+        image = np.full((1200, 1600, 3), 255, dtype=np.uint8)
+        result = run_reader(reader, image, 'pytorch', orient=False, max_side=800)
+        assert result['success'] and reader.shapes == [(600, 800)]
+
+        run_reader(reader, image, 'pytorch', orient=False, max_side=4000)
+        assert reader.shapes[-1] == (1200, 1600)
+
+    def test_labelled_images(self):
+        labelled = labelled_images(['/x/product_12345.png', '/x/variants/54321_white_modern.png',
+                                    '/x/variants/danowind.jpeg'])
+        assert labelled == [('/x/product_12345.png', '12345'),
+                            ('/x/variants/54321_white_modern.png', '54321')]
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the minibackend append-only entries store
+Answers are compared with what the whole-file JSON handlers return
+"""
+
+import json
+import random
+
+import pytest
+
+from entries_store import EntriesStore, migrate, synthetic_entries, timestamp_epoch
+
+
+def newest_first(entries, limit, offset):
+    """Page of entry ids as get_entries.php orders them (by timestamp here)"""
+    order = sorted(range(len(entries)),
+                   key=lambda i: (timestamp_epoch(entries[i]['timestamp']), i), reverse=True)
+    return [entries[i]['id'] for i in order][offset:offset + limit]
+
+
+class TestEntriesStore:
+    """Indexed lookups, pagination, compaction and crash recovery"""
+
+    def test_matches_whole_file_answers(self, tmp_path):
+        entries = list(synthetic_entries(60, seed=3))
+        random.Random(1).shuffle(entries)
+        store = EntriesStore(str(tmp_path), compact_tail=7)
+        store.bulk_load(entries[:25])
+        for entry in entries[25:]:
+            store.append(entry)
+
+        assert store.stats()['generation'] > 1
+        assert store.count() == len(entries)
+        for offset in range(0, 62, 5):
+            for limit in (1, 7, 50):
+                page = store.list_entries(limit, offset)
+                assert [e['id'] for e in page['entries']] == newest_first(entries, limit, offset)
+                assert page['total'] == len(entries)
+
+        for ref in {e['referencia'] for e in entries}:
+            matches = [e for e in entries if e['referencia'] == ref]
+            result = store.check_reference(ref)
+            assert result['count'] == len(matches)
+            assert result['total_quantity'] == sum(e['cantidad'] for e in matches)
+            assert result['last_entry']['timestamp'] == matches[-1]['timestamp']
+        assert store.check_reference('NO-EXISTE') == {'exists': False}
+
+    def test_torn_record_is_dropped(self, tmp_path):
+        store = EntriesStore(str(tmp_path))
+        entries = list(synthetic_entries(3))
+        store.append(entries[0])
+        with open(store.log_path, 'ab') as f:
+            f.write(b'0000abcd {"referencia": "REF')    # crash in the middle of an append
+
+        assert EntriesStore(str(tmp_path)).count() == 1
+        store.append(entries[1])
+        reopened = EntriesStore(str(tmp_path))
+        assert reopened.count() == 2
+        assert reopened.check_reference(entries[1]['referencia'])['exists']
+
+    def test_migrate_from_entries_json(self, tmp_path):
+        entries = list(synthetic_entries(20))
+        source = tmp_path / 'entries.json'
+        source.write_text(json.dumps({'entries': entries}))
+
+        assert migrate(str(source), str(tmp_path / 'store')) == 20
+        store = EntriesStore(str(tmp_path / 'store'))
+        assert store.stats()['tail'] == 0
+        assert [e['id'] for e in store.list_entries(5)['entries']] == newest_first(entries, 5, 0)
+
+    def test_only_a_finished_migration_creates_the_store(self, tmp_path):
+        root = tmp_path / 'store'
+        with pytest.raises(FileNotFoundError):
+            EntriesStore(str(root))
+        with pytest.raises(OSError):
+            migrate(str(tmp_path / 'missing.json'), str(root))
+        assert list(tmp_path.iterdir()) == []
+
+        # An empty directory left by an older version is replaced
+        root.mkdir()
+        source = tmp_path / 'entries.json'
+        source.write_text(json.dumps({'entries': []}))
+        assert migrate(str(source), str(root)) == 0
+        assert (root / 'meta.json').exists()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['entries.json', 'store']
+        with pytest.raises(ValueError):
+            migrate(str(source), str(root))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the layout-aware field extractor
+Tokens are built by hand in EasyOCR's (box, text, confidence) shape
+"""
+
+import pytest
+
+from field_extractor import normalize_code, ean_checksum_ok, extract_fields
+
+
+def token(text, x0, y0, x1, y1, confidence=0.9):
+    return ([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], text, confidence)
+
+
+LABEL = [
+    token('Tornillo M8x20', 120, 20, 380, 50),
+    token('12345', 150, 120, 350, 200, 0.95),
+    token('0,50 €', 200, 230, 300, 260),
+    token('8412345678905', 140, 330, 360, 350, 0.8),
+]
+
+
+class TestNormalizeCode:
+    """Digit repair of code-like tokens"""
+
+    def test_repairs_letters_inside_digit_groups(self):
+        assert normalize_code('1OO2') == '1002'
+        assert normalize_code('12 345') == '12345'
+
+    def test_rejects_plain_words(self):
+        assert normalize_code('SOS') == ''
+        assert normalize_code('OO2') == '002'
+        assert normalize_code('M8x20') == ''
+
+
+class TestExtractFields:
+    """Field assignment from token text, size and position"""
+
+    def test_synthetic_label(self):
+        fields = extract_fields(LABEL)
+        assert fields['code']['value'] == '12345'
+        assert fields['price']['value'] == '0.50'
+        assert fields['name']['value'] == 'Tornillo M8x20'
+        assert fields['barcode']['value'] == '8412345678905'
+        assert ean_checksum_ok('8412345678905')
+
+    def test_merges_split_digit_groups(self):
+        tokens = [
+            token('DANOWIND', 100, 10, 400, 60),
+            token('100', 120, 120, 220, 200),
+            token('OO2', 240, 120, 340, 200),
+        ]
+        fields = extract_fields(tokens)
+        assert fields['code']['value'] == '100002'
+        assert fields['code']['box'] == [[120, 120], [340, 120], [340, 200], [120, 200]]
+        assert fields['name']['value'] == 'DANOWIND'
+
+    def test_leading_part_of_a_long_run_is_the_code(self):
+        # Relé Danowind (tests/variants/danowind.jpeg): code 100002, then 10566
+        tokens = [
+            token('DANOWIND', 100, 10, 400, 60),
+            token('100', 60, 120, 160, 200),
+            token('002', 180, 120, 280, 200),
+            token('10566', 300, 120, 460, 200),
+        ]
+        assert extract_fields(tokens)['code']['value'] == '100002'
+
+    def test_dotted_codes_and_lots_are_not_prices(self):
+        fields = extract_fields([token('12.345', 100, 100, 300, 180)])
+        assert fields['price'] is None
+        assert fields['code']['value'] == '12345'
+
+        for lot in ([token('Lote 2024.10', 10, 300, 200, 320)],
+                    [token('Lote', 10, 300, 60, 320), token('2024.10', 70, 300, 200, 320)]):
+            fields = extract_fields([token('12345', 100, 100, 300, 180)] + lot)
+            assert fields['price'] is None
+            assert fields['code']['value'] == '12345'
+
+        assert extract_fields([token('12,50', 100, 300, 200, 320)])['price']['value'] == '12.50'
+        assert extract_fields([token('PVP 3.20 EUR', 100, 300, 200, 320)])['price']['value'] == '3.20'
+
+    def test_larger_digits_win_the_code(self):
+        tokens = [token('4321', 10, 10, 60, 25), token('98765', 100, 100, 300, 180)]
+        assert extract_fields(tokens)['code']['value'] == '98765'
+
+    def test_no_tokens(self):
+        assert extract_fields([]) == {'code': None, 'price': None, 'name': None, 'barcode': None}
+
+
+class TestRunReaderFields:
+    """process_image results carry tokens and fields"""
+
+    def test_run_reader_returns_tokens_and_fields(self):
+        np = pytest.importorskip('numpy')
+        pytest.importorskip('cv2')
+        from easyocr_process import run_reader
+
+        class LabelReader:
+            def readtext(self, image):
+                return [(box, text, np.float64(conf)) for box, text, conf in LABEL]
+
+        image = np.full((400, 500, 3), 255, dtype=np.uint8)
+        result = run_reader(LabelReader(), image, 'pytorch', orient=False)
+        assert result['success']
+        assert len(result['tokens']) == len(LABEL)
+        assert result['tokens'][1] == {
+            'text': '12345', 'confidence': 0.95,
+            'box': [[150, 120], [350, 120], [350, 200], [150, 200]],
+        }
+        assert result['fields']['code']['value'] == '12345'
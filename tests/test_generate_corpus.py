@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the synthetic label corpus generator
+"""
+
+import io
+import json
+import pytest
+
+np = pytest.importorskip('numpy')
+from PIL import Image
+
+from generate_corpus import (
+    catalog_products, generate_corpus, iter_corpus, item_rng, sample_augmentations
+)
+
+
+class TestGenerateCorpus:
+    """Sharded output, manifest and seed reproducibility"""
+
+    def test_catalog_products(self):
+        products = catalog_products()
+        codes = [p['code'] for p in products]
+        assert '12345' in codes and len(codes) == len(set(codes))
+        screw = next(p for p in products if p['code'] == '12345')
+        assert screw['price'] == '0.50' and screw['part_type'] == 'screw'
+
+    def test_manifest_and_shards(self, tmp_path):
+        info = generate_corpus(str(tmp_path), 7, seed=3, workers=1, shard_size=3)
+        assert info['shards'] == 3
+        assert sorted(p.name for p in tmp_path.iterdir() if p.is_dir()) == \
+            ['shard-00000', 'shard-00001', 'shard-00002']
+
+        codes = {p['code'] for p in catalog_products()}
+        items = list(iter_corpus(str(tmp_path)))
+        assert [record['id'] for record, _ in items] == list(range(7))
+        for record, data in items:
+            assert record['code'] in codes
+            img = Image.open(io.BytesIO(data))
+            assert img.size == (record['width'], record['height'])
+            assert len(record['corners']) == 4
+
+        with open(tmp_path / 'corpus.json') as f:
+            assert json.load(f)['seed'] == 3
+
+    def test_same_seed_same_corpus(self, tmp_path):
+        generate_corpus(str(tmp_path / 'dir'), 6, seed=5, workers=1, shard_size=4)
+        generate_corpus(str(tmp_path / 'tar'), 6, seed=5, workers=2, shard_size=2, tar=True)
+        generate_corpus(str(tmp_path / 'other'), 6, seed=6, workers=1, shard_size=4)
+
+        first = list(iter_corpus(str(tmp_path / 'dir')))
+        again = list(iter_corpus(str(tmp_path / 'tar')))
+        other = list(iter_corpus(str(tmp_path / 'other')))
+        assert [data for _, data in first] == [data for _, data in again]
+        assert [r['augmentations'] for r, _ in first] == [r['augmentations'] for r, _ in again]
+        assert [data for _, data in first] != [data for _, data in other]
+
+    def test_augmentations_cover_every_kind(self):
+        seen = set()
+        for index in range(200):
+            seen.update(sample_augmentations(item_rng(0, index)))
+        assert seen == {'perspective', 'rotation', 'lighting', 'blur', 'noise', 'jpeg'}
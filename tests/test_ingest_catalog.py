@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the supplier catalog ingestion pipeline
+Uses small CSV/JSON price lists written to a temporary directory
+"""
+
+import io
+import json
+import os
+
+from ingest_catalog import (
+    BATCHES_IN_FLIGHT, catalog_code, parse_price, iter_json_items, ingest, lookup, spill_batches
+)
+
+
+def write(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+class TestNormalization:
+    """Codes and prices as suppliers write them"""
+
+    def test_codes_keep_their_letters(self):
+        assert catalog_code(' 12345 ') == '12345'
+        assert catalog_code('12-345') == '12345'
+        assert catalog_code('1OO2') == '1OO2'
+        assert catalog_code('B-105') == 'B-105'
+        assert catalog_code('M8x20-INOX') == 'M8x20-INOX'
+        assert catalog_code('') == ''
+
+    def test_prices(self):
+        assert parse_price('12,50') == 12.5
+        assert parse_price('1.234,56 €') == 1234.56
+        assert parse_price('1,234.56') == 1234.56
+        assert parse_price('€0.75') == 0.75
+        assert parse_price('n/d') is None
+        assert parse_price('nan') is None
+        assert parse_price('inf') is None
+        assert parse_price(float('-inf')) is None
+
+    def test_non_finite_values_not_written(self, tmp_path):
+        source = write(tmp_path / 'tarifa.jsonl',
+                       '{"code": "111", "price": "nan", "stock": "inf"}\n'
+                       '{"code": "222", "price": NaN, "name": "Arandela"}\n')
+        catalog_dir = str(tmp_path / 'catalog')
+        ingest([source], catalog_dir, base=None, workers=1)
+
+        def strict(constant):
+            raise ValueError(constant)
+
+        with open(os.path.join(catalog_dir, 'current', 'products.jsonl'), encoding='utf-8') as f:
+            products = [json.loads(line, parse_constant=strict) for line in f]
+        assert products == [{'code': '111', 'supplier': 'tarifa'},
+                            {'code': '222', 'name': 'Arandela', 'supplier': 'tarifa'}]
+
+    def test_scalar_locations_become_lists(self, tmp_path):
+        first = write(tmp_path / 'a.jsonl',
+                      '{"code": "111", "locations": 7}\n'
+                      '{"code": "222", "locations": {"aisle": 3}}\n'
+                      '{"code": "333", "locations": ["A-1", 4, null]}\n')
+        second = write(tmp_path / 'b.jsonl',
+                       '{"code": "111", "locations": "A-3 | 7"}\n'
+                       '{"code": "333", "locations": "B-2"}\n')
+        catalog_dir = str(tmp_path / 'catalog')
+        ingest([first, second], catalog_dir, base=None, workers=1)
+
+        assert lookup('111', catalog_dir)['locations'] == ['7', 'A-3']
+        assert 'locations' not in lookup('222', catalog_dir)
+        assert lookup('333', catalog_dir)['locations'] == ['A-1', '4', 'B-2']
+
+    def test_json_array_decoded_incrementally(self, monkeypatch):
+        import ingest_catalog
+        monkeypatch.setattr(ingest_catalog, 'JSON_READ_SIZE', 7)
+        items = [{'code': str(i), 'name': 'x' * i} for i in range(20)]
+        stream = io.StringIO(json.dumps({'meta': 1, 'products': items}, indent=1))
+        assert list(iter_json_items(stream)) == items
+
+
+class TestIngest:
+    """Merge, publish and lookup"""
+
+    def test_merges_sources_and_publishes(self, tmp_path):
+        base = write(tmp_path / 'products.json', json.dumps({'products': [
+            {'code': '12345', 'name': 'Tornillo M8x20', 'price': 0.5, 'stock': 150,
+             'locations': ['Estantería A-3'], 'supplier': 'Proveedor A', 'category': 'Tornillería'},
+        ]}))
+        supplier_a = write(tmp_path / 'proveedor_a.csv',
+                           'Referencia;Denominación;PVP;Ubicación\n'
+                           '12345;;0,55;Estantería B-1\n'
+                           '1OO2;Tuerca M10;0,75;\n'
+                           ';Sin código;1,00;\n')
+        supplier_b = write(tmp_path / 'proveedor_b.jsonl',
+                           json.dumps({'sku': '1002', 'precio': '0,80', 'proveedor': 'Proveedor B'}) + '\n')
+        catalog_dir = str(tmp_path / 'catalog')
+
+        manifest = ingest([supplier_a, supplier_b], catalog_dir, base=base, chunk_rows=2, workers=1)
+        assert manifest['rows'] == 5
+        assert manifest['rejected'] == 1
+        assert manifest['products'] == 3
+        assert manifest['runs'] == 4
+        assert manifest['conflicts'] == 1
+
+        screw = lookup('12345', catalog_dir)
+        assert screw['name'] == 'Tornillo M8x20'
+        assert screw['price'] == 0.55
+        assert screw['locations'] == ['Estantería A-3', 'Estantería B-1']
+        assert lookup('12-345', catalog_dir) == screw
+        # '1OO2' repairs to the real code 1002: both rows stay as they are
+        assert lookup('1OO2', catalog_dir) == {'code': '1OO2', 'name': 'Tuerca M10', 'price': 0.75,
+                                               'supplier': 'proveedor_a'}
+        assert lookup('1002', catalog_dir) == {'code': '1002', 'price': 0.8, 'supplier': 'Proveedor B'}
+        assert lookup('99999', catalog_dir) is None
+
+    def test_repaired_codes_never_merged(self, tmp_path):
+        source = write(tmp_path / 'tarifa.csv',
+                       'code,name,price\n'
+                       'B-105,Brida B-105,3.00\n'
+                       '8105,Tornillo 8105,0.10\n'
+                       'IO-7,Junta IO-7,1.20\n')
+        catalog_dir = str(tmp_path / 'catalog')
+
+        manifest = ingest([source], catalog_dir, base=None, workers=1)
+        assert manifest['products'] == 3
+        assert manifest['merged'] == 0
+        assert manifest['conflicts'] == 1
+        assert manifest['aliases'] == 1
+
+        assert lookup('B-105', catalog_dir) == {'code': 'B-105', 'name': 'Brida B-105', 'price': 3.0,
+                                                'supplier': 'tarifa'}
+        assert lookup('8105', catalog_dir)['name'] == 'Tornillo 8105'
+        # No clash: the digits OCR reads for 'IO-7' find the row
+        assert lookup('107', catalog_dir)['code'] == 'IO-7'
+
+    def test_generations_swapped_atomically(self, tmp_path):
+        catalog_dir = str(tmp_path / 'catalog')
+        first = write(tmp_path / 'a.csv', 'code,price\n111,1.00\n')
+        second = write(tmp_path / 'b.csv', 'code,price\n111,2.00\n')
+
+        ingest([first], catalog_dir, base=None, workers=1)
+        old = os.path.realpath(os.path.join(catalog_dir, 'current'))
+        dry = ingest([second], catalog_dir, base=None, workers=1, dry_run=True)
+        assert not dry['published']
+        assert lookup('111', catalog_dir)['price'] == 1.0
+
+        ingest([second], catalog_dir, base=None, workers=1, keep=1)
+        assert lookup('111', catalog_dir)['price'] == 2.0
+        assert os.path.realpath(os.path.join(catalog_dir, 'current')) != old
+        assert len(os.listdir(os.path.join(catalog_dir, 'generations'))) == 1
+        assert not [n for n in os.listdir(catalog_dir) if n.startswith('.')]
+
+    def test_batches_in_flight_are_bounded(self, tmp_path):
+        workers, batches = 2, 12
+        limit = BATCHES_IN_FLIGHT * workers
+        backlog = []
+
+        def jobs():
+            for i in range(batches):
+                # Batches handed out so far minus runs already written
+                backlog.append(i - len(list(tmp_path.glob('run-*'))))
+                yield str(tmp_path / f'run-{i:03d}'), i * 10, ['code'], [[str(i)]] * 10, None
+
+        results = spill_batches(jobs(), workers)
+        assert [count for _, count, _ in results] == [10] * batches
+        assert max(backlog) <= limit
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the vectorized label rendering helpers
+"""
+
+import io
+import pytest
+
+np = pytest.importorskip('numpy')
+from PIL import Image
+
+from label_rendering import metal_texture, metal_texture_reference, encode
+from generate_advanced_test_images import TEST_PRODUCTS, generate_product_label_variant
+from generate_test_images import generate_product_label
+
+
+class TestLabelRendering:
+    """Seeded textures and in-memory labels"""
+
+    def test_texture_is_deterministic_per_seed(self):
+        first = np.asarray(metal_texture(120, 80, (250, 250, 250), seed=7))
+        again = np.asarray(metal_texture(120, 80, (250, 250, 250), seed=7))
+        other = np.asarray(metal_texture(120, 80, (250, 250, 250), seed=8))
+        assert np.array_equal(first, again)
+        assert not np.array_equal(first, other)
+
+    @pytest.mark.parametrize('color_base', [(250, 250, 250), (200, 120, 40)])
+    def test_texture_matches_reference_look(self, color_base):
+        vectorized = np.asarray(metal_texture(200, 150, color_base, seed=0), dtype=np.float64)
+        reference = np.asarray(metal_texture_reference(200, 150, color_base), dtype=np.float64)
+        assert vectorized.shape == reference.shape
+        assert np.allclose(vectorized.mean(axis=(0, 1)), reference.mean(axis=(0, 1)), atol=0.5)
+        assert abs(vectorized.std() - reference.std()) < 0.5
+
+    def test_label_variant_in_memory(self):
+        product = TEST_PRODUCTS[0]
+        array = generate_product_label_variant(product, 'white_modern', ('Helvetica', 'bold'),
+                                               seed=1, output='array')
+        assert array.shape == (400, 500, 3) and array.dtype == np.uint8
+
+        again = generate_product_label_variant(product, 'white_modern', ('Helvetica', 'bold'),
+                                               seed=1, output='array')
+        assert np.array_equal(array, again)
+
+        png = generate_product_label_variant(product, 'white_modern', ('Helvetica', 'bold'),
+                                             seed=1, output='png')
+        assert np.array_equal(np.asarray(Image.open(io.BytesIO(png)).convert('RGB')), array)
+
+    def test_basic_label_in_memory(self):
+        jpeg = generate_product_label({'code': '12345', 'name': 'Tornillo M8x20', 'price': '0.50',
+                                       'color_bg': '#FF6B6B'}, output='jpeg')
+        assert jpeg[:2] == b'\xff\xd8'
+
+    def test_unknown_output_format(self):
+        with pytest.raises(ValueError):
+            encode(Image.new('RGB', (4, 4)), 'tiff')
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the label layout cache
+Uses a fake reader so no OCR engine is needed
+"""
+
+import os
+
+import pytest
+from pathlib import Path
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('cv2')
+
+from layout_cache import LayoutCache
+
+VARIANTS_DIR = Path(__file__).parent / 'variants'
+
+
+class FakeReader:
+    """Minimal detect / recognize reader with call counters"""
+
+    def __init__(self, confidence=0.9):
+        self.confidence = confidence
+        self.detect_calls = 0
+        self.recognize_calls = 0
+
+    def detect(self, img):
+        self.detect_calls += 1
+        height, width = img.shape[:2]
+        return [[[40, width - 40, height // 3, height // 2]]], [[]]
+
+    def recognize(self, img_grey, horizontal_list, free_list):
+        self.recognize_calls += 1
+        return [
+            ([[b[0], b[2]], [b[1], b[2]], [b[1], b[3]], [b[0], b[3]]], '12345', self.confidence)
+            for b in horizontal_list
+        ]
+
+
+class TestLayoutCache:
+    """Template matching and detection skipping"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return LayoutCache(str(tmp_path / 'layout_cache.json'))
+
+    def test_same_template_skips_detection(self, cache):
+        reader = FakeReader()
+        first = str(VARIANTS_DIR / '12345_white_modern.png')
+        second = str(VARIANTS_DIR / '54321_white_modern.png')
+
+        _, info = cache.readtext(reader, first)
+        assert info['layout_cache'] == 'miss'
+
+        results, info = cache.readtext(reader, second)
+        assert info['layout_cache'] == 'hit'
+        assert reader.detect_calls == 1
+        assert results[0][1] == '12345'
+
+    def test_different_template_is_a_miss(self, cache):
+        reader = FakeReader()
+        cache.readtext(reader, str(VARIANTS_DIR / '12345_white_modern.png'))
+        _, info = cache.readtext(reader, str(Path(__file__).parent / 'product_12345.png'))
+        assert info['layout_cache'] == 'miss'
+        assert reader.detect_calls == 2
+
+    def test_low_confidence_hit_falls_back_to_detection(self, cache):
+        cache.readtext(FakeReader(), str(VARIANTS_DIR / '12345_white_modern.png'))
+
+        reader = FakeReader(confidence=0.1)
+        _, info = cache.readtext(reader, str(VARIANTS_DIR / '22222_white_modern.png'))
+        assert info['layout_cache'] == 'fallback'
+        assert reader.detect_calls == 1
+
+    def test_unconfident_results_are_not_learned(self, cache):
+        cache.readtext(FakeReader(confidence=0.2), str(VARIANTS_DIR / '12345_white_modern.png'))
+        assert cache.templates == []
+
+    def test_manufacturer_scopes_lookup(self, cache):
+        reader = FakeReader()
+        cache.readtext(reader, str(VARIANTS_DIR / '12345_white_modern.png'), manufacturer='Danfoss')
+        _, info = cache.readtext(reader, str(VARIANTS_DIR / '54321_white_modern.png'), manufacturer='Bosch')
+        assert info['layout_cache'] == 'miss'
+
+    def test_cache_persists_and_reports(self, cache):
+        reader = FakeReader()
+        for name in ('12345_white_modern.png', '54321_white_modern.png', '67890_white_modern.png'):
+            cache.readtext(reader, str(VARIANTS_DIR / name))
+
+        # Hits are batched in memory until flushed
+        assert LayoutCache(cache.path).report()['hits'] == 0
+        cache.flush()
+
+        reloaded = LayoutCache(cache.path)
+        report = reloaded.report()
+        assert report['templates'] == 1
+        assert report['hits'] == 2
+        assert report['hit_rate'] == pytest.approx(2 / 3)
+        assert report['detection_seconds_saved'] >= 0
+
+    def test_hits_do_not_write_the_cache_file(self, cache):
+        reader = FakeReader()
+        cache.readtext(reader, str(VARIANTS_DIR / '12345_white_modern.png'))
+        before = os.stat(cache.path).st_mtime_ns
+
+        for name in ('54321_white_modern.png', '67890_white_modern.png'):
+            _, info = cache.readtext(reader, str(VARIANTS_DIR / name))
+            assert info['layout_cache'] == 'hit'
+        assert os.stat(cache.path).st_mtime_ns == before
+
+    def test_concurrent_workers_keep_each_others_updates(self, cache):
+        other = LayoutCache(cache.path)
+        reader = FakeReader()
+        cache.readtext(reader, str(VARIANTS_DIR / '12345_white_modern.png'))
+        other.readtext(reader, str(Path(__file__).parent / 'product_12345.png'))
+        cache.readtext(reader, str(VARIANTS_DIR / '54321_white_modern.png'))
+        other.readtext(reader, str(VARIANTS_DIR / '67890_white_modern.png'))
+        cache.flush()
+        other.flush()
+
+        report = LayoutCache(cache.path).report()
+        assert report['templates'] == 2
+        assert report['lookups'] == 4
+        assert report['hits'] == 2
+
+    def test_flag_does_not_swallow_the_image_path(self):
+        from easyocr_process import parse_args
+
+        args = parse_args(['--layout-cache', 'label.jpg'])
+        assert (args.image_path, args.layout_cache, args.layout_cache_path) == ('label.jpg', True, None)
+        args = parse_args(['label.jpg', '--layout-cache-path', 'cache.json'])
+        assert (args.image_path, args.layout_cache_path) == ('label.jpg', 'cache.json')
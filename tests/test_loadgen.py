@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the offline OCR load generator
+Uses an in-process target with a fixed service time, no OCR engine needed
+"""
+
+import sys
+import time
+import threading
+import pytest
+
+from loadgen import (
+    Traffic, SubprocessTarget, open_loop_stage, closed_loop_stage, run_load, send
+)
+
+
+class SingleServer:
+    """Target that serves one request at a time with a fixed service time"""
+
+    def __init__(self, service_time=0.02, fail_every=0):
+        self.service_time = service_time
+        self.fail_every = fail_every
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def __call__(self, image_path):
+        with self.lock:
+            self.calls += 1
+            time.sleep(self.service_time)
+            if self.fail_every and self.calls % self.fail_every == 0:
+                return {'success': False, 'error_code': 'low_quality'}
+            return {'success': True, 'raw_text': '12345'}
+
+
+class TestLoadgen:
+    """Open-loop and closed-loop stages, traffic mix and saturation"""
+
+    def test_open_loop_below_and_above_capacity(self):
+        traffic = Traffic(['a.png', 'b.png'], seed=1)
+        light = open_loop_stage(SingleServer(0.01), traffic, rate=20, duration=1.0)
+        assert light['requests'] > 5 and light['error_rate'] == 0.0
+        assert light['p50_ms'] < 100
+
+        # 60 req/s offered to a 25 req/s server: requests queue up
+        heavy = open_loop_stage(SingleServer(0.04), traffic, rate=60, duration=0.5)
+        assert heavy['throughput_rps'] < 0.9 * heavy['arrival_rps']
+        assert heavy['p95_ms'] > 5 * light['p95_ms']
+
+    def test_closed_loop_and_errors(self):
+        traffic = Traffic(['a.png'], seed=0)
+        stage = closed_loop_stage(SingleServer(0.01, fail_every=4), traffic, concurrency=2, duration=0.5)
+        assert stage['concurrency'] == 2 and stage['requests'] > 10
+        assert 0.15 < stage['error_rate'] < 0.35
+        assert stage['error_kinds'] == {'low_quality': stage['errors']}
+
+    def test_bulk_traffic_and_saturation(self):
+        traffic = Traffic(['a.png', 'b.png'], seed=3, bulk_share=0.5, bulk_size=3)
+        result = run_load(SingleServer(0.01), traffic, rates=[20, 150], duration=0.8, warmup=1)
+        first, second = result['stages']
+        assert set(first['classes']) == {'interactive', 'bulk'}
+        assert first['images_per_second'] > first['throughput_rps']
+        assert result['saturation'] is second and 'throughput' in second['saturated']
+
+    def test_subprocess_target(self, tmp_path):
+        script = tmp_path / 'fake_process.py'
+        script.write_text('import json, sys\n'
+                          'print(json.dumps({"success": sys.argv[1] != "bad.png"}))\n')
+        target = SubprocessTarget(script=str(script), timeout=10)
+        assert send(target, ['good.png']) == (True, None)
+        assert send(target, ['good.png', 'bad.png']) == (False, 'failed')
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the multi-label (shelf photo) mode
+A fake reader answers detect/recognize from the layout of a drawn shelf
+"""
+
+import json
+
+import pytest
+
+np = pytest.importorskip('numpy')
+cv2 = pytest.importorskip('cv2')
+
+from multi_label import (
+    CatalogMatcher, cluster_boxes, label_regions, read_labels, synthetic_shelf
+)
+
+
+class ShelfReader:
+    """Reader returning fixed text lines, counting detect/recognize calls"""
+
+    def __init__(self, lines):
+        # lines: ([x_min, x_max, y_min, y_max], text)
+        self.lines = lines
+        self.detect_calls = 0
+        self.recognize_calls = 0
+        self.batch_size = None
+
+    def detect(self, img):
+        self.detect_calls += 1
+        return [[list(box) for box, _ in self.lines]], [[]]
+
+    def recognize(self, img_grey, horizontal_list, free_list, batch_size=1):
+        self.recognize_calls += 1
+        self.batch_size = batch_size
+        texts = {tuple(box): text for box, text in self.lines}
+        results = []
+        # Reversed on purpose: results are grouped by position, not by order
+        for x0, x1, y0, y1 in reversed(horizontal_list):
+            text = texts.get((x0, x1, y0, y1), '??')
+            results.append(([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], text, 0.9))
+        return results
+
+
+def shelf_lines(labels):
+    """Text lines of synthetic_shelf (4 labels per row): name, code and price"""
+    lines = []
+    image, codes = synthetic_shelf(labels)
+    for i, code in enumerate(codes):
+        x = 60 + (i % 4) * 360
+        y = 60 + (i // 4) * 230
+        lines.append(([x + 20, x + 180, y + 20, y + 45], 'TORNILLO M8'))
+        lines.append(([x + 40, x + 230, y + 70, y + 115], code))
+        lines.append(([x + 20, x + 150, y + 135, y + 155], '1,50 EUR'))
+    return image, codes, lines
+
+
+class TestMultiLabel:
+    """Segmentation, batched recognition and per-label fields"""
+
+    def test_every_label_read_with_one_detect_and_recognize(self, tmp_path):
+        image, codes, lines = shelf_lines(6)
+        reader = ShelfReader(lines)
+        products = tmp_path / 'products.json'
+        products.write_text(json.dumps({'products': [{'code': codes[4], 'name': 'Tornillo M8x20'}]}))
+        matcher = CatalogMatcher(str(tmp_path / 'catalog'), str(products))
+
+        result = read_labels(reader, image, matcher, 'pytorch')
+
+        assert reader.detect_calls == 1
+        assert reader.recognize_calls == 1
+        assert reader.batch_size > 1
+        assert result['count'] == len(codes) == 6
+        assert [label['code'] for label in result['labels']] == codes
+        for label in result['labels']:
+            assert label['fields']['price']['value'] == '1.50'
+            assert label['fields']['name']['value'] == 'TORNILLO M8'
+            assert len(label['tokens']) == 3
+        assert result['labels'][4]['product']['name'] == 'Tornillo M8x20'
+        assert result['labels'][0]['product'] is None
+
+    def test_label_rectangles_found(self):
+        image, codes = synthetic_shelf(5)
+        grey = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        regions = sorted(label_regions(grey), key=lambda r: (r[2], r[0]))
+        assert len(regions) == 5
+        assert regions[0] == [60, 361, 60, 231]
+        # A single label filling the frame is not split
+        assert label_regions(np.full((200, 300), 250, np.uint8)) == []
+
+    def test_loose_text_clustered_by_proximity(self):
+        boxes = [
+            [10, 100, 10, 30], [10, 90, 40, 60],        # one label, two lines
+            [400, 500, 12, 32], [400, 480, 45, 62],     # a label far to the right
+            [10, 100, 300, 320],                        # a label further down
+        ]
+        clusters = sorted(sorted(c) for c in cluster_boxes(boxes))
+        assert clusters == [[0, 1], [2, 3], [4]]
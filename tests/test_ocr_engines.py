@@ -9,6 +9,8 @@ import os
 import subprocess
 import json
 import pytest
+from functools import lru_cache
+from importlib import metadata, util
 from pathlib import Path
 
 # Test images mapping: (filename, expected_code)
@@ -47,6 +49,32 @@ REAL_WORLD_IMAGES = [
     ('danowind.jpeg', '100002', ['100 002', '10000210566', '100002', '100 002 10566']),
 ]
 
+# Engine settings that change the OCR output; part of the result store key
+TESSERACT_PROFILE = {'languages': 'spa+eng'}
+EASYOCR_PROFILE = {'languages': ['en', 'es'], 'gpu': False}
+
+
+@lru_cache(maxsize=None)
+def tesseract_version():
+    """First line of `tesseract --version`"""
+    result = subprocess.run(['tesseract', '--version'], capture_output=True, timeout=5, text=True)
+    return (result.stdout or result.stderr).splitlines()[0].strip()
+
+
+@lru_cache(maxsize=None)
+def easyocr_reader():
+    """EasyOCR reader, loaded once and only when a result is not in the store"""
+    import easyocr
+    return easyocr.Reader(EASYOCR_PROFILE['languages'], gpu=EASYOCR_PROFILE['gpu'])
+
+
+def variation_found(extracted, acceptable_variations):
+    """True when any acceptable variation of a real-world code was read"""
+    for variation in acceptable_variations:
+        if variation in extracted or variation.replace(' ', '') in extracted.replace(' ', ''):
+            return True
+    return False
+
 class TestTesseractOCR:
     """Test Tesseract OCR engine"""
 
@@ -95,7 +123,7 @@ class TestTesseractOCR:
             temp_output = f"/tmp/ocr_{os.urandom(4).hex()}"
 
             # Run tesseract
-            cmd = ['tesseract', image_path, temp_output, '-l', 'spa+eng']
+            cmd = ['tesseract', image_path, temp_output, '-l', TESSERACT_PROFILE['languages']]
             result = subprocess.run(cmd, capture_output=True, timeout=10, text=True)
 
             if result.returncode != 0:
@@ -117,8 +145,13 @@ class TestTesseractOCR:
             pytest.skip(f"Tesseract not available: {e}")
             return None
 
+    def cached_ocr(self, image_path, ocr_store):
+        """Tesseract text of an image, from the result store when unchanged"""
+        return ocr_store.cached(image_path, 'tesseract', tesseract_version(),
+                                TESSERACT_PROFILE, self.tesseract_ocr)
+
     @pytest.mark.parametrize("filename,expected_code", BASIC_IMAGES)
-    def test_basic_images_tesseract(self, filename, expected_code, tesseract_available):
+    def test_basic_images_tesseract(self, filename, expected_code, tesseract_available, ocr_store):
         """Test Tesseract on basic images"""
         if not tesseract_available:
             pytest.skip("Tesseract not installed")
@@ -126,16 +159,17 @@ class TestTesseractOCR:
         image_path = Path(__file__).parent / filename
         assert image_path.exists(), f"Image not found: {image_path}"
 
-        text = self.tesseract_ocr(str(image_path))
+        text, cached = self.cached_ocr(str(image_path), ocr_store)
         assert text is not None, f"Tesseract failed to process {filename}"
 
         extracted = self.extract_code_from_text(text)
         # Check if expected code is in extracted text (with or without spaces)
-        assert expected_code in extracted.replace(' ', ''), \
-            f"Expected {expected_code} in '{extracted}' from {filename}"
+        passed = expected_code in extracted.replace(' ', '')
+        ocr_store.record('tesseract', filename, expected_code, extracted, passed, cached)
+        assert passed, f"Expected {expected_code} in '{extracted}' from {filename}"
 
     @pytest.mark.parametrize("filename,expected_code", ADVANCED_IMAGES[:5])
-    def test_advanced_images_tesseract(self, filename, expected_code, tesseract_available):
+    def test_advanced_images_tesseract(self, filename, expected_code, tesseract_available, ocr_store):
         """Test Tesseract on advanced images (sample)"""
         if not tesseract_available:
             pytest.skip("Tesseract not installed")
@@ -143,15 +177,16 @@ class TestTesseractOCR:
         image_path = Path(__file__).parent / 'variants' / filename
         assert image_path.exists(), f"Image not found: {image_path}"
 
-        text = self.tesseract_ocr(str(image_path))
+        text, cached = self.cached_ocr(str(image_path), ocr_store)
         assert text is not None, f"Tesseract failed to process {filename}"
 
         extracted = self.extract_code_from_text(text)
-        assert expected_code in extracted.replace(' ', ''), \
-            f"Expected {expected_code} in '{extracted}' from {filename}"
+        passed = expected_code in extracted.replace(' ', '')
+        ocr_store.record('tesseract', filename, expected_code, extracted, passed, cached)
+        assert passed, f"Expected {expected_code} in '{extracted}' from {filename}"
 
     @pytest.mark.parametrize("filename,expected_code,acceptable_variations", REAL_WORLD_IMAGES)
-    def test_real_world_images_tesseract(self, filename, expected_code, acceptable_variations, tesseract_available):
+    def test_real_world_images_tesseract(self, filename, expected_code, acceptable_variations, tesseract_available, ocr_store):
         """Test Tesseract on real-world images"""
         if not tesseract_available:
             pytest.skip("Tesseract not installed")
@@ -159,17 +194,13 @@ class TestTesseractOCR:
         image_path = Path(__file__).parent / 'variants' / filename
         assert image_path.exists(), f"Image not found: {image_path}"
 
-        text = self.tesseract_ocr(str(image_path))
+        text, cached = self.cached_ocr(str(image_path), ocr_store)
         assert text is not None, f"Tesseract failed to process {filename}"
 
         extracted = self.extract_code_from_text(text)
         # For real-world images, check if any acceptable variation is found
-        found = False
-        for variation in acceptable_variations:
-            if variation in extracted or variation.replace(' ', '') in extracted.replace(' ', ''):
-                found = True
-                break
-
+        found = variation_found(extracted, acceptable_variations)
+        ocr_store.record('tesseract', filename, expected_code, extracted, found, cached)
         assert found, f"Expected one of {acceptable_variations} in '{extracted}' from {filename}"
 
 
@@ -178,12 +209,8 @@ class TestEasyOCROCR:
 
     @pytest.fixture(scope="class")
     def easyocr_available(self):
-        """Check if EasyOCR is installed"""
-        try:
-            import easyocr
-            return True
-        except ImportError:
-            return False
+        """Check if EasyOCR is installed (without importing it)"""
+        return util.find_spec('easyocr') is not None
 
     def extract_code_from_detections(self, detections):
         """Extract code from EasyOCR detections"""
@@ -212,10 +239,8 @@ class TestEasyOCROCR:
     def easyocr_ocr(self, image_path):
         """Run EasyOCR on image"""
         try:
-            import easyocr
-
             # Initialize reader (cached)
-            reader = easyocr.Reader(['en', 'es'], gpu=False)
+            reader = easyocr_reader()
 
             # Read image
             results = reader.readtext(image_path)
@@ -228,8 +253,13 @@ class TestEasyOCROCR:
             pytest.skip(f"EasyOCR error: {e}")
             return None
 
+    def cached_ocr(self, image_path, ocr_store):
+        """EasyOCR detections of an image, from the result store when unchanged"""
+        return ocr_store.cached(image_path, 'easyocr', metadata.version('easyocr'),
+                                EASYOCR_PROFILE, self.easyocr_ocr)
+
     @pytest.mark.parametrize("filename,expected_code", BASIC_IMAGES)
-    def test_basic_images_easyocr(self, filename, expected_code, easyocr_available):
+    def test_basic_images_easyocr(self, filename, expected_code, easyocr_available, ocr_store):
         """Test EasyOCR on basic images"""
         if not easyocr_available:
             pytest.skip("EasyOCR not installed")
@@ -237,15 +267,16 @@ class TestEasyOCROCR:
         image_path = Path(__file__).parent / filename
         assert image_path.exists(), f"Image not found: {image_path}"
 
-        detections = self.easyocr_ocr(str(image_path))
+        detections, cached = self.cached_ocr(str(image_path), ocr_store)
         assert detections is not None, f"EasyOCR failed to process {filename}"
 
         extracted = self.extract_code_from_detections(detections)
-        assert expected_code in extracted.replace(' ', ''), \
-            f"Expected {expected_code} in '{extracted}' from {filename}"
+        passed = expected_code in extracted.replace(' ', '')
+        ocr_store.record('easyocr', filename, expected_code, extracted, passed, cached)
+        assert passed, f"Expected {expected_code} in '{extracted}' from {filename}"
 
     @pytest.mark.parametrize("filename,expected_code", ADVANCED_IMAGES[:5])
-    def test_advanced_images_easyocr(self, filename, expected_code, easyocr_available):
+    def test_advanced_images_easyocr(self, filename, expected_code, easyocr_available, ocr_store):
         """Test EasyOCR on advanced images (sample)"""
         if not easyocr_available:
             pytest.skip("EasyOCR not installed")
@@ -253,15 +284,16 @@ class TestEasyOCROCR:
         image_path = Path(__file__).parent / 'variants' / filename
         assert image_path.exists(), f"Image not found: {image_path}"
 
-        detections = self.easyocr_ocr(str(image_path))
+        detections, cached = self.cached_ocr(str(image_path), ocr_store)
         assert detections is not None, f"EasyOCR failed to process {filename}"
 
         extracted = self.extract_code_from_detections(detections)
-        assert expected_code in extracted.replace(' ', ''), \
-            f"Expected {expected_code} in '{extracted}' from {filename}"
+        passed = expected_code in extracted.replace(' ', '')
+        ocr_store.record('easyocr', filename, expected_code, extracted, passed, cached)
+        assert passed, f"Expected {expected_code} in '{extracted}' from {filename}"
 
     @pytest.mark.parametrize("filename,expected_code,acceptable_variations", REAL_WORLD_IMAGES)
-    def test_real_world_images_easyocr(self, filename, expected_code, acceptable_variations, easyocr_available):
+    def test_real_world_images_easyocr(self, filename, expected_code, acceptable_variations, easyocr_available, ocr_store):
         """Test EasyOCR on real-world images"""
         if not easyocr_available:
             pytest.skip("EasyOCR not installed")
@@ -269,17 +301,13 @@ class TestEasyOCROCR:
         image_path = Path(__file__).parent / 'variants' / filename
         assert image_path.exists(), f"Image not found: {image_path}"
 
-        detections = self.easyocr_ocr(str(image_path))
+        detections, cached = self.cached_ocr(str(image_path), ocr_store)
         assert detections is not None, f"EasyOCR failed to process {filename}"
 
         extracted = self.extract_code_from_detections(detections)
         # For real-world images, check if any acceptable variation is found
-        found = False
-        for variation in acceptable_variations:
-            if variation in extracted or variation.replace(' ', '') in extracted.replace(' ', ''):
-                found = True
-                break
-
+        found = variation_found(extracted, acceptable_variations)
+        ocr_store.record('easyocr', filename, expected_code, extracted, found, cached)
         assert found, f"Expected one of {acceptable_variations} in '{extracted}' from {filename}"
 
 
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the content-addressed OCR result store
+"""
+
+import pytest
+
+from ocr_result_store import OCRResultStore
+
+
+class CountingEngine:
+    """Stand-in OCR callable that counts how often it runs"""
+
+    def __init__(self):
+        self.runs = 0
+
+    def __call__(self, image_path):
+        self.runs += 1
+        with open(image_path, 'rb') as f:
+            return [[[0, 0], f.read().decode(), 0.9]]
+
+
+class TestOCRResultStore:
+    """Keys, hits and forced re-runs"""
+
+    @pytest.fixture
+    def image(self, tmp_path):
+        path = tmp_path / 'label.png'
+        path.write_bytes(b'12345')
+        return str(path)
+
+    def test_rerun_only_on_changes(self, tmp_path, image):
+        store = OCRResultStore(str(tmp_path / 'store'), force=False)
+        engine = CountingEngine()
+
+        result, cached = store.cached(image, 'fake', '1.0', {'lang': 'en'}, engine)
+        assert not cached and result[0][1] == '12345'
+        result, cached = store.cached(image, 'fake', '1.0', {'lang': 'en'}, engine)
+        assert cached and result[0][1] == '12345' and engine.runs == 1
+
+        store.cached(image, 'fake', '1.1', {'lang': 'en'}, engine)
+        store.cached(image, 'fake', '1.0', {'lang': 'es'}, engine)
+        assert engine.runs == 3
+
+        with open(image, 'wb') as f:
+            f.write(b'54321-changed')
+        result, cached = store.cached(image, 'fake', '1.0', {'lang': 'en'}, engine)
+        assert not cached and result[0][1] == '54321-changed' and engine.runs == 4
+
+    def test_force_and_persistence(self, tmp_path, image):
+        engine = CountingEngine()
+        OCRResultStore(str(tmp_path / 'store'), force=False).cached(image, 'fake', '1', {}, engine)
+
+        fresh = OCRResultStore(str(tmp_path / 'store'), force=False)
+        _, cached = fresh.cached(image, 'fake', '1', {}, engine)
+        assert cached and engine.runs == 1
+
+        forced = OCRResultStore(str(tmp_path / 'store'), force=True)
+        _, cached = forced.cached(image, 'fake', '1', {}, engine)
+        assert not cached and engine.runs == 2
+        assert fresh.entries()[0] == 1
+
+    def test_report(self, tmp_path):
+        store = OCRResultStore(str(tmp_path / 'store'), force=False)
+        store.record('fake', 'a.png', '12345', '12345', True, True)
+        store.record('fake', 'b.png', '54321', '5432', False, False)
+        report = store.report()
+        assert report['engines']['fake'] == {'images': 2, 'correct': 1, 'cached': 1, 'accuracy': 0.5}
+        assert [f['image'] for f in report['failures']] == ['b.png']
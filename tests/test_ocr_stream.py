@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for continuous camera-stream scanning
+Builds synthetic streams from the label variants and uses a fake reader
+"""
+
+import pytest
+from pathlib import Path
+
+np = pytest.importorskip('numpy')
+cv2 = pytest.importorskip('cv2')
+
+from image_utils import load_image
+from ocr_stream import FrameSelector, scan_stream
+
+VARIANTS_DIR = Path(__file__).parent / 'variants'
+
+
+class FakeReader:
+    """Reads the label code from the frame brightness, counts calls"""
+
+    def __init__(self, labels):
+        self.labels = labels
+        self.frames = []
+
+    def readtext(self, image):
+        self.frames.append(image)
+        mean = image.mean()
+        code = min(self.labels, key=lambda item: abs(item[0] - mean))[1]
+        return [([[0, 0], [1, 0], [1, 1], [0, 1]], code, 0.9)]
+
+
+def label(name):
+    img, _ = load_image(str(VARIANTS_DIR / name))
+    return img
+
+
+def noisy(img, rng):
+    return np.clip(img + rng.normal(0, 2, img.shape), 0, 255).astype(np.uint8)
+
+
+class TestStreamScanning:
+    """Frame dropping, stable windows and incremental results"""
+
+    @pytest.fixture(scope='class')
+    def labels(self):
+        return label('12345_white_modern.png'), label('54321_white_classic.png')
+
+    @pytest.fixture(scope='class')
+    def stream(self, labels):
+        first, second = labels
+        rng = np.random.default_rng(0)
+        frames = [noisy(np.roll(first, i * 25, axis=1), rng) for i in range(8)]
+        frames += [noisy(cv2.GaussianBlur(first, (0, 0), 1.5), rng) for _ in range(2)]
+        frames += [noisy(first, rng) for _ in range(28)]
+        frames += [noisy(np.roll(second, i * 25, axis=0), rng) for i in range(8)]
+        frames += [noisy(second, rng) for _ in range(30)]
+        return frames
+
+    @pytest.fixture
+    def reader(self, labels):
+        return FakeReader([(labels[0].mean(), '12345'), (labels[1].mean(), '54321')])
+
+    def test_one_ocr_per_stable_window(self, stream, reader):
+        selector = FrameSelector()
+        results = list(scan_stream(stream, reader, selector=selector, orient=False))
+
+        assert [r['raw_text'] for r in results] == ['12345', '54321']
+        assert len(reader.frames) == 2
+        assert selector.stats['unchanged'] > len(stream) // 2
+        assert selector.stats['moving'] >= 14
+
+    def test_sharpest_frame_is_read(self, stream, reader):
+        results = list(scan_stream(stream, reader, orient=False))
+        # Frames 8 and 9 are blurred; the window starts at frame 8
+        assert results[0]['frame_index'] == 10
+
+    def test_results_are_incremental(self, stream, reader):
+        results = scan_stream(iter(stream), reader, orient=False)
+        first = next(results)
+        assert first['raw_text'] == '12345'
+        assert len(reader.frames) == 1
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the zygote (fork-server) OCR mode
+A fake reader stands in for EasyOCR; it answers with the pid that ran it
+"""
+
+import os
+import time
+import signal
+import socket
+import multiprocessing
+
+import pytest
+
+np = pytest.importorskip('numpy')
+cv2 = pytest.importorskip('cv2')
+
+from ocr_server import request_ocr
+from ocr_zygote import ZygoteServer, check_installed, parse_importtime
+
+
+class PidReader:
+    """Reader returning the pid of the process it runs in"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def readtext(self, image):
+        self.calls += 1
+        return [([[0, 0], [40, 0], [40, 20], [0, 20]], f'{os.getpid()} {self.calls}', 0.9)]
+
+
+def wait_for(path, timeout=10.0):
+    deadline = time.time() + timeout
+    while not os.path.exists(path):
+        assert time.time() < deadline, f'{path} never appeared'
+        time.sleep(0.05)
+
+
+class TestZygote:
+    """Fork per request, availability probe and import report"""
+
+    def test_each_request_runs_in_a_fresh_child(self, tmp_path):
+        socket_path = str(tmp_path / 'zygote.sock')
+        status_file = str(tmp_path / 'status.json')
+        image_path = str(tmp_path / 'label.png')
+        cv2.imwrite(image_path, np.full((60, 200, 3), 255, dtype=np.uint8))
+
+        server = ZygoteServer(socket_path, engine='pytorch', max_children=2,
+                              status_file=status_file, loader=PidReader)
+        process = multiprocessing.get_context('fork').Process(target=server.serve_forever)
+        process.start()
+        try:
+            wait_for(status_file)
+            request = {'image_path': image_path, 'orient': False, 'quality': 'off'}
+            first = request_ocr(socket_path, request)
+            second = request_ocr(socket_path, request)
+
+            assert first['success'] and second['success']
+            first_pid, first_calls = first['raw_text'].split()
+            second_pid, second_calls = second['raw_text'].split()
+            assert first_pid != second_pid
+            assert {first_pid, second_pid}.isdisjoint({str(os.getpid()), str(process.pid)})
+            # Children start from the warmed-up parent state: the warm-up was call 1
+            assert first_calls == second_calls == '2'
+            assert request_ocr(socket_path, {'command': 'ping'})['success']
+            assert check_installed('pytorch', socket_path)['zygote']
+        finally:
+            os.kill(process.pid, signal.SIGTERM)
+            process.join(10)
+        assert process.exitcode == 0
+        assert not os.path.exists(socket_path)
+
+    def test_check_without_server(self, tmp_path):
+        result = check_installed('onnx', str(tmp_path / 'missing.sock'))
+        assert result['zygote'] is False
+        assert result['installed'] == (not result['missing'])
+
+    def test_client_falls_back_only_when_connect_fails(self, tmp_path, monkeypatch):
+        import ocr_server
+        from easyocr_process import process_via_server
+
+        socket_path = str(tmp_path / 'zygote.sock')
+        assert process_via_server(socket_path, 'label.png') is None
+
+        # Socket file left behind by a crashed zygote: nothing accepts
+        stale = socket.socket(socket.AF_UNIX)
+        stale.bind(socket_path)
+        stale.close()
+        assert process_via_server(socket_path, 'label.png') is None
+        assert check_installed('onnx', socket_path)['zygote'] is False
+
+        # Accepted but never answered: an error, not a second OCR run
+        os.unlink(socket_path)
+        hung = socket.socket(socket.AF_UNIX)
+        hung.bind(socket_path)
+        hung.listen(1)
+        request = ocr_server.request_ocr
+        monkeypatch.setattr(ocr_server, 'request_ocr', lambda path, payload: request(path, payload, 0.2))
+        try:
+            result = process_via_server(socket_path, 'label.png')
+        finally:
+            hung.close()
+        assert result['success'] is False
+        assert 'did not answer' in result['error']
+
+    def test_parse_importtime(self):
+        stderr = '\n'.join([
+            'import time: self [us] | cumulative | imported package',
+            'import time:       200 |        200 |     numpy.core._multiarray_umath',
+            'import time:       500 |      60000 |   numpy.core',
+            'import time:      1000 |      95000 | numpy',
+            'import time:       300 |      21000 | cv2',
+            'import time:       100 |       4000 | numpy.linalg',
+        ])
+        breakdown = parse_importtime(stderr)
+        assert breakdown['packages'][0] == {'package': 'numpy', 'ms': 99.0, 'share': 0.825}
+        assert breakdown['total_ms'] == 120.0
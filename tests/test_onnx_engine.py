@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the ONNX Runtime EasyOCR engine helpers
+The numpy post-processing must match EasyOCR's PyTorch pipeline
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import onnx_engine
+
+
+class TestCTCDecoding:
+    """Greedy CTC decoding and confidence"""
+
+    def one_hot(self, sequence, classes):
+        probs = np.full((1, len(sequence), classes), 0.01, dtype=np.float32)
+        for step, index in enumerate(sequence):
+            probs[0, step, index] = 0.9
+        return probs / probs.sum(axis=2, keepdims=True)
+
+    def test_collapses_repeats_and_blanks(self):
+        character = '0123456789'
+        # "1 1 blank 2 2 blank 2" -> "122"
+        probs = self.one_hot([2, 2, 0, 3, 3, 0, 3], len(character) + 1)
+        [(text, confidence)] = onnx_engine.ctc_greedy_decode(probs, character)
+        assert text == '122'
+        assert 0 < confidence <= 1
+
+    def test_ignored_classes_are_never_emitted(self):
+        character = '0123456789'
+        probs = self.one_hot([2, 0, 5], len(character) + 1)
+        [(text, _)] = onnx_engine.ctc_greedy_decode(probs, character, ignore_idx=[5])
+        assert '4' not in text
+
+    def test_all_blank_has_zero_confidence(self):
+        probs = self.one_hot([0, 0, 0], 4)
+        [(text, confidence)] = onnx_engine.ctc_greedy_decode(probs, 'abc')
+        assert text == ''
+        assert confidence == 0.0
+
+    def test_custom_mean_matches_easyocr(self):
+        values = np.array([0.9, 0.8, 0.95])
+        expected = values.prod() ** (2.0 / np.sqrt(3))
+        assert onnx_engine.custom_mean(values) == pytest.approx(expected)
+
+
+class TestGroupTextBox:
+    """Merging of character boxes into text lines"""
+
+    def box(self, x_min, y_min, x_max, y_max):
+        return np.array([x_min, y_min, x_max, y_min, x_max, y_max, x_min, y_max])
+
+    def test_neighbouring_boxes_merge_into_one_line(self):
+        polys = [self.box(10, 10, 40, 40), self.box(45, 10, 75, 40)]
+        horizontal, free = onnx_engine.group_text_box(polys)
+        assert len(horizontal) == 1
+        assert free == []
+        x_min, x_max, y_min, y_max = horizontal[0]
+        assert x_min <= 10 and x_max >= 75
+
+    def test_separate_lines_stay_separate(self):
+        polys = [self.box(10, 10, 60, 40), self.box(10, 100, 60, 130)]
+        horizontal, _ = onnx_engine.group_text_box(polys)
+        assert len(horizontal) == 2
+
+    def test_rotated_box_goes_to_free_list(self):
+        poly = np.array([10, 10, 100, 60, 80, 95, -10, 45])
+        horizontal, free = onnx_engine.group_text_box([poly])
+        assert horizontal == []
+        assert len(free) == 1
+
+
+class TestRecognitionBatches:
+    """Crops are batched by the width EasyOCR pads them to"""
+
+    def test_each_crop_padded_to_its_own_width(self):
+        pytest.importorskip('cv2')
+        pytest.importorskip('PIL')
+
+        reader = object.__new__(onnx_engine.OnnxReader)
+        reader.model_height = 64
+        widths = []
+
+        def predict(crops, max_width, adjust_contrast=0.0):
+            widths.append((len(crops), max_width))
+            return [(str(max_width), 0.9) for _ in crops]
+
+        reader._predict = predict
+        grey = np.full((200, 800), 255, dtype=np.uint8)
+        # Aspect ratios 2, 5 and 1.8: padded to 2, 5 and 2 model heights
+        boxes = [[0, 80, 0, 40], [0, 500, 50, 150], [0, 90, 150, 200]]
+        results = reader.recognize(grey, boxes, [])
+
+        assert sorted(widths) == [(1, 320), (2, 128)]
+        assert [text for _, text, _ in results] == ['128', '320', '128']
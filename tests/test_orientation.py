@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the orientation and skew pre-pass
+Rotates the generated label variants and checks the estimate
+"""
+
+import pytest
+from pathlib import Path
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('cv2')
+
+from image_utils import load_image
+from orientation import estimate_orientation, orient_image, rotate_image
+from benchmark_orientation import angle_error, rotate_content
+
+VARIANTS_DIR = Path(__file__).parent / 'variants'
+LABEL = str(VARIANTS_DIR / '12345_white_modern.png')
+
+
+def line_axis_error(estimated, expected):
+    """Angle error ignoring the 180 degree ambiguity"""
+    return abs((angle_error(estimated, expected) + 90.0) % 180.0 - 90.0)
+
+
+class TestOrientation:
+    """Quarter turns, skew and straightening"""
+
+    @pytest.fixture
+    def label(self):
+        img, _ = load_image(LABEL)
+        return img
+
+    @pytest.mark.parametrize('quarter', [0, 1, 2, 3])
+    def test_quarter_turns(self, label, quarter):
+        _, grey = load_image(np.ascontiguousarray(np.rot90(label, quarter)))
+        estimate = estimate_orientation(grey)
+        assert line_axis_error(estimate['angle'], quarter * 90) <= 1.5
+        assert estimate['line_confidence'] > 1.5
+
+    @pytest.mark.parametrize('angle', [5, -7, 95, -12])
+    def test_skew(self, label, angle):
+        _, grey = load_image(rotate_content(label, angle))
+        estimate = estimate_orientation(grey)
+        assert line_axis_error(estimate['angle'], angle) <= 1.5
+
+    def test_orient_image_straightens(self, label):
+        rotated = np.ascontiguousarray(np.rot90(label, 1))
+        img, estimate = orient_image(rotated)
+        assert estimate['applied']
+        assert img.shape[:2] == label.shape[:2]
+
+    def test_rotate_image_undoes_quarter_turn(self, label):
+        rotated = np.ascontiguousarray(np.rot90(label, 3))
+        assert np.array_equal(rotate_image(rotated, 270, 0.0), label)
+
+    def test_blank_image_is_left_alone(self):
+        blank = np.full((200, 300, 3), 255, dtype=np.uint8)
+        img, estimate = orient_image(blank)
+        assert not estimate['applied']
+        assert img is blank
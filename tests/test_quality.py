@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the image quality gate
+Degrades a generated label and checks the reported reasons
+"""
+
+import json
+import pytest
+from pathlib import Path
+
+np = pytest.importorskip('numpy')
+cv2 = pytest.importorskip('cv2')
+
+from image_utils import load_image
+from quality import QualityGate, assess, load_thresholds
+from easyocr_process import run_reader
+
+VARIANTS_DIR = Path(__file__).parent / 'variants'
+LABEL = str(VARIANTS_DIR / '12345_white_modern.png')
+
+
+class FakeReader:
+    """readtext stub that counts calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def readtext(self, image):
+        self.calls += 1
+        return [([[0, 0], [1, 0], [1, 1], [0, 1]], '12345', 0.9)]
+
+
+class TestQualityGate:
+    """Quality metrics, reasons and rejection before OCR"""
+
+    @pytest.fixture
+    def grey(self):
+        _, grey = load_image(LABEL)
+        return grey
+
+    def test_clean_label_passes(self, grey):
+        result = assess(grey)
+        assert result['ok']
+        assert result['reason'] is None
+        assert result['metrics']['code_height'] >= 12
+
+    @pytest.mark.parametrize('degrade, reason', [
+        (lambda g: cv2.GaussianBlur(g, (0, 0), 2.5), 'blurry'),
+        (lambda g: (g * 0.08).astype(np.uint8), 'underexposed'),
+        (lambda g: np.clip(g.astype(np.int16) + 200, 0, 255).astype(np.uint8), 'overexposed'),
+        (lambda g: cv2.resize(g, (80, 64), interpolation=cv2.INTER_AREA), 'too_small'),
+    ])
+    def test_degraded_frames_are_rejected(self, grey, degrade, reason):
+        result = assess(degrade(grey))
+        assert not result['ok']
+        assert result['reason'] == reason
+
+    def test_thresholds_are_configurable(self, grey, tmp_path):
+        config = tmp_path / 'thresholds.json'
+        config.write_text(json.dumps({'min_sharpness': 1e9}))
+        assert assess(grey, load_thresholds(str(config)))['reason'] == 'blurry'
+
+        config.write_text(json.dumps({'min_sharpnes': 10}))
+        with pytest.raises(ValueError):
+            load_thresholds(str(config))
+
+    def test_rejected_frame_skips_ocr(self, grey, tmp_path):
+        blurry = cv2.GaussianBlur(grey, (0, 0), 2.5)
+        gate = QualityGate('reject', stats_path=str(tmp_path / 'stats.json'))
+        reader = FakeReader()
+
+        result = run_reader(reader, blurry, 'pytorch', orient=False, quality_gate=gate)
+        assert not result['success']
+        assert result['error_code'] == 'low_quality'
+        assert result['reason'] == 'blurry'
+        assert reader.calls == 0
+
+        result = run_reader(reader, grey, 'pytorch', orient=False, quality_gate=gate)
+        assert result['success']
+        assert reader.calls == 1
+
+        report = QualityGate('flag', stats_path=str(tmp_path / 'stats.json')).report()
+        assert report['checked'] == 2
+        assert report['rejected'] == 1
+        assert report['reasons'] == {'blurry': 1}
+
+    def test_workers_merge_their_counts(self, grey, tmp_path):
+        stats_path = str(tmp_path / 'stats.json')
+        blurry = cv2.GaussianBlur(grey, (0, 0), 2.5)
+        # Two workers loaded the (empty) stats file before either wrote it
+        first = QualityGate('reject', stats_path=stats_path)
+        second = QualityGate('reject', stats_path=stats_path)
+
+        assert first.check(blurry)['reject']
+        assert second.check(blurry)['reject']
+        second.record_ocr(2.0)
+        assert first.check(blurry)['reject']
+
+        report = QualityGate('flag', stats_path=stats_path).report()
+        assert report['checked'] == 3
+        assert report['rejected'] == 3
+        assert report['reasons'] == {'blurry': 3}
+        assert report['mean_ocr_cpu_seconds'] == 2.0
+        assert first.report()['rejected'] == 3
+
+    def test_flag_mode_still_runs_ocr(self, grey):
+        reader = FakeReader()
+        blurry = cv2.GaussianBlur(grey, (0, 0), 2.5)
+        result = run_reader(reader, blurry, 'pytorch', orient=False, quality_gate=QualityGate('flag'))
+        assert result['success']
+        assert result['quality']['reason'] == 'blurry'
+        assert reader.calls == 1
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the shared memory-mapped weights file format
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import shared_weights
+
+
+class TestSharedWeights:
+    """Packing and mapping of weight arrays"""
+
+    @pytest.fixture
+    def groups(self):
+        rng = np.random.default_rng(0)
+        return {
+            'detector': {
+                'conv.weight': rng.standard_normal((8, 3, 3, 3)).astype(np.float32),
+                'bn.num_batches_tracked': np.array(7, dtype=np.int64),
+            },
+            'recognizer': {
+                'fc.weight': rng.standard_normal((97, 256)).astype(np.float32),
+                'fc.bias': rng.standard_normal(97).astype(np.float16),
+            },
+        }
+
+    def test_round_trip(self, groups, tmp_path):
+        path = str(tmp_path / 'model.weights')
+        shared_weights.pack_arrays(groups, path)
+        mapped = shared_weights.map_arrays(path)
+
+        assert set(mapped) == set(groups)
+        for group, arrays in groups.items():
+            for name, array in arrays.items():
+                assert mapped[group][name].dtype == array.dtype
+                assert mapped[group][name].shape == array.shape
+                np.testing.assert_array_equal(mapped[group][name], array)
+
+    def test_arrays_are_page_aligned_views_of_one_mapping(self, groups, tmp_path):
+        path = str(tmp_path / 'model.weights')
+        shared_weights.pack_arrays(groups, path)
+        mapped = shared_weights.map_arrays(path)
+
+        array = mapped['recognizer']['fc.weight']
+        assert isinstance(array.base, np.memmap)
+        assert array.ctypes.data % shared_weights.ALIGNMENT == 0
+
+    def test_writes_do_not_reach_the_file(self, groups, tmp_path):
+        path = str(tmp_path / 'model.weights')
+        shared_weights.pack_arrays(groups, path)
+
+        mapped = shared_weights.map_arrays(path)
+        mapped['detector']['conv.weight'][:] = 0
+
+        fresh = shared_weights.map_arrays(path)
+        np.testing.assert_array_equal(fresh['detector']['conv.weight'], groups['detector']['conv.weight'])
+
+    def test_rejects_foreign_files(self, tmp_path):
+        path = tmp_path / 'bogus.weights'
+        path.write_bytes(b'not a weights file')
+        with pytest.raises(ValueError):
+            shared_weights.map_arrays(str(path))
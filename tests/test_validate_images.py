@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for the incremental image validator
+"""
+
+import os
+import pytest
+
+from PIL import Image
+
+from validate_images import validate_directory, load_manifest, MANIFEST_NAME
+
+
+def run(root, **kwargs):
+    results = list(validate_directory(str(root), **kwargs))
+    return results[:-1], results[-1]['summary']
+
+
+class TestValidateDirectory:
+    """Manifest contents and incremental re-checks"""
+
+    @pytest.fixture
+    def images(self, tmp_path):
+        (tmp_path / 'sub').mkdir()
+        Image.new('RGB', (40, 30), (255, 0, 0)).save(tmp_path / 'a.png')
+        Image.new('RGB', (20, 10), (0, 255, 0)).save(tmp_path / 'sub' / 'b.jpg')
+        (tmp_path / 'notes.txt').write_text('not an image')
+        return tmp_path
+
+    def test_manifest_entries(self, images):
+        entries, summary = run(images, verify=True)
+        assert summary['files'] == 2 and summary['checked'] == 2 and summary['ok']
+
+        manifest = load_manifest(str(images / MANIFEST_NAME))
+        assert set(manifest) == {'a.png', os.path.join('sub', 'b.jpg')}
+        entry = manifest['a.png']
+        assert (entry['width'], entry['height'], entry['format']) == (40, 30, 'PNG')
+        assert entry['size'] == os.path.getsize(images / 'a.png')
+        assert len(entry['sha256']) == 64
+
+    def test_only_changed_files_are_rechecked(self, images):
+        run(images)
+        entries, summary = run(images)
+        assert summary['checked'] == 0 and all(e['cached'] for e in entries)
+
+        (images / 'a.png').write_bytes(b'truncated')
+        os.remove(images / 'sub' / 'b.jpg')
+        entries, summary = run(images)
+        assert summary['checked'] == 1 and summary['removed'] == 1
+        assert summary['invalid'] == 1 and not summary['ok']
+        assert entries[0]['path'] == 'a.png' and not entries[0]['cached']
+
+    def test_verify_rechecks_header_only_entries(self, images):
+        run(images)
+        _, summary = run(images, verify=True)
+        assert summary['checked'] == 2
+        _, summary = run(images, full=True)
+        assert summary['checked'] == 2
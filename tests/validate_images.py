@@ -2,12 +2,29 @@
 
 """
 Validate test images for LogistiQ MVP
-Checks that all test images exist and are valid PNG files
+Checks that all test images exist and are valid PNG files. With --dir it
+validates a whole directory tree (upload folders, generated corpora):
+
+    - each file is read once: the bytes are hashed and the image header is
+      parsed from memory, without decoding the pixels (--verify also runs
+      the format's integrity check on the same buffer)
+    - files are checked in a process pool
+    - results go to a JSONL manifest (path, size, mtime, sha256, dimensions,
+      format); on the next run only files whose size or mtime changed are
+      read again, so a warm manifest is checked in seconds
+
+Usage:
+    python3 validate_images.py
+    python3 validate_images.py --dir uploads/ [--manifest m.jsonl] [--json] [--verify]
 """
 
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
+import io
 import os
+import sys
 import json
+import time
+import hashlib
 
 EXPECTED_IMAGES = [
     'product_12345.png',
@@ -17,6 +34,149 @@ EXPECTED_IMAGES = [
     'product_22222.png',
 ]
 
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp', '.tif', '.tiff')
+MANIFEST_NAME = '.image_manifest.jsonl'
+POOL_MIN_FILES = 64            # fewer changed files than this are checked inline
+POOL_CHUNKSIZE = 32
+
+def check_image(job):
+    """
+    Read an image file once and describe it
+
+    Args:
+        job: (root, relative path, verify) tuple
+
+    Returns:
+        Manifest entry: path, size, mtime_ns, sha256, width, height, format,
+        mode, ok and error
+    """
+    root, path, verify = job
+    entry = {'path': path}
+    try:
+        full_path = os.path.join(root, path)
+        stat = os.stat(full_path)
+        with open(full_path, 'rb') as f:
+            data = f.read()
+        entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                     sha256=hashlib.sha256(data).hexdigest())
+
+        # Image.open only parses the header; pixels are never decoded
+        img = Image.open(io.BytesIO(data))
+        entry.update(width=img.size[0], height=img.size[1], format=img.format, mode=img.mode)
+        if verify:
+            img.verify()
+        entry.update(ok=True, error=None)
+    except UnidentifiedImageError:
+        entry.update(ok=False, error='cannot identify image file')
+    except Exception as e:
+        entry.update(ok=False, error=str(e) or type(e).__name__)
+    return entry
+
+def scan_images(root):
+    """
+    Image files under a directory
+
+    Yields:
+        (relative path, size, mtime_ns)
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            elif entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                stat = entry.stat()
+                yield os.path.relpath(entry.path, root), stat.st_size, stat.st_mtime_ns
+
+def load_manifest(path):
+    """Manifest entries by relative path ({} when missing or unreadable)"""
+    entries = {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    entries[entry['path']] = entry
+                except (ValueError, KeyError, TypeError):
+                    continue
+    except OSError:
+        pass
+    return entries
+
+def save_manifest(path, entries):
+    """Write manifest entries atomically, sorted by path"""
+    tmp_path = f'{path}.tmp.{os.getpid()}'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for name in sorted(entries):
+            f.write(json.dumps(entries[name], ensure_ascii=False) + '\n')
+    os.replace(tmp_path, path)
+
+def validate_directory(root, manifest_path=None, workers=None, verify=False, full=False):
+    """
+    Validate every image under a directory, re-checking only changed files
+
+    Args:
+        root: Directory to scan
+        manifest_path: JSONL manifest (default: <root>/.image_manifest.jsonl)
+        workers: Worker processes for changed files (default: CPU count)
+        verify: Also run the format integrity check (PNG CRCs, ...)
+        full: Ignore the manifest and re-check every file
+
+    Yields:
+        Manifest entries (with 'cached' True when reused from the manifest),
+        then a final {'summary': {...}}
+    """
+    start = time.perf_counter()
+    manifest_path = manifest_path or os.path.join(root, MANIFEST_NAME)
+    previous = {} if full else load_manifest(manifest_path)
+    entries = {}
+    changed = []
+
+    for path, size, mtime_ns in scan_images(root):
+        old = previous.get(path)
+        if (old and old.get('size') == size and old.get('mtime_ns') == mtime_ns
+                and old.get('verified', False) >= verify):
+            entries[path] = old
+            yield dict(old, cached=True)
+        else:
+            changed.append((root, path, verify))
+
+    pool = None
+    if len(changed) >= POOL_MIN_FILES and (workers or os.cpu_count() or 1) > 1:
+        import multiprocessing
+        pool = multiprocessing.Pool(workers or os.cpu_count())
+        results = pool.imap_unordered(check_image, changed, chunksize=POOL_CHUNKSIZE)
+    else:
+        results = map(check_image, changed)
+
+    try:
+        for entry in results:
+            entry['verified'] = verify
+            entries[entry['path']] = entry
+            yield dict(entry, cached=False)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    save_manifest(manifest_path, entries)
+    invalid = sum(1 for e in entries.values() if not e['ok'])
+    yield {'summary': {
+        'files': len(entries),
+        'checked': len(changed),
+        'cached': len(entries) - len(changed),
+        'removed': len(set(previous) - set(entries)),
+        'invalid': invalid,
+        'ok': invalid == 0,
+        'manifest': manifest_path,
+        'elapsed_seconds': round(time.perf_counter() - start, 3),
+    }}
+
 def validate_images():
     """Validate all test images"""
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -40,23 +200,15 @@ def validate_images():
             errors.append(f"Image not found: {image_name}")
             continue
 
-        try:
-            # Try to open and validate as PNG
-            img = Image.open(image_path)
-
-            # Check if it's actually a valid image
-            img.verify()
-
-            # Reopen since verify closes the image
-            img = Image.open(image_path)
-            width, height = img.size
-            file_size = os.path.getsize(image_path) / 1024  # KB
-
-            print(f"✓ OK ({width}x{height}px, {file_size:.1f}KB)")
-
-        except Exception as e:
+        # Read once: header and integrity check from the same buffer
+        entry = check_image((script_dir, image_name, True))
+        if entry['ok'] and entry['format'] == 'PNG':
+            file_size = entry['size'] / 1024  # KB
+            print(f"✓ OK ({entry['width']}x{entry['height']}px, {file_size:.1f}KB)")
+        else:
             print(f"❌ INVALID")
-            errors.append(f"Image validation failed for {image_name}: {str(e)}")
+            error = entry['error'] or f"not a PNG file ({entry['format']})"
+            errors.append(f"Image validation failed for {image_name}: {error}")
 
     print()
     print("=" * 60)
@@ -80,6 +232,42 @@ def validate_images():
         print()
         return True
 
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Validate LogistiQ test images')
+    parser.add_argument('--dir', default=None, help='Validate every image under this directory')
+    parser.add_argument('--manifest', default=None,
+                        help=f'Manifest file (default: <dir>/{MANIFEST_NAME})')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPUs)')
+    parser.add_argument('--verify', action='store_true', help='Also run format integrity checks')
+    parser.add_argument('--full', action='store_true', help='Ignore the manifest, re-check every file')
+    parser.add_argument('--json', action='store_true', help='Stream one JSON line per file')
+    args = parser.parse_args()
+
+    if not args.dir:
+        return 0 if validate_images() else 1
+
+    summary = None
+    for result in validate_directory(args.dir, args.manifest, args.workers, args.verify, args.full):
+        if 'summary' in result:
+            summary = result['summary']
+            if args.json:
+                print(json.dumps(result), flush=True)
+        elif args.json:
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+        elif not result['ok']:
+            print(f"  ✗ {result['path']}: {result['error']}", flush=True)
+
+    if not args.json:
+        print("=" * 60)
+        print(f"✓ {summary['files']} images ({summary['checked']} checked, "
+              f"{summary['cached']} unchanged, {summary['removed']} removed) "
+              f"in {summary['elapsed_seconds']:.2f} s")
+        if summary['invalid']:
+            print(f"✗ {summary['invalid']} invalid images")
+    return 0 if summary['ok'] else 1
+
 if __name__ == '__main__':
-    success = validate_images()
-    exit(0 if success else 1)
+    sys.exit(main())